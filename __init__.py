@@ -1,63 +1,68 @@
-# app/__init__.py
-from flask import Flask, render_template
-from flask_cors import CORS
-from flask_sqlalchemy import SQLAlchemy
-from apscheduler.schedulers.background import BackgroundScheduler
-import atexit
-import logging
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-# Initialize extensions
-db = SQLAlchemy()
-
-def create_app():
-    app = Flask(__name__, template_folder='../dashboard')
-    
-    # Set configuration directly
-    app.config['SECRET_KEY'] = 'threat-monitor-secret-key-2024'
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///threat_monitor.db'
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    
-    # Initialize extensions
-    db.init_app(app)
-    CORS(app)
-    
-    # Import models
-    from models import Alert, MonitoringTarget, SearchQuery
-    
-    # Import monitoring engine
-    from monitoringengine import ThreatMonitor, SearchEngine
-    
-    # Initialize monitoring engine
-    monitor = ThreatMonitor()
-    search_engine = SearchEngine()
-    
-    # Register routes
-    from app.routes import register_routes
-    register_routes(app, monitor, search_engine)
-    
-    # Initialize database
-    with app.app_context():
-        db.create_all()
-        logger.info("✅ Database initialized")
-    
-    # Start background scheduler
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(
-        func=lambda: monitor.monitor_all_targets(),
-        trigger="interval",
-        minutes=30,
-        id='monitoring_scan'
-    )
-    
-    try:
-        scheduler.start()
-        logger.info("⏰ Background monitoring started (30-minute intervals)")
-        atexit.register(lambda: scheduler.shutdown())
-    except Exception as e:
-        logger.error(f"❌ Failed to start scheduler: {e}")
-    
+# app/__init__.py
+from flask import Flask, render_template
+import atexit
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def create_app(mode=None):
+    """Dashboard and API app.
+    
+    mode (default APP_MODE): 'all' also runs the scan scheduler in this
+    process; 'web' serves requests only and leaves scans to worker.py.
+    """
+    # Load configuration
+    from config import Config
+    mode = mode or Config.APP_MODE
+    
+    app = Flask(__name__, template_folder='../dashboard')
+    app.config.from_object(Config)
+    
+    # Initialize extensions
+    from flask_cors import CORS
+    CORS(app)
+    
+    # orjson-backed jsonify with gzip for large responses
+    import jsonprovider
+    jsonprovider.init_app(app)
+    
+    # ETags and cached responses for the dashboard's read endpoints
+    import httpcache
+    httpcache.init_app(app)
+    
+    # Import monitoring engine
+    from monitoringengine import ThreatMonitor, SearchEngine
+    
+    # Initialize monitoring engine
+    monitor = ThreatMonitor()
+    search_engine = SearchEngine()
+    
+    # Register routes
+    from app.routes import register_routes
+    register_routes(app, monitor, search_engine)
+    
+    # Database, SQL instrumentation, keywords, FTS5 and the writer thread
+    import worker
+    import queryprofiler
+    worker.init_services(app)
+    queryprofiler.init_app(app)
+    
+    if mode == 'web':
+        logger.info("🌐 Web-only mode: scans run in worker.py")
+        return app
+    
+    # Start background scheduler
+    from apscheduler.schedulers.background import BackgroundScheduler
+    scheduler = BackgroundScheduler()
+    worker.add_jobs(scheduler, app, monitor)
+    
+    try:
+        scheduler.start()
+        logger.info(f"⏰ Background monitoring started ({Config.SCAN_INTERVAL_MINUTES}-minute intervals)")
+        atexit.register(lambda: scheduler.shutdown())
+    except Exception as e:
+        logger.error(f"❌ Failed to start scheduler: {e}")
+    
     return app
\ No newline at end of file
@@ -0,0 +1,262 @@
+# benchmarks.py
+"""Micro-benchmarks for the scoring, dedup and ranking hot paths.
+
+    python benchmarks.py                          # run and compare against the baseline
+    python benchmarks.py --sizes 10000,1000000    # choose corpus sizes
+    python benchmarks.py --save-baseline          # record a new baseline
+
+Exits non-zero when any benchmark is slower than the baseline by more than
+the tolerance, so it can gate a deploy. Timings only compare on the same
+machine, so the baseline is not checked in: record it with --save-baseline
+on the host that runs the gate (before the change under test), then run
+without it to compare.
+
+Every benchmark first runs once, untimed, on a small slice of the corpus
+so lazy imports and first-call setup are not charged to the timed runs.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from monitoringengine import ThreatMonitor, SearchEngine
+from records import ResultItem
+import neardup
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+DEFAULT_SIZES = [10000, 100000]
+DB_BENCH_MAX_ITEMS = 10000  # database benchmarks are slow, keep them bounded
+WARMUP_ITEMS = 1000
+INGEST_BATCH_SIZE = 100
+DATABASE_URI = 'sqlite://'
+
+WORDS = [
+    'acme', 'login', 'portal', 'release', 'update', 'customer', 'support', 'network',
+    'cloud', 'service', 'outage', 'report', 'community', 'feature', 'mobile', 'app',
+    'security', 'threat', 'attack', 'malware', 'phishing', 'fraud', 'scam', 'alert',
+    'password', 'leak', 'breach', 'hack', 'exploit', 'vulnerability', 'database',
+    'credentials', 'token', 'exposed', 'dump', 'london', 'berlin', 'tokyo'
+]
+PHRASES = ['data breach', 'password leak', 'api key exposed', 'database dump']
+SOURCES = ['reddit', 'github', 'hackernews', 'news']
+
+def make_corpus(size, seed=1337, duplicate_ratio=0.2):
+    """Reproducible synthetic ResultItems shaped like the connector output"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    unique = max(1, int(size * (1 - duplicate_ratio)))
+    items = []
+
+    for i in range(size):
+        n = i if i < unique else rng.randrange(unique)
+        item_rng = random.Random(seed * 1000003 + n)
+        title = ' '.join(item_rng.choice(WORDS) for _ in range(item_rng.randint(4, 10)))
+        content = ' '.join(item_rng.choice(WORDS) for _ in range(item_rng.randint(10, 60)))
+        if item_rng.random() < 0.05:
+            content += ' ' + item_rng.choice(PHRASES)
+        source = item_rng.choice(SOURCES)
+        created = now - timedelta(days=item_rng.randint(0, 60), seconds=item_rng.randint(0, 86400))
+        popularity = {'reddit': item_rng.randint(0, 5000), 'github': item_rng.randint(0, 5000),
+                      'hackernews': item_rng.randint(0, 1000)}.get(source, 0)
+        items.append(ResultItem(
+            title, content, f"https://example.com/{source}/{n}", source,
+            created=created, target_id=1, popularity=popularity
+        ))
+
+    return items
+
+def timed(func, repeat):
+    """Best wall time of `repeat` runs"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def bench_calculate_risk_level(corpus, repeat):
+    monitor = ThreatMonitor()
+    return timed(lambda: [monitor.calculate_risk_level(item) for item in corpus], repeat)
+
+def bench_threat_hash_dedup(corpus, repeat):
+    """The content hashing and seen-set part of ingest (ThreatMonitor.hashed), without the database"""
+    monitor = ThreatMonitor()
+
+    def run():
+        seen = set()
+        for _, content_hash in monitor.hashed(corpus):
+            if content_hash not in seen:
+                seen.add(content_hash)
+    return timed(run, repeat)
+
+_db_app = None
+
+def _database_app():
+    """Flask app bound to DATABASE_URI (in-memory SQLite unless --database is given)"""
+    global _db_app
+    if _db_app is None:
+        from flask import Flask
+        from models import db
+
+        _db_app = Flask(__name__)
+        _db_app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URI
+        _db_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        db.init_app(_db_app)
+    return _db_app
+
+def _run_against_database(corpus, repeat, ingest_corpus):
+    from models import db
+
+    corpus = corpus[:DB_BENCH_MAX_ITEMS]
+
+    def run():
+        db.drop_all()
+        db.create_all()
+        neardup.reset()
+        ingest_corpus(corpus)
+
+    with _database_app().app_context():
+        return timed(run, repeat), len(corpus)
+
+def bench_process_potential_threat(corpus, repeat):
+    """Row-at-a-time process_potential_threat: one dedup round trip and commit per item"""
+    monitor = ThreatMonitor()
+
+    def ingest_corpus(items):
+        for data in items:
+            monitor.process_potential_threat(data)
+
+    return _run_against_database(corpus, repeat, ingest_corpus)
+
+def bench_ingest_batch(corpus, repeat):
+    """process_potential_threats in connector-sized batches (multi-row ON CONFLICT DO NOTHING)"""
+    monitor = ThreatMonitor()
+
+    def ingest_corpus(items):
+        for start in range(0, len(items), INGEST_BATCH_SIZE):
+            monitor.process_potential_threats(items[start:start + INGEST_BATCH_SIZE])
+
+    return _run_against_database(corpus, repeat, ingest_corpus)
+
+def bench_deduplicate_results(corpus, repeat):
+    engine = SearchEngine()
+    return timed(lambda: engine.deduplicate_results(corpus), repeat)
+
+def bench_score_results(corpus, repeat):
+    engine = SearchEngine()
+    return timed(lambda: engine.score_results(corpus, 'acme', 'london'), repeat)
+
+BENCHMARKS = [
+    ('calculate_risk_level', bench_calculate_risk_level),
+    ('threat_hash_dedup', bench_threat_hash_dedup),
+    ('process_potential_threat', bench_process_potential_threat),
+    ('ingest_batch', bench_ingest_batch),
+    ('deduplicate_results', bench_deduplicate_results),
+    ('score_results', bench_score_results),
+]
+
+DB_BENCHMARKS = {'process_potential_threat', 'ingest_batch'}
+
+def warm_up(seed=1337, only=None):
+    """Run every benchmark once on a small corpus and discard the timings"""
+    corpus = make_corpus(WARMUP_ITEMS, seed=seed)
+    for name, func in BENCHMARKS:
+        if not only or name in only:
+            func(corpus, 1)
+
+def run_benchmarks(sizes, repeat=3, seed=1337, only=None):
+    results = {}
+    warm_up(seed=seed, only=only)
+    for size in sizes:
+        corpus = make_corpus(size, seed=seed)
+        for name, func in BENCHMARKS:
+            if only and name not in only:
+                continue
+            if name in DB_BENCHMARKS and f"{name}[{min(size, DB_BENCH_MAX_ITEMS)}]" in results:
+                continue
+            outcome = func(corpus, repeat)
+            seconds, items = outcome if isinstance(outcome, tuple) else (outcome, size)
+            key = f"{name}[{items}]"
+            results[key] = {
+                'benchmark': name,
+                'size': items,
+                'seconds': round(seconds, 6),
+                'items_per_sec': round(items / seconds, 1) if seconds else None
+            }
+            print(f"{key:<40} {seconds * 1000:>10.1f} ms  {results[key]['items_per_sec']:>14,.0f} items/s")
+    return results
+
+def compare(results, baseline, tolerance):
+    """Return the benchmarks that regressed by more than `tolerance`"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base or not base.get('seconds'):
+            continue
+        ratio = result['seconds'] / base['seconds']
+        status = 'REGRESSION' if ratio > 1 + tolerance else 'ok'
+        print(f"{key:<40} {ratio:>6.2f}x baseline  {status}")
+        if status != 'ok':
+            regressions.append(key)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Hot path micro-benchmarks')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='comma-separated corpus sizes (e.g. 10000,100000,1000000)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1337)
+    parser.add_argument('--only', default='', help='comma-separated benchmark names')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown before failing (0.25 = 25%%)')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--database', default='sqlite://',
+                        help='SQLAlchemy URI for the database benchmarks (e.g. a scratch PostgreSQL database)')
+    args = parser.parse_args(argv)
+
+    global DATABASE_URI
+    DATABASE_URI = args.database
+
+    logging.getLogger().setLevel(logging.WARNING)
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    only = {n for n in args.only.split(',') if n}
+
+    results = run_benchmarks(sizes, repeat=args.repeat, seed=args.seed, only=only)
+    report = {
+        'generated_at': datetime.utcnow().isoformat(),
+        'python': sys.version.split()[0],
+        'database': DATABASE_URI.split('@')[-1],
+        'results': results
+    }
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; record one on this machine with --save-baseline first")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f).get('results', {})
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
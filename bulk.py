@@ -0,0 +1,144 @@
+# bulk.py
+"""Bulk target import and alert triage.
+
+Targets are validated up front and inserted in one transaction: either every
+row is created or none is. Alert status changes are a single set-based
+UPDATE, selected by id list or by filter, and report how many rows changed.
+"""
+import csv
+import io
+import logging
+
+from sqlalchemy import insert, update
+
+from config import Config
+from models import db, Alert, MonitoringTarget, TargetKeyword
+from dbwriter import run_write
+import keywordmatch
+import ranking
+
+logger = logging.getLogger(__name__)
+
+ALERT_STATUSES = ('new', 'reviewed', 'resolved')
+TARGET_FIELDS = ('name', 'target_type', 'keywords')
+
+# filter key -> predicate builder for bulk status changes
+ALERT_FILTERS = {
+    'risk_level': lambda v: Alert.risk_level == v,
+    'status': lambda v: Alert.status == v,
+    'query_type': lambda v: Alert.query_type == v,
+    'source_type': lambda v: Alert.source_type == v,
+    'target_id': lambda v: Alert.target_id == int(v),
+    'since': lambda v: Alert.created_at >= ranking.to_utc(v),
+    'before': lambda v: Alert.created_at < ranking.to_utc(v)
+}
+
+class BulkError(ValueError):
+    """Rejected bulk request; errors lists what was wrong (per row for imports)"""
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors or []
+
+def parse_targets_csv(text):
+    """Rows of a CSV with a name,target_type,keywords header; keywords comma separated"""
+    return list(csv.DictReader(io.StringIO(text)))
+
+def _split_keywords(keywords):
+    if isinstance(keywords, str):
+        return [k.strip() for k in keywords.split(',') if k.strip()]
+    return keywords
+
+def validate_targets(rows):
+    """(target values, keyword specs) per row; raises BulkError listing every invalid row"""
+    if not isinstance(rows, list) or not rows:
+        raise BulkError('expected a non-empty array of targets')
+    if len(rows) > Config.BULK_MAX_ROWS:
+        raise BulkError(f"at most {Config.BULK_MAX_ROWS} targets per import")
+
+    name_length = MonitoringTarget.name.type.length
+    type_length = MonitoringTarget.target_type.type.length
+    valid, errors = [], []
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append({'row': i, 'error': 'expected an object'})
+            continue
+        missing = [f for f in TARGET_FIELDS if not row.get(f)]
+        if missing:
+            errors.append({'row': i, 'error': f"missing {', '.join(missing)}"})
+            continue
+        name = str(row['name']).strip()
+        target_type = str(row['target_type']).strip()
+        keywords = _split_keywords(row['keywords'])
+        if len(name) > name_length or len(target_type) > type_length:
+            errors.append({'row': i, 'error': f"name or target_type too long (max {name_length}/{type_length})"})
+            continue
+        if not isinstance(keywords, list) or not keywords:
+            errors.append({'row': i, 'error': 'keywords must be a non-empty list'})
+            continue
+        try:
+            specs = keywordmatch.normalize(keywords)
+        except ValueError as e:
+            errors.append({'row': i, 'error': str(e)})
+            continue
+        valid.append(({'name': name, 'target_type': target_type, 'active': True,
+                       'keywords_version': keywordmatch.new_version()}, specs))
+    if errors:
+        raise BulkError(f"{len(errors)} of {len(rows)} targets are invalid", errors)
+    return valid
+
+def import_targets(rows):
+    """Create all targets in one transaction; returns their new ids"""
+    valid = validate_targets(rows)
+
+    def insert_targets():
+        result = db.session.execute(
+            insert(MonitoringTarget).returning(MonitoringTarget.id, sort_by_parameter_order=True),
+            [values for values, _ in valid]
+        )
+        ids = [row[0] for row in result]
+        db.session.execute(insert(TargetKeyword), [
+            {'target_id': target_id, 'keyword': keyword, 'folded': keyword.casefold(), 'mode': mode, 'position': i}
+            for target_id, (_, specs) in zip(ids, valid)
+            for i, (keyword, mode) in enumerate(specs)
+        ])
+        return ids
+
+    ids = run_write(insert_targets)
+    logger.info(f"✅ Imported {len(ids)} monitoring targets")
+    return ids
+
+def _status_predicates(ids, filters):
+    if (ids is None) == (filters is None):
+        raise BulkError('give either ids or filter')
+    if ids is not None:
+        if not isinstance(ids, list) or not ids:
+            raise BulkError('ids must be a non-empty array')
+        if len(ids) > Config.BULK_MAX_ROWS:
+            raise BulkError(f"at most {Config.BULK_MAX_ROWS} ids per request; use a filter for more")
+        try:
+            return [Alert.id.in_([int(i) for i in ids])]
+        except (TypeError, ValueError):
+            raise BulkError('ids must be integers')
+
+    if not isinstance(filters, dict) or not filters:
+        raise BulkError('filter must be a non-empty object')
+    unknown = sorted(set(filters) - set(ALERT_FILTERS))
+    if unknown:
+        raise BulkError(f"unknown filter keys: {', '.join(unknown)}")
+    try:
+        return [ALERT_FILTERS[key](value) for key, value in filters.items()]
+    except (TypeError, ValueError) as e:
+        raise BulkError(f"invalid filter value: {e}")
+
+def set_alert_status(status, ids=None, filters=None):
+    """Set status on the alerts matching ids or filters in one UPDATE; returns rows changed"""
+    if status not in ALERT_STATUSES:
+        raise BulkError(f"status must be one of {', '.join(ALERT_STATUSES)}")
+    predicates = _status_predicates(ids, filters)
+    # Rows already in the target status are not counted as changed
+    stmt = (update(Alert).where(*predicates, Alert.status.is_distinct_from(status))
+            .values(status=status).execution_options(synchronize_session=False))
+
+    updated = run_write(lambda: db.session.execute(stmt).rowcount)
+    logger.info(f"📝 {updated} alerts set to {status}")
+    return updated
\ No newline at end of file
@@ -0,0 +1,70 @@
+# coldstart.py
+"""Cold-start time per process mode.
+
+Each run is a fresh interpreter that builds the app for one mode and exits,
+timed from process launch until the app is ready to serve (or scan):
+
+    all     create_app('all'): web + in-process scan scheduler
+    web     create_app('web'): web only, no scheduler
+    worker  worker.create_worker_app() + ThreatMonitor, no routes
+
+    python coldstart.py [--runs 5] [--modes web,worker] [--json coldstart.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SNIPPETS = {
+    'all': "from app import create_app; create_app('all')",
+    'web': "from app import create_app; create_app('web')",
+    'worker': "import worker; worker.create_worker_app(); from monitoringengine import ThreatMonitor; ThreatMonitor()",
+}
+
+# Printed by the child once the app is built: modules loaded
+REPORT = "; import sys, json; print(json.dumps({'modules': len(sys.modules)}))"
+
+def measure(mode, runs, env):
+    times = []
+    modules = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, '-c', SNIPPETS[mode] + REPORT],
+                             env=env, check=True, capture_output=True, text=True).stdout
+        times.append(time.perf_counter() - start)
+        modules = json.loads(out.strip().splitlines()[-1])['modules']
+    return {
+        'mode': mode,
+        'runs': runs,
+        'median_s': round(statistics.median(times), 3),
+        'min_s': round(min(times), 3),
+        'modules': modules
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cold-start time per process mode')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--modes', default=','.join(SNIPPETS))
+    parser.add_argument('--json', help='write the report to this file')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tmp, 'coldstart.db')}")
+        # The first start creates the schema; measure warm-schema starts only
+        subprocess.run([sys.executable, '-c', SNIPPETS['worker']], env=env, check=True, capture_output=True)
+        report = [measure(mode, args.runs, env) for mode in args.modes.split(',') if mode]
+
+    for row in report:
+        print(f"{row['mode']:<8} median {row['median_s']:.3f}s  min {row['min_s']:.3f}s  {row['modules']} modules")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
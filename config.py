@@ -1,17 +1,112 @@
-# config.py
-import os
-from datetime import timedelta
-
-class Config:
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'threat-monitor-secret-key-2024'
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///threat_monitor.db'
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
-    
-    # API Keys (get these from respective services)
-    NEWS_API_KEY = os.environ.get('NEWS_API_KEY') or ''
-    TWITTER_BEARER_TOKEN = os.environ.get('TWITTER_BEARER_TOKEN') or ''
-    
-    # Monitoring settings
-    SCAN_INTERVAL_MINUTES = int(os.environ.get('SCAN_INTERVAL_MINUTES', 30))
-    MAX_ALERTS_PER_PAGE = 20
-    REQUEST_TIMEOUT = 10  # Added this line
\ No newline at end of file
+# config.py
+import os
+import json
+from datetime import timedelta
+
+class Config:
+    SECRET_KEY = os.environ.get('SECRET_KEY') or 'threat-monitor-secret-key-2024'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///threat_monitor.db'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Connection pool (server databases only; SQLite uses SQLAlchemy's defaults)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    SQLALCHEMY_ENGINE_OPTIONS = {} if SQLALCHEMY_DATABASE_URI.startswith('sqlite') else {
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_pre_ping': True,
+        'pool_recycle': DB_POOL_RECYCLE
+    }
+    
+    # API Keys (get these from respective services)
+    NEWS_API_KEY = os.environ.get('NEWS_API_KEY') or ''
+    TWITTER_BEARER_TOKEN = os.environ.get('TWITTER_BEARER_TOKEN') or ''
+    
+    # Monitoring settings
+    SCAN_INTERVAL_MINUTES = int(os.environ.get('SCAN_INTERVAL_MINUTES', 30))
+    MAX_ALERTS_PER_PAGE = 20
+    REQUEST_TIMEOUT = 10  # Added this line
+    
+    # Upstream fetching
+    UPSTREAM_EMULATOR_URL = os.environ.get('UPSTREAM_EMULATOR_URL') or ''
+    UPSTREAM_PACING_SCALE = float(os.environ.get('UPSTREAM_PACING_SCALE', 1.0))
+    
+    # Diagnostics
+    TRACE_BUFFER_SIZE = int(os.environ.get('TRACE_BUFFER_SIZE', 20))
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 100))
+    SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG') or ''
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 5))
+    QUERY_PROFILE_HEADER = os.environ.get('QUERY_PROFILE_HEADER', '').lower() in ('1', 'true', 'yes')
+    
+    # SQLite production mode (WAL, tuned pragmas, single writer thread)
+    SQLITE_PRODUCTION_MODE = os.environ.get('SQLITE_PRODUCTION_MODE', '').lower() in ('1', 'true', 'yes')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 65536))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 268435456))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    DB_WRITER_BATCH_SIZE = int(os.environ.get('DB_WRITER_BATCH_SIZE', 200))
+    DB_WRITER_MAX_DELAY_MS = float(os.environ.get('DB_WRITER_MAX_DELAY_MS', 5))
+    
+    # Alert retention: "query_type:status" -> days kept in the hot table ("*" matches any, 0 keeps forever).
+    # Off unless configured, e.g. {"search:*": 30, "monitoring:resolved": 30, "monitoring:reviewed": 90, "*:*": 365}
+    RETENTION_POLICIES = json.loads(os.environ.get('RETENTION_POLICIES') or '{}')
+    RETENTION_BATCH_SIZE = int(os.environ.get('RETENTION_BATCH_SIZE', 1000))
+    ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR') or 'archive'
+    
+    # Alert full-text search: BM25 weight of title matches relative to description
+    FTS_TITLE_WEIGHT = float(os.environ.get('FTS_TITLE_WEIGHT', 5.0))
+    
+    # Near-duplicate detection at ingest (SimHash + canonical URL)
+    NEAR_DUP_ENABLED = os.environ.get('NEAR_DUP_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    NEAR_DUP_MAX_DISTANCE = int(os.environ.get('NEAR_DUP_MAX_DISTANCE', 5))  # Hamming bits out of 64; short texts drift further per edit
+    NEAR_DUP_MIN_TOKENS = int(os.environ.get('NEAR_DUP_MIN_TOKENS', 8))
+    NEAR_DUP_INDEX_SIZE = int(os.environ.get('NEAR_DUP_INDEX_SIZE', 50000))
+    
+    # Search ranking weights, merged over ranking.DEFAULT_WEIGHTS (JSON object)
+    RANKING_WEIGHTS = json.loads(os.environ.get('RANKING_WEIGHTS') or '{}')
+    SEARCH_TOP_K = int(os.environ.get('SEARCH_TOP_K', 20))
+    
+    # JSON responses of at least this many bytes are gzipped for clients that accept it (0 = never)
+    JSON_GZIP_MIN_BYTES = int(os.environ.get('JSON_GZIP_MIN_BYTES', 4096))
+    JSON_GZIP_LEVEL = int(os.environ.get('JSON_GZIP_LEVEL', 6))
+    
+    # Streaming export: rows fetched per cursor batch, bytes per streamed chunk
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+    EXPORT_CHUNK_BYTES = int(os.environ.get('EXPORT_CHUNK_BYTES', 65536))
+    EXPORT_GZIP_LEVEL = int(os.environ.get('EXPORT_GZIP_LEVEL', 6))
+    
+    # Largest target import / alert id list accepted by the bulk endpoints
+    BULK_MAX_ROWS = int(os.environ.get('BULK_MAX_ROWS', 10000))
+    
+    # Process role: 'all' (web + scan scheduler), 'web' (no scheduler; run worker.py for scans)
+    APP_MODE = os.environ.get('APP_MODE', 'all').lower()
+    
+    # ETag data version also rolls over every DATA_VERSION_TTL seconds (0 = only on local writes)
+    DATA_VERSION_TTL = int(os.environ.get('DATA_VERSION_TTL', 60))
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 256))
+    
+    # serve.py (eventlet): concurrent connections, listen backlog, upstream keep-alive pool per host
+    SERVER_MAX_CONNECTIONS = int(os.environ.get('SERVER_MAX_CONNECTIONS', 1000))
+    SERVER_BACKLOG = int(os.environ.get('SERVER_BACKLOG', 512))
+    UPSTREAM_POOL_SIZE = int(os.environ.get('UPSTREAM_POOL_SIZE', 50))
+    
+    # Durable scan queue: scans run as (target, source, keyword) work items in a local SQLite file
+    SCAN_QUEUE_ENABLED = os.environ.get('SCAN_QUEUE_ENABLED', '').lower() in ('1', 'true', 'yes')
+    WORK_QUEUE_PATH = os.environ.get('WORK_QUEUE_PATH') or 'scan_queue.db'
+    WORK_QUEUE_VISIBILITY_SECONDS = int(os.environ.get('WORK_QUEUE_VISIBILITY_SECONDS', 120))
+    WORK_QUEUE_MAX_ATTEMPTS = int(os.environ.get('WORK_QUEUE_MAX_ATTEMPTS', 5))
+    WORK_QUEUE_BACKOFF_SECONDS = float(os.environ.get('WORK_QUEUE_BACKOFF_SECONDS', 30))
+    WORK_QUEUE_KEEP_HOURS = int(os.environ.get('WORK_QUEUE_KEEP_HOURS', 24))
+    
+    # Hacker News monitoring: 'algolia' (search_by_date per keyword batch from a cursor) or 'newstories' (20 newest, titles only)
+    HN_MONITOR_MODE = os.environ.get('HN_MONITOR_MODE', 'algolia').lower()
+    HN_LOOKBACK_HOURS = int(os.environ.get('HN_LOOKBACK_HOURS', 24))  # first fetch of a new keyword batch
+    HN_CURSOR_OVERLAP_SECONDS = int(os.environ.get('HN_CURSOR_OVERLAP_SECONDS', 300))  # re-read for late-indexed items
+    HN_HITS_PER_PAGE = int(os.environ.get('HN_HITS_PER_PAGE', 100))
+    HN_MAX_PAGES = int(os.environ.get('HN_MAX_PAGES', 5))
+    
+    # Scan pipeline: queries (or parts) waiting between stages, and workers per stage merged over monitoringengine.STAGE_WORKERS (JSON object)
+    PIPELINE_QUEUE_SIZE = int(os.environ.get('PIPELINE_QUEUE_SIZE', 8))
+    PIPELINE_CHUNK_SIZE = int(os.environ.get('PIPELINE_CHUNK_SIZE', 500))  # alerts per part after normalize
+    PIPELINE_WORKERS = json.loads(os.environ.get('PIPELINE_WORKERS') or '{}')
\ No newline at end of file
@@ -0,0 +1,53 @@
+# cursors.py
+"""Per-query cursors for incremental upstream fetches.
+
+A cursor is keyed by source and query text, so a keyword batch that changes
+(keywords added or removed) starts a new cursor instead of inheriting a
+position that never covered its new terms. Cursors only move forward, so
+concurrent workers running the same query cannot rewind each other.
+"""
+import hashlib
+from datetime import datetime
+
+from sqlalchemy import case
+
+from models import db, ScanCursor
+from dbwriter import run_write
+import ingest
+
+def key_for(source, query):
+    return f"{source}:{hashlib.sha1(query.encode()).hexdigest()}"
+
+def position(source, query):
+    """Stored position, or None for a query never fetched before"""
+    cursor = db.session.get(ScanCursor, key_for(source, query))
+    return cursor.position if cursor is not None else None
+
+def advance(source, query, new_position):
+    """Move the cursor to new_position unless it is already further"""
+    row = {'key': key_for(source, query), 'source': source, 'query_text': query,
+           'position': int(new_position), 'updated_at': datetime.utcnow()}
+
+    def job():
+        insert = ingest.upsert_insert(db.session.get_bind().dialect.name)
+        if insert is None:
+            cursor = db.session.get(ScanCursor, row['key'])
+            if cursor is None:
+                db.session.add(ScanCursor(**row))
+            elif cursor.position < row['position']:
+                cursor.position = row['position']
+                cursor.updated_at = row['updated_at']
+            return
+
+        table = ScanCursor.__table__
+        stmt = insert(table).values(row)
+        further = stmt.excluded.position > table.c.position
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['key'],
+            set_={
+                'position': case((further, stmt.excluded.position), else_=table.c.position),
+                'updated_at': case((further, stmt.excluded.updated_at), else_=table.c.updated_at)
+            }
+        ))
+
+    run_write(job)
\ No newline at end of file
@@ -0,0 +1,184 @@
+# dbwriter.py
+"""SQLite production mode: WAL with tuned pragmas and a single writer thread.
+
+With SQLITE_PRODUCTION_MODE enabled, every write goes through one dedicated
+writer thread. That thread batches queued jobs into a single transaction
+(group commit), so the scheduler, manual scans and /api/search never contend
+for the write lock. WAL lets dashboard reads run alongside it without blocking.
+
+Writes are expressed as jobs: zero-argument callables that use db.session and
+return plain values (ids, flags), never ORM instances, because the session
+belongs to the writer thread. Call them with run_write(); without the writer
+the job runs inline and is committed immediately.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy import event
+
+from config import Config
+from models import db
+import metrics
+
+logger = logging.getLogger(__name__)
+
+_writer = None
+
+DB_WRITER_QUEUE = metrics.REGISTRY.register(metrics.Gauge(
+    'threatmonitor_db_writer_queue_depth', 'Write jobs waiting for the SQLite writer thread'))
+DB_WRITER_BATCH = metrics.REGISTRY.register(metrics.Histogram(
+    'threatmonitor_db_writer_batch_size', 'Jobs per group commit', buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500)))
+
+class DatabaseWriter:
+    def __init__(self, app, batch_size=200, max_delay=0.005):
+        self.app = app
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.queue = queue.Queue()
+        self.thread = None
+        self.commits = 0
+        self.jobs = 0
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self.thread.start()
+        logger.info("✍️ Database writer thread started")
+        return self
+
+    def stop(self, timeout=5):
+        self.queue.put(None)
+        if self.thread:
+            self.thread.join(timeout)
+
+    def in_writer_thread(self):
+        return self.thread is not None and threading.current_thread() is self.thread
+
+    def submit(self, func):
+        future = Future()
+        self.queue.put((func, future))
+        return future
+
+    def _next_batch(self):
+        job = self.queue.get()
+        if job is None:
+            return None
+        batch = [job]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                job = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                self.queue.put(None)
+                break
+            batch.append(job)
+        return batch
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    break
+                DB_WRITER_BATCH.observe(len(batch))
+                try:
+                    self._commit_batch(batch)
+                finally:
+                    db.session.close()
+                DB_WRITER_QUEUE.set(self.queue.qsize())
+
+    def _commit_batch(self, batch):
+        results = []
+        try:
+            for func, _ in batch:
+                results.append(func())
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            if len(batch) > 1:
+                logger.warning(f"Group commit of {len(batch)} jobs failed ({e}); retrying individually")
+            self._commit_individually(batch)
+            return
+
+        self.commits += 1
+        self.jobs += len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _commit_individually(self, batch):
+        for func, future in batch:
+            try:
+                result = func()
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                future.set_exception(e)
+            else:
+                self.commits += 1
+                self.jobs += 1
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            'queue_depth': self.queue.qsize(),
+            'commits': self.commits,
+            'jobs': self.jobs,
+            'jobs_per_commit': round(self.jobs / self.commits, 2) if self.commits else 0.0
+        }
+
+def run_write(func):
+    """Run a write job through the writer thread, or inline with its own commit"""
+    writer = _writer
+    if writer is not None and not writer.in_writer_thread():
+        DB_WRITER_QUEUE.set(writer.queue.qsize() + 1)
+        return writer.submit(func).result()
+
+    if writer is not None:
+        # Already inside a writer batch; the batch commits
+        return func()
+
+    try:
+        result = func()
+        db.session.commit()
+        return result
+    except Exception:
+        db.session.rollback()
+        raise
+
+def writer_stats():
+    return _writer.stats() if _writer is not None else None
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute(f"PRAGMA synchronous={Config.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA cache_size=-{int(Config.SQLITE_CACHE_SIZE_KB)}")
+    cursor.execute(f"PRAGMA mmap_size={int(Config.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(Config.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.close()
+
+def init_app(app):
+    """Enable WAL, pragmas and the writer thread for SQLite in production mode"""
+    global _writer
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI', '')
+    if not uri.startswith('sqlite') or not app.config.get('SQLITE_PRODUCTION_MODE'):
+        return None
+
+    with app.app_context():
+        event.listen(db.engine, 'connect', _sqlite_pragmas)
+        # Connections opened before the listener existed keep their old settings
+        db.engine.dispose()
+
+    _writer = DatabaseWriter(
+        app,
+        batch_size=app.config.get('DB_WRITER_BATCH_SIZE', 200),
+        max_delay=app.config.get('DB_WRITER_MAX_DELAY_MS', 5) / 1000.0
+    ).start()
+    logger.info("🗄️ SQLite production mode: WAL + single writer")
+    return _writer
\ No newline at end of file
@@ -0,0 +1,149 @@
+# export.py
+"""Streaming alert export as NDJSON or CSV.
+
+Rows are read in id order through a server-side cursor (yield_per), encoded
+and handed out in chunks of about EXPORT_CHUNK_BYTES, optionally gzipped on
+the fly. Memory stays flat however many alerts match.
+
+Incremental pulls pass the last id they received as since_id (or a
+created_at lower bound as since):
+
+    python export.py --format ndjson --since-id 12345 --output alerts.ndjson.gz
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import sys
+import zlib
+from datetime import datetime
+
+from flask import Flask
+from sqlalchemy import select
+
+from config import Config
+from models import db, Alert, MonitoringTarget
+import ranking
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+EXPORT_COLUMNS = [c for c in Alert.__table__.columns]
+FIELDS = [c.name for c in EXPORT_COLUMNS] + ['target_name']
+
+def export_statement(risk_level=None, status=None, query_type=None, since=None, since_id=None):
+    """Alert columns plus target name for the filter, oldest id first"""
+    stmt = (select(*EXPORT_COLUMNS, MonitoringTarget.name.label('target_name'))
+            .outerjoin(MonitoringTarget, Alert.target_id == MonitoringTarget.id))
+    if risk_level:
+        stmt = stmt.where(Alert.risk_level == risk_level)
+    if status:
+        stmt = stmt.where(Alert.status == status)
+    if query_type:
+        stmt = stmt.where(Alert.query_type == query_type)
+    if since is not None:
+        stmt = stmt.where(Alert.created_at >= ranking.to_utc(since))
+    if since_id is not None:
+        stmt = stmt.where(Alert.id > since_id)
+    return stmt.order_by(Alert.id)
+
+def iter_rows(stats=None, **filters):
+    """Matching rows as tuples in FIELDS order; needs an app context.
+
+    stats (a dict) is updated with the row count and last id as rows are read.
+    """
+    stmt = export_statement(**filters).execution_options(yield_per=Config.EXPORT_BATCH_SIZE)
+    rows = 0
+    for row in db.session.execute(stmt):
+        rows += 1
+        if stats is not None:
+            stats['rows'] = rows
+            stats['last_id'] = row[0]
+        yield tuple(value.isoformat() if isinstance(value, datetime) else value for value in row)
+
+def _ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(FIELDS, row)), separators=(',', ':')) + '\n'
+
+def _csv_lines(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def _chunked(lines, size):
+    parts = []
+    length = 0
+    for line in lines:
+        parts.append(line)
+        length += len(line)
+        if length >= size:
+            yield ''.join(parts).encode('utf-8')
+            parts = []
+            length = 0
+    if parts:
+        yield ''.join(parts).encode('utf-8')
+
+def _gzipped(chunks, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def generate(fmt='ndjson', compress=False, stats=None, **filters):
+    """Byte chunks of the export; needs an app context for as long as it is consumed"""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    rows = iter_rows(stats=stats, **filters)
+    lines = _csv_lines(rows) if fmt == 'csv' else _ndjson_lines(rows)
+    chunks = _chunked(lines, Config.EXPORT_CHUNK_BYTES)
+    return _gzipped(chunks, Config.EXPORT_GZIP_LEVEL) if compress else chunks
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Stream alerts as NDJSON or CSV')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='ndjson')
+    parser.add_argument('--output', help='file to write (default: stdout); gzipped when it ends in .gz')
+    parser.add_argument('--gzip', action='store_true', help='gzip the output')
+    parser.add_argument('--since', help='only alerts created at or after this ISO timestamp')
+    parser.add_argument('--since-id', type=int, help='only alerts with a larger id')
+    parser.add_argument('--risk-level')
+    parser.add_argument('--status')
+    parser.add_argument('--query-type')
+    args = parser.parse_args(argv)
+
+    compress = args.gzip or bool(args.output and args.output.endswith('.gz'))
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    db.init_app(app)
+
+    stats = {'rows': 0, 'last_id': args.since_id}
+    out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        with app.app_context():
+            for chunk in generate(args.format, compress=compress, stats=stats,
+                                  risk_level=args.risk_level, status=args.status, query_type=args.query_type,
+                                  since=args.since, since_id=args.since_id):
+                out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+        else:
+            out.flush()
+    logger.info(f"📤 Exported {stats['rows']} alerts (last id {stats['last_id']})")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,158 @@
+# fulltext.py
+"""Full-text search over alerts with SQLite FTS5.
+
+alert_fts is an external-content FTS5 table over alert.title and
+alert.description: it stores only the index, and triggers on the alert table
+keep it in sync, so every write path (ORM, ingest's Core inserts, retention
+deletes) is covered without extra code. Results are ranked with BM25, title
+matches weighted higher, and ORDER BY rank lets FTS5 stop after the page it
+needs instead of scoring every match.
+
+On other databases, or a SQLite build without FTS5, search falls back to a
+LIKE scan.
+"""
+import html
+import logging
+import re
+
+from sqlalchemy import text
+
+from config import Config
+from models import db, Alert
+
+logger = logging.getLogger(__name__)
+
+# Control characters never appear in alert text, so highlight markers can be
+# swapped for <mark> after escaping
+_OPEN, _CLOSE = '\x02', '\x03'
+_TERM = re.compile(r'\w+\*?', re.UNICODE)
+# Shorter prefixes expand to most of the vocabulary and rank every alert
+MIN_PREFIX = 3
+
+_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS alert_fts USING fts5(
+        title, description,
+        content='alert', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2',
+        prefix='3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS alert_fts_ai AFTER INSERT ON alert BEGIN
+        INSERT INTO alert_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS alert_fts_ad AFTER DELETE ON alert BEGIN
+        INSERT INTO alert_fts(alert_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS alert_fts_au AFTER UPDATE OF title, description ON alert BEGIN
+        INSERT INTO alert_fts(alert_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO alert_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+_available = False
+
+def available():
+    return _available
+
+def _fts5_supported(connection):
+    try:
+        connection.exec_driver_sql("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        connection.exec_driver_sql("DROP TABLE temp.fts5_probe")
+        return True
+    except Exception:
+        return False
+
+def init_app(app):
+    """Create the FTS5 table and triggers (once), backfilling existing alerts"""
+    global _available
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            logger.info("🔎 Alert full-text search: LIKE fallback (not SQLite)")
+            return False
+
+        with db.engine.begin() as conn:
+            if not _fts5_supported(conn):
+                logger.warning("⚠️ SQLite built without FTS5; alert search uses LIKE")
+                return False
+
+            existed = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE name = 'alert_fts'").first() is not None
+            for statement in _SCHEMA:
+                conn.exec_driver_sql(statement)
+            # Column weights live in the table, so ORDER BY rank stays on the fast path
+            conn.execute(
+                text("INSERT INTO alert_fts(alert_fts, rank) VALUES ('rank', :rank)"),
+                {'rank': f"bm25({float(Config.FTS_TITLE_WEIGHT)}, 1.0)"}
+            )
+            if not existed:
+                conn.exec_driver_sql("INSERT INTO alert_fts(alert_fts) VALUES ('rebuild')")
+                logger.info("🔎 Built alert full-text index")
+
+    _available = True
+    return True
+
+def match_expression(q):
+    """User text to an FTS5 query: every term must match, a trailing * is a prefix search"""
+    terms = []
+    for token in _TERM.findall(q or ''):
+        word = token.rstrip('*')
+        prefix = token.endswith('*') and len(word) >= MIN_PREFIX
+        if word:
+            terms.append(f'"{word}"*' if prefix else f'"{word}"')
+    return ' '.join(terms)
+
+def _render(fragment):
+    """Escape stored text, then turn highlight markers into <mark> tags"""
+    if not fragment:
+        return fragment
+    return html.escape(fragment).replace(_OPEN, '<mark>').replace(_CLOSE, '</mark>')
+
+def _filters(filters):
+    clauses, params = [], {}
+    for column in ('risk_level', 'status', 'query_type'):
+        if filters.get(column):
+            clauses.append(f"a.{column} = :{column}")
+            params[column] = filters[column]
+    return clauses, params
+
+def search(q, page=1, per_page=20, **filters):
+    """Alerts matching q, best first.
+
+    Returns (total, [(alert_id, rank, title_html, snippet_html)]).
+    """
+    expression = match_expression(q)
+    if not expression:
+        return 0, []
+    if not _available:
+        return _like_search(q, page, per_page, **filters)
+
+    clauses, params = _filters(filters)
+    where = ' AND '.join(['alert_fts MATCH :q'] + clauses)
+    params.update(q=expression, limit=per_page, offset=(page - 1) * per_page)
+    join = 'JOIN alert a ON a.id = alert_fts.rowid' if clauses else ''
+
+    total = db.session.execute(
+        text(f"SELECT count(*) FROM alert_fts {join} WHERE {where}"), params).scalar()
+    rows = db.session.execute(text(f"""
+        SELECT alert_fts.rowid, alert_fts.rank,
+               highlight(alert_fts, 0, '{_OPEN}', '{_CLOSE}'),
+               snippet(alert_fts, 1, '{_OPEN}', '{_CLOSE}', '…', 24)
+        FROM alert_fts {join}
+        WHERE {where}
+        ORDER BY alert_fts.rank
+        LIMIT :limit OFFSET :offset
+    """), params).all()
+    return total, [(r[0], r[1], _render(r[2]), _render(r[3])) for r in rows]
+
+def _like_search(q, page, per_page, **filters):
+    query = Alert.query
+    for word in (t.rstrip('*') for t in _TERM.findall(q)):
+        pattern = f"%{word}%"
+        query = query.filter(db.or_(Alert.title.ilike(pattern), Alert.description.ilike(pattern)))
+    for column in ('risk_level', 'status', 'query_type'):
+        if filters.get(column):
+            query = query.filter(getattr(Alert, column) == filters[column])
+    total = query.count()
+    alerts = (query.order_by(Alert.created_at.desc())
+              .offset((page - 1) * per_page).limit(per_page).all())
+    return total, [(a.id, None, html.escape(a.title or ''), html.escape((a.description or '')[:200]))
+                   for a in alerts]
\ No newline at end of file
@@ -0,0 +1,137 @@
+# httpcache.py
+"""Conditional GET and in-process response caching for read-only endpoints.
+
+A data version counter is bumped whenever a transaction that wrote to an
+alert or target table commits in this process. Cached endpoints answer with
+a weak ETag derived from it: a matching If-None-Match gets a 304 straight
+from memory, and otherwise the response is served from a small cache keyed
+by (endpoint, query string, version, gzip) when one is there.
+
+Writes made by other processes (worker.py, other web replicas) are not
+seen by the counter, and some results depend on the clock (alerts of the
+last 7 days), so the version also rolls over every DATA_VERSION_TTL
+seconds. That bounds how stale a cached answer can be.
+"""
+import functools
+import itertools
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request
+
+from config import Config
+
+WATCHED_TABLES = ('alert', 'monitoring_target', 'target_keyword')
+
+_WRITE = re.compile(
+    r'^\s*(?:INSERT|UPDATE|DELETE|REPLACE)\b.*?\b(?:' + '|'.join(WATCHED_TABLES) + r')\b',
+    re.IGNORECASE | re.DOTALL
+)
+
+_counter = itertools.count(1)
+_version = next(_counter)
+_lock = threading.Lock()
+_cache = OrderedDict()  # (endpoint, query, version, gzip) -> (body, status, headers)
+_hits = 0
+_misses = 0
+_not_modified = 0
+
+def bump():
+    global _version
+    _version = next(_counter)
+
+def data_version():
+    ttl = Config.DATA_VERSION_TTL
+    if ttl > 0:
+        return f"{_version}.{int(time.time()) // ttl}"
+    return str(_version)
+
+_installed = False
+
+def init_engine_events():
+    """Bump the data version after every commit that wrote a watched table"""
+    global _installed
+    if _installed:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        if _WRITE.match(statement):
+            conn.info['data_written'] = True
+
+    @event.listens_for(Engine, 'commit')
+    def _commit(conn):
+        if conn.info.pop('data_written', False):
+            bump()
+
+    @event.listens_for(Engine, 'rollback')
+    def _rollback(conn):
+        conn.info.pop('data_written', None)
+
+    _installed = True
+
+def init_app(app):
+    init_engine_events()
+
+def _store(key, response):
+    with _lock:
+        # Entries for older versions can never be served again
+        for stale in [k for k in _cache if k[2] != key[2]]:
+            del _cache[stale]
+        _cache[key] = (response.get_data(), response.status_code,
+                       [(k, v) for k, v in response.headers.items() if k.lower() != 'content-length'])
+        while len(_cache) > Config.RESPONSE_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+def cached(view):
+    """Weak ETag, 304 and response caching for a view's GET requests"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        global _hits, _misses, _not_modified
+        if request.method != 'GET':
+            return view(*args, **kwargs)
+
+        version = data_version()
+        if request.if_none_match.contains_weak(version):
+            _not_modified += 1
+            response = current_app.response_class(status=304)
+            response.set_etag(version, weak=True)
+            response.vary.add('Accept-Encoding')
+            return response
+
+        key = (request.endpoint, request.query_string, version, request.accept_encodings['gzip'] > 0)
+        with _lock:
+            entry = _cache.get(key)
+            if entry is not None:
+                _cache.move_to_end(key)
+        if entry is not None:
+            _hits += 1
+            body, status, headers = entry
+            response = current_app.response_class(body, status=status, headers=headers)
+        else:
+            _misses += 1
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            _store(key, response)
+
+        response.set_etag(version, weak=True)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
+
+def stats():
+    with _lock:
+        entries = len(_cache)
+    return {
+        'data_version': data_version(),
+        'entries': entries,
+        'capacity': Config.RESPONSE_CACHE_SIZE,
+        'hits': _hits,
+        'misses': _misses,
+        'not_modified': _not_modified
+    }
\ No newline at end of file
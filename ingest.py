@@ -0,0 +1,321 @@
+# ingest.py
+"""Dialect-aware alert ingest.
+
+PostgreSQL (and SQLite >= 3.35) insert a whole batch with one
+INSERT ... ON CONFLICT (content_hash) DO NOTHING RETURNING statement. Dedup
+and insert then happen in a single round trip instead of a SELECT per item.
+Other dialects fall back to check-then-insert.
+
+For large PostgreSQL backfills, copy_backfill() COPYs rows into a temporary
+staging table and merges them with the same ON CONFLICT rule:
+
+    python ingest.py backfill alerts.ndjson [--batch-size 50000]
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import logging
+import sqlite3
+import sys
+from datetime import datetime
+
+from sqlalchemy import bindparam, select, union_all
+
+from config import Config
+from models import db, Alert, AlertDuplicate, ArchivedAlert
+from dbwriter import run_write
+import neardup
+
+logger = logging.getLogger(__name__)
+
+COPY_COLUMNS = (
+    'target_id', 'title', 'description', 'source_url', 'source_type', 'risk_level',
+    'status', 'created_at', 'content_hash', 'location', 'query_type'
+)
+
+def content_hash_for(title, content, url, target_id=None):
+    """Exact-dedup key; target_id scopes it for extra copies of an item shared by several targets"""
+    content_str = f"{title}{content}{url}"
+    if target_id is not None:
+        content_str += f"\x00target={target_id}"
+    return hashlib.sha256(content_str.encode()).hexdigest()
+
+def alert_row(title, content, url, source, content_hash, risk_level='medium', target_id=None,
+              status='new', location=None, query_type='monitoring', created_at=None):
+    """Column values for one Alert, truncated the same way the ORM path does"""
+    return {
+        'target_id': target_id,
+        'title': (title or '')[:200],
+        'description': content[:1000] if content else '',
+        'source_url': url,
+        'source_type': source,
+        'risk_level': risk_level,
+        'status': status,
+        'created_at': created_at or datetime.utcnow(),
+        'content_hash': content_hash,
+        'location': location,
+        'query_type': query_type
+    }
+
+_SEEN_HASHES = union_all(
+    select(Alert.content_hash).where(Alert.content_hash.in_(bindparam('hashes', expanding=True))),
+    select(ArchivedAlert.content_hash).where(ArchivedAlert.content_hash.in_(bindparam('hashes', expanding=True)))
+)
+
+_HASH_OWNERS = select(Alert.content_hash, Alert.target_id).where(
+    Alert.content_hash.in_(bindparam('hashes', expanding=True)))
+
+def hash_owners(hashes):
+    """{content hash: target_id} for the given hashes stored in the hot table (target_id None for searches)"""
+    if not hashes:
+        return {}
+    return dict(db.session.execute(_HASH_OWNERS, {'hashes': list(hashes)}).all())
+
+def seen_hashes(hashes):
+    """The given content hashes that are already stored, in the hot table or the archive"""
+    if not hashes:
+        return set()
+    return set(db.session.execute(_SEEN_HASHES, {'hashes': list(hashes)}).scalars())
+
+def upsert_insert(dialect_name):
+    """The dialect's insert() with ON CONFLICT support (and RETURNING), or None"""
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect_name == 'sqlite' and sqlite3.sqlite_version_info >= (3, 35):
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+def _check_then_insert(rows):
+    inserted = []
+    for row in rows:
+        if Alert.query.filter_by(content_hash=row['content_hash']).first():
+            continue
+        alert = Alert(**row)
+        db.session.add(alert)
+        db.session.flush()
+        inserted.append((alert.id, alert.content_hash))
+    return inserted
+
+def _split_near_duplicates(rows, signatures):
+    """Separate rows that are near-duplicates of an indexed alert or of an earlier row in the batch.
+
+    Returns (fresh rows, [(row, alert id or content hash of the batch row, match, distance)]).
+    """
+    batch_index = neardup.NearDuplicateIndex(capacity=len(rows) + 1)
+    fresh, attached = [], []
+    for row in rows:
+        signature, url = signatures[row['content_hash']]
+        scope = row['target_id']
+        found = neardup.index.find(signature, url, scope) or batch_index.find(signature, url, scope)
+        if found:
+            attached.append((row,) + found)
+        else:
+            fresh.append(row)
+            batch_index.add(row['content_hash'], signature, url, scope)
+    return fresh, attached
+
+def _duplicate_row(row, alert_id, match, distance):
+    return {
+        'alert_id': alert_id,
+        'title': row['title'],
+        'source_url': row['source_url'],
+        'source_type': row['source_type'],
+        'content_hash': row['content_hash'],
+        'match': match,
+        'distance': distance,
+        'created_at': row['created_at']
+    }
+
+def insert_alerts(rows, near_duplicates=None):
+    """Insert rows, skipping existing content hashes; returns [(id, content_hash)] actually inserted.
+
+    With near-duplicate detection on (NEAR_DUP_ENABLED), rows that are near
+    copies of a recent alert are recorded as AlertDuplicate sightings of it
+    instead of new alerts.
+    """
+    if near_duplicates is None:
+        near_duplicates = Config.NEAR_DUP_ENABLED
+
+    # First occurrence wins inside a batch, as with sequential inserts
+    by_hash = {}
+    for row in rows:
+        by_hash.setdefault(row['content_hash'], row)
+    unique = list(by_hash.values())
+    if not unique:
+        return []
+
+    signatures = {}
+    if near_duplicates:
+        # Signatures are computed here so the writer thread only does lookups
+        neardup.index.warm()
+        for row in unique:
+            signatures[row['content_hash']] = (
+                neardup.index.signature_for(row['title'], row['description']),
+                neardup.canonical_url(row['source_url'])
+            )
+    attached = []
+
+    def job():
+        # Exact repeats are plain duplicates, never near-duplicate sightings;
+        # archived alerts have left the table but still count as seen
+        seen = seen_hashes(by_hash)
+        pending = [row for row in unique if row['content_hash'] not in seen] if seen else unique
+
+        attached[:] = []
+        if near_duplicates and pending:
+            pending, attached[:] = _split_near_duplicates(pending, signatures)
+        inserted = _insert(pending) if pending else []
+
+        if attached:
+            ids = {h: i for i, h in inserted}
+            duplicates = []
+            for row, target, match, distance in attached:
+                alert_id = ids.get(target) if isinstance(target, str) else target
+                if alert_id is not None:
+                    duplicates.append(_duplicate_row(row, alert_id, match, distance))
+            if duplicates:
+                db.session.execute(AlertDuplicate.__table__.insert(), duplicates)
+        return inserted
+
+    inserted = run_write(job)
+
+    if near_duplicates:
+        for alert_id, content_hash in inserted:
+            neardup.index.add(alert_id, *signatures[content_hash], by_hash[content_hash]['target_id'])
+        for _, _, match, _ in attached:
+            neardup.NEAR_DUPLICATES.inc(match=match)
+    return inserted
+
+def _insert(rows):
+    insert = upsert_insert(db.session.get_bind().dialect.name)
+    if insert is None:
+        return _check_then_insert(rows)
+
+    # One cached statement executed with a parameter list; SQLAlchemy's
+    # insertmanyvalues batching turns it into multi-row VALUES with RETURNING
+    table = Alert.__table__
+    stmt = (
+        insert(table)
+        .on_conflict_do_nothing(index_elements=['content_hash'])
+        .returning(table.c.id, table.c.content_hash)
+    )
+    result = db.session.execute(stmt, rows)
+    return [(r.id, r.content_hash) for r in result]
+
+def copy_backfill(rows, batch_size=50000):
+    """PostgreSQL bulk load: COPY into a temp staging table, then merge with ON CONFLICT.
+
+    Rows whose hash is already live or archived are skipped. Returns the number of rows inserted. Each batch is one transaction.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        raise ValueError('copy_backfill requires PostgreSQL; use insert_alerts for other databases')
+
+    columns = ', '.join(COPY_COLUMNS)
+    total = 0
+    batch = []
+
+    def flush(batch):
+        buffer = io.StringIO()
+        # Quoted strings stay strings; unquoted empty fields load as NULL
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        for row in batch:
+            writer.writerow([row.get(c) for c in COPY_COLUMNS])
+        buffer.seek(0)
+
+        raw = db.session.connection().connection.dbapi_connection
+        cursor = raw.cursor()
+        try:
+            cursor.execute(
+                f"CREATE TEMP TABLE alert_staging ON COMMIT DROP AS "
+                f"SELECT {columns} FROM alert WITH NO DATA"
+            )
+            copy_sql = f"COPY alert_staging ({columns}) FROM STDIN WITH (FORMAT csv)"
+            if hasattr(cursor, 'copy_expert'):  # psycopg2
+                cursor.copy_expert(copy_sql, buffer)
+            else:  # psycopg 3
+                with cursor.copy(copy_sql) as copy:
+                    copy.write(buffer.getvalue())
+            # Archived hashes count as seen, as in insert_alerts (NOT EXISTS: archive hashes may be NULL)
+            cursor.execute(
+                f"INSERT INTO alert ({columns}) "
+                f"SELECT DISTINCT ON (content_hash) {columns} FROM alert_staging s "
+                f"WHERE NOT EXISTS (SELECT 1 FROM archived_alert a WHERE a.content_hash = s.content_hash) "
+                f"ON CONFLICT (content_hash) DO NOTHING"
+            )
+            inserted = cursor.rowcount
+        finally:
+            cursor.close()
+        db.session.commit()
+        return inserted
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            total += flush(batch)
+            batch = []
+    if batch:
+        total += flush(batch)
+
+    logger.info(f"📥 Backfill complete: {total} new alerts")
+    return total
+
+def _ndjson_rows(path):
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            title = item.get('title', '')
+            content = item.get('description', item.get('content', ''))
+            url = item.get('source_url', item.get('url', ''))
+            created_at = item.get('created_at')
+            yield alert_row(
+                title, content, url,
+                source=item.get('source_type', item.get('source')),
+                content_hash=item.get('content_hash') or content_hash_for(title, content, url),
+                risk_level=item.get('risk_level', 'medium'),
+                target_id=item.get('target_id'),
+                status=item.get('status', 'new'),
+                location=item.get('location'),
+                query_type=item.get('query_type', 'monitoring'),
+                created_at=datetime.fromisoformat(created_at) if created_at else None
+            )
+
+def main(argv=None):
+    from flask import Flask
+    from config import Config
+
+    parser = argparse.ArgumentParser(description='Bulk alert ingest')
+    sub = parser.add_subparsers(dest='command', required=True)
+    backfill = sub.add_parser('backfill', help='load alerts from an NDJSON file')
+    backfill.add_argument('path')
+    backfill.add_argument('--batch-size', type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        rows = _ndjson_rows(args.path)
+        if db.engine.dialect.name == 'postgresql':
+            inserted = copy_backfill(rows, batch_size=args.batch_size)
+        else:
+            inserted = 0
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= args.batch_size:
+                    inserted += len(insert_alerts(batch))
+                    batch = []
+            inserted += len(insert_alerts(batch))
+        print(f"Inserted {inserted} alerts")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
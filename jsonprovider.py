@@ -0,0 +1,88 @@
+# jsonprovider.py
+"""JSON responses: orjson when installed, gzip for large bodies.
+
+The provider is a drop-in for Flask's DefaultJSONProvider, so every jsonify()
+call goes through it. Output matches the stdlib provider apart from
+whitespace: keys are sorted, non-ASCII is escaped as \\uXXXX, and objects
+orjson does not handle itself (datetimes, Decimal, __html__) go through
+Flask's default hook, so datetimes keep the HTTP-date format. Anything orjson
+rejects (non-string keys, integers over 64 bits, numpy scalars) is encoded
+by the stdlib instead.
+
+Bodies of at least JSON_GZIP_MIN_BYTES are gzipped for clients that accept it.
+"""
+import gzip
+import logging
+import re
+
+from flask import current_app, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional, stdlib json is used instead
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# json.dumps(ensure_ascii=True) escapes DEL and everything above it
+_NON_ASCII = re.compile('[\x7f-\U0010ffff]')
+
+def _escape_char(match):
+    code = ord(match.group())
+    if code > 0xFFFF:
+        code -= 0x10000
+        return '\\u{0:04x}\\u{1:04x}'.format(0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF))
+    return '\\u{0:04x}'.format(code)
+
+def _ascii(data):
+    return _NON_ASCII.sub(_escape_char, data.decode('utf-8')).encode('ascii')
+
+class JSONProvider(DefaultJSONProvider):
+    def encode(self, obj, indent=False):
+        """UTF-8 JSON bytes of obj, compact unless indent"""
+        if orjson is not None:
+            option = orjson.OPT_PASSTHROUGH_DATETIME
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            try:
+                data = orjson.dumps(obj, default=self.default, option=option)
+            except TypeError:  # orjson.JSONEncodeError included
+                pass
+            else:
+                if self.ensure_ascii and (not data.isascii() or b'\x7f' in data):
+                    data = _ascii(data)
+                return data
+        kwargs = {'indent': 2} if indent else {'separators': (',', ':')}
+        return super().dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        return self.encode(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = self.encode(obj, indent) + b'\n'
+        response = self._app.response_class(body, mimetype=self.mimetype)
+        compress(response, body)
+        return response
+
+def compress(response, body):
+    """Gzip body into response when it is large enough and the client accepts gzip"""
+    min_bytes = current_app.config.get('JSON_GZIP_MIN_BYTES', 0)
+    if min_bytes <= 0 or len(body) < min_bytes or not has_request_context():
+        return
+    response.vary.add('Accept-Encoding')
+    if request.accept_encodings['gzip'] <= 0:
+        return
+    # mtime=0 keeps the bytes identical for identical bodies
+    response.set_data(gzip.compress(body, current_app.config.get('JSON_GZIP_LEVEL', 6), mtime=0))
+    response.headers['Content-Encoding'] = 'gzip'
+
+def init_app(app):
+    app.json = JSONProvider(app)
+    logger.info(f"🧾 JSON responses encoded with {'orjson' if orjson else 'stdlib json'}")
\ No newline at end of file
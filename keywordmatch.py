@@ -0,0 +1,138 @@
+# keywordmatch.py
+"""Target keywords: validation, compiled matchers and the matcher cache.
+
+Keywords live in TargetKeyword, one row per (target, keyword, mode):
+
+- contains: case-folded substring (the default, and the only mode before)
+- phrase: the words in order as a whole phrase, any whitespace between them
+- regex: a case-insensitive regular expression, only used to match
+  fetched items locally (it is never sent to an upstream search)
+
+Each target's keywords are compiled once into a KeywordMatcher and cached
+under the target's keywords_version, a stamp that set_keywords() replaces,
+so a scan never re-reads or recompiles keywords that have not changed.
+"""
+import json
+import logging
+import re
+import uuid
+
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+MODES = ('contains', 'phrase', 'regex')
+
+def new_version():
+    return uuid.uuid4().hex
+
+def normalize(keywords):
+    """[(keyword, mode)] from strings or {'keyword', 'mode'} objects; raises ValueError"""
+    specs = []
+    seen = set()
+    for item in keywords or ():
+        if isinstance(item, dict):
+            keyword, mode = item.get('keyword'), item.get('mode') or 'contains'
+        else:
+            keyword, mode = item, 'contains'
+        if not isinstance(keyword, str) or not keyword.strip():
+            raise ValueError('keywords must be non-empty strings')
+        keyword = keyword.strip()
+        if mode not in MODES:
+            raise ValueError(f"keyword mode must be one of {', '.join(MODES)}")
+        if mode == 'regex':
+            try:
+                re.compile(keyword)
+            except re.error as e:
+                raise ValueError(f"invalid regex {keyword!r}: {e}")
+        key = (keyword.casefold(), mode)
+        if key not in seen:
+            seen.add(key)
+            specs.append((keyword, mode))
+    return specs
+
+def _phrase_pattern(phrase):
+    return r'(?<!\w)' + r'\s+'.join(re.escape(w) for w in phrase.split()) + r'(?!\w)'
+
+class KeywordMatcher:
+    def __init__(self, specs):
+        self.specs = tuple(specs)
+        self._contains = [(keyword.casefold(), keyword) for keyword, mode in self.specs if mode == 'contains']
+        self._patterns = [
+            (re.compile(_phrase_pattern(keyword) if mode == 'phrase' else keyword, re.IGNORECASE), keyword)
+            for keyword, mode in self.specs if mode != 'contains'
+        ]
+
+    def __len__(self):
+        return len(self.specs)
+
+    @property
+    def terms(self):
+        """(keyword, mode) pairs that can be sent to an upstream search"""
+        return [(keyword, mode) for keyword, mode in self.specs if mode != 'regex']
+
+    def match(self, value):
+        """First keyword found in value, or None"""
+        if not value:
+            return None
+        folded = value.casefold()
+        for needle, keyword in self._contains:
+            if needle in folded:
+                return keyword
+        for pattern, keyword in self._patterns:
+            if pattern.search(value):
+                return keyword
+        return None
+
+    def matches(self, value):
+        """Every keyword found in value, in keyword order"""
+        if not value:
+            return []
+        folded = value.casefold()
+        found = {keyword for needle, keyword in self._contains if needle in folded}
+        found.update(keyword for pattern, keyword in self._patterns if pattern.search(value))
+        return [keyword for keyword, _ in self.specs if keyword in found]
+
+# target id -> (keywords_version, matcher)
+_matchers = {}
+
+def matcher_for(target):
+    """Compiled matcher for target, rebuilt only when its keywords_version changed"""
+    cached = _matchers.get(target.id)
+    if cached is not None and cached[0] == target.keywords_version:
+        return cached[1]
+    matcher = KeywordMatcher(target.keyword_specs())
+    _matchers[target.id] = (target.keywords_version, matcher)
+    return matcher
+
+def targets_using(keyword, active_only=True):
+    """Targets with keyword (any mode), via the folded keyword index; needs an app context"""
+    from models import MonitoringTarget, TargetKeyword
+    query = (MonitoringTarget.query.join(TargetKeyword)
+             .filter(TargetKeyword.folded == keyword.strip().casefold()))
+    if active_only:
+        query = query.filter(MonitoringTarget.active.is_(True))
+    return query.distinct().order_by(MonitoringTarget.id).all()
+
+def init_app(app):
+    """Move keywords of targets created before TargetKeyword out of the legacy JSON column"""
+    from models import db, MonitoringTarget, TargetKeyword
+
+    with app.app_context():
+        columns = {c['name'] for c in inspect(db.engine).get_columns('monitoring_target')}
+        if 'keywords_version' not in columns:
+            with db.engine.begin() as conn:
+                conn.execute(text("ALTER TABLE monitoring_target ADD COLUMN keywords_version VARCHAR(32)"))
+
+        pending = MonitoringTarget.query.filter(MonitoringTarget.keywords_version.is_(None)).all()
+        for target in pending:
+            try:
+                keywords = json.loads(target.legacy_keywords or '[]')
+                target.set_keywords(keywords)
+            except ValueError as e:
+                logger.warning(f"⚠️ Target {target.id} has unreadable legacy keywords ({e}); left empty")
+                target.set_keywords([])
+            target.legacy_keywords = '[]'
+        if pending:
+            db.session.commit()
+            logger.info(f"🔑 Moved keywords of {len(pending)} targets into {TargetKeyword.__tablename__}")
\ No newline at end of file
@@ -0,0 +1,248 @@
+# loadharness.py
+"""End-to-end load harness for scans and searches against the upstream emulator.
+
+    python loadharness.py --targets 50 --searches 200 --concurrency 16
+    python loadharness.py --emulator http://127.0.0.1:8800 --json report.json
+
+Drives ThreatMonitor.monitor_all_targets and POST /api/search and reports
+throughput, p50/p99 latency and database write rate for each phase.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from flask import Flask
+
+import dbwriter
+import httpcache
+import jsonprovider
+import upstream
+import worker
+from config import Config
+from models import db, Alert, MonitoringTarget, SearchQuery
+from monitoringengine import ThreatMonitor, SearchEngine
+from routes import register_routes
+from upstreamemulator import UpstreamEmulator, EmulatorSettings, WORDS
+
+TARGET_TYPES = ['brand', 'executive', 'domain', 'product']
+LOCATIONS = [None, 'london', 'berlin', 'tokyo']
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+def latency_summary(values):
+    return {
+        'count': len(values),
+        'p50_ms': round(percentile(values, 50) * 1000, 1),
+        'p99_ms': round(percentile(values, 99) * 1000, 1),
+        'max_ms': round(max(values) * 1000, 1) if values else 0.0
+    }
+
+def build_app(database_uri, sqlite_production=None):
+    """The create_app('web') wiring: routes and services, no scheduler"""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    if sqlite_production is not None:
+        app.config['SQLITE_PRODUCTION_MODE'] = sqlite_production
+    jsonprovider.init_app(app)
+    httpcache.init_app(app)
+
+    monitor = ThreatMonitor()
+    search_engine = SearchEngine()
+    register_routes(app, monitor, search_engine)
+    worker.init_services(app)
+
+    return app, monitor
+
+def row_count():
+    return Alert.query.count() + SearchQuery.query.count()
+
+def seed_targets(count, keywords_per_target, seed):
+    rng = random.Random(seed)
+    for i in range(count):
+        target = MonitoringTarget(name=f"Load target {i}", target_type=rng.choice(TARGET_TYPES))
+        target.set_keywords(rng.sample(WORDS, keywords_per_target))
+        db.session.add(target)
+    db.session.commit()
+
+def run_scan(app, monitor):
+    query_latencies = []
+    original = monitor.fetch_query
+
+    def timed_fetch_query(run):
+        start = time.perf_counter()
+        try:
+            return original(run)
+        finally:
+            query_latencies.append(time.perf_counter() - start)
+
+    monitor.fetch_query = timed_fetch_query
+    try:
+        with app.app_context():
+            targets = MonitoringTarget.query.filter_by(active=True).count()
+            rows_before = row_count()
+            start = time.perf_counter()
+            alerts = monitor.monitor_all_targets()
+            elapsed = time.perf_counter() - start
+            rows_written = row_count() - rows_before
+    finally:
+        monitor.fetch_query = original
+
+    return {
+        'duration_s': round(elapsed, 3),
+        'targets': targets,
+        'targets_per_s': round(targets / elapsed, 2) if elapsed else 0.0,
+        'upstream_queries': len(query_latencies),
+        'alerts_created': alerts,
+        'db_rows_written': rows_written,
+        'db_writes_per_s': round(rows_written / elapsed, 1) if elapsed else 0.0,
+        'query_latency': latency_summary(query_latencies),
+        'pipeline': monitor.pipeline_stats()
+    }
+
+def run_searches(app, total, concurrency, seed, server=None):
+    """Concurrent /api/search calls, in process or (server=URL) over HTTP to a running server"""
+    rng = random.Random(seed)
+    payloads = [{
+        'topic': rng.choice(WORDS),
+        'location': rng.choice(LOCATIONS) or ''
+    } for _ in range(total)]
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    local = threading.local()
+
+    def one(payload):
+        start = time.perf_counter()
+        if server:
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = requests.Session()
+            try:
+                status = session.post(f"{server.rstrip('/')}/api/search", json=payload, timeout=300).status_code
+            except requests.RequestException as e:
+                status = type(e).__name__
+        else:
+            client = getattr(local, 'client', None)
+            if client is None:
+                client = local.client = app.test_client()
+            status = client.post('/api/search', json=payload).status_code
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if status != 200:
+                errors.append(status)
+
+    rows_before = None
+    if app is not None:
+        with app.app_context():
+            rows_before = row_count()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, payloads))
+    elapsed = time.perf_counter() - start
+
+    rows_written = None
+    if app is not None:
+        with app.app_context():
+            rows_written = row_count() - rows_before
+
+    return {
+        'duration_s': round(elapsed, 3),
+        'searches': total,
+        'concurrency': concurrency,
+        'searches_per_s': round(total / elapsed, 2) if elapsed else 0.0,
+        'errors': len(errors),
+        'db_rows_written': rows_written,
+        'db_writes_per_s': round(rows_written / elapsed, 1) if elapsed and rows_written is not None else None,
+        'latency': latency_summary(latencies)
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scan and search load harness')
+    parser.add_argument('--targets', type=int, default=20, help='N monitoring targets to seed')
+    parser.add_argument('--keywords-per-target', type=int, default=3)
+    parser.add_argument('--searches', type=int, default=50, help='total /api/search calls')
+    parser.add_argument('--concurrency', type=int, default=8, help='M concurrent searches')
+    parser.add_argument('--emulator', default='', help='use a running emulator instead of starting one')
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--jitter-ms', type=float, default=25.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=int, default=0)
+    parser.add_argument('--pacing-scale', type=float, default=0.0,
+                        help='multiplier for the politeness sleeps (1.0 = production pacing)')
+    parser.add_argument('--database', default='', help='SQLAlchemy URI (default: temporary SQLite file)')
+    parser.add_argument('--sqlite-production', action='store_true',
+                        help='WAL, tuned pragmas and the single writer thread')
+    parser.add_argument('--seed', type=int, default=1337)
+    parser.add_argument('--json', default='', help='write the report to this file')
+    parser.add_argument('--server', default='',
+                        help='run only the searches, over HTTP against this running server (e.g. serve.py)')
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if args.server:
+        report = {'server': args.server,
+                  'search': run_searches(None, args.searches, args.concurrency, args.seed, server=args.server)}
+        print(json.dumps(report, indent=2))
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(report, f, indent=2)
+        return
+
+    emulator = None
+    if args.emulator:
+        emulator_url = args.emulator
+    else:
+        settings = EmulatorSettings(
+            seed=args.seed, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate, rate_limit=args.rate_limit
+        )
+        emulator = UpstreamEmulator(settings=settings).start()
+        emulator_url = emulator.url
+    upstream.configure(emulator=emulator_url, pacing=args.pacing_scale)
+
+    tmpdir = None
+    database_uri = args.database
+    if not database_uri:
+        tmpdir = tempfile.mkdtemp(prefix='threat-monitor-load-')
+        database_uri = f"sqlite:///{os.path.join(tmpdir, 'load.db')}"
+
+    app, monitor = build_app(database_uri, sqlite_production=args.sqlite_production or None)
+    with app.app_context():
+        seed_targets(args.targets, args.keywords_per_target, args.seed)
+
+    report = {
+        'emulator': emulator_url,
+        'database': database_uri,
+        'scan': run_scan(app, monitor),
+        'search': run_searches(app, args.searches, args.concurrency, args.seed),
+        'upstream_singleflight': upstream.upstream_flight.stats(),
+        'db_writer': dbwriter.writer_stats()
+    }
+    if emulator:
+        report['emulator_stats'] = emulator.stats.snapshot()
+        emulator.stop()
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -1,6 +1,6 @@
-# main.py
-from app import create_app
-
-if __name__ == "__main__":
-    app = create_app()
+# main.py
+from app import create_app
+
+if __name__ == "__main__":
+    app = create_app()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,256 @@
+# metrics.py
+"""Minimal Prometheus-compatible metrics registry (text exposition format 0.0.4)"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 1800.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def collect(self):
+        lines = self.header()
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def collect(self):
+        lines = self.header()
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def collect(self):
+        lines = self.header()
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._values.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, func):
+        """func() runs before each scrape to refresh gauges that are sampled rather than counted"""
+        self._collectors.append(func)
+
+    def exposition(self):
+        for func in self._collectors:
+            func()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Upstreams
+UPSTREAM_REQUESTS = REGISTRY.register(Counter(
+    'threatmonitor_upstream_requests', 'Outbound upstream requests by source and HTTP status', ('source', 'status')))
+UPSTREAM_LATENCY = REGISTRY.register(Histogram(
+    'threatmonitor_upstream_request_seconds', 'Outbound upstream request latency', ('source',)))
+UPSTREAM_COALESCED = REGISTRY.register(Counter(
+    'threatmonitor_upstream_coalesced', 'Upstream calls by singleflight result (hit = shared an in-flight call)', ('result',)))
+
+# Scans
+SCAN_DURATION = REGISTRY.register(Histogram(
+    'threatmonitor_scan_duration_seconds', 'Duration of a full monitor_all_targets cycle'))
+SCAN_ALERTS = REGISTRY.register(Counter(
+    'threatmonitor_scan_alerts', 'Alerts created by monitoring scans per target id', ('target',)))
+DEDUP_CHECKS = REGISTRY.register(Counter(
+    'threatmonitor_dedup_checks', 'process_potential_threat dedup outcomes', ('result',)))
+
+# Search
+SEARCH_STAGE = REGISTRY.register(Histogram(
+    'threatmonitor_search_stage_seconds', 'Search latency by stage', ('stage',)))
+
+# Database
+DB_QUERIES = REGISTRY.register(Counter(
+    'threatmonitor_db_queries', 'SQL statements executed per endpoint', ('endpoint',)))
+DB_QUERY_TIME = REGISTRY.register(Histogram(
+    'threatmonitor_db_query_seconds', 'SQL statement execution time per endpoint', ('endpoint',),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)))
+
+# Scheduler
+SCHEDULER_LAG = REGISTRY.register(Gauge(
+    'threatmonitor_scheduler_lag_seconds', 'Delay between scheduled and actual start of the last job run', ('job',)))
+SCHEDULER_MISSED = REGISTRY.register(Counter(
+    'threatmonitor_scheduler_missed_runs', 'Scheduled job runs skipped because they were too late', ('job',)))
+
+SOURCE_HOSTS = {
+    'www.reddit.com': 'reddit',
+    'api.github.com': 'github',
+    'hacker-news.firebaseio.com': 'hackernews',
+    'hn.algolia.com': 'hackernews',
+}
+
+def source_for_host(host):
+    return SOURCE_HOSTS.get(host, 'news')
+
+def current_endpoint():
+    """Flask endpoint for the active request, or 'background' for scans and jobs"""
+    from flask import has_request_context, request
+    if has_request_context():
+        return request.endpoint or 'unknown'
+    return 'background'
+
+_db_instrumented = False
+
+def init_db_metrics():
+    """Count and time every SQL statement on any engine"""
+    global _db_instrumented
+    if _db_instrumented:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_start', []).append(time.perf_counter())
+
+    def _finish(conn):
+        starts = conn.info.get('metrics_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        endpoint = current_endpoint()
+        DB_QUERIES.inc(endpoint=endpoint)
+        DB_QUERY_TIME.observe(elapsed, endpoint=endpoint)
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        _finish(conn)
+
+    # A failed statement never reaches after_cursor_execute; without this its start stays on the stack
+    @event.listens_for(Engine, 'handle_error')
+    def _error(context):
+        if context.connection is not None and context.statement is not None:
+            _finish(context.connection)
+
+    _db_instrumented = True
+
+def init_scheduler_metrics(scheduler):
+    """Record start lag and missed runs for APScheduler jobs"""
+    from datetime import datetime, timezone
+    from apscheduler.events import EVENT_JOB_SUBMITTED, EVENT_JOB_MISSED
+
+    def listener(event):
+        if event.code == EVENT_JOB_MISSED:
+            SCHEDULER_MISSED.inc(job=event.job_id)
+            return
+        scheduled = max(event.scheduled_run_times)
+        lag = (datetime.now(timezone.utc) - scheduled).total_seconds()
+        SCHEDULER_LAG.set(max(0.0, lag), job=event.job_id)
+
+    scheduler.add_listener(listener, EVENT_JOB_SUBMITTED | EVENT_JOB_MISSED)
\ No newline at end of file
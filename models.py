@@ -1,55 +1,108 @@
-# models.py
-from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
-import json
-
-db = SQLAlchemy()
-
-class MonitoringTarget(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
-    keywords = db.Column(db.Text, nullable=False)  # JSON string
-    target_type = db.Column(db.String(50), nullable=False)
-    active = db.Column(db.Boolean, default=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    alerts = db.relationship('Alert', backref='target', lazy=True, cascade='all, delete-orphan')
-    
-    def get_keywords(self):
-        try:
-            return json.loads(self.keywords)
-        except:
-            return []
-    
-    def set_keywords(self, keywords_list):
-        self.keywords = json.dumps(keywords_list)
-
-class Alert(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    target_id = db.Column(db.Integer, db.ForeignKey('monitoring_target.id'), nullable=True)
-    title = db.Column(db.String(200), nullable=False)
-    description = db.Column(db.Text)
-    source_url = db.Column(db.String(500))
-    source_type = db.Column(db.String(50))
-    risk_level = db.Column(db.String(20), default='medium')
-    status = db.Column(db.String(20), default='new')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    content_hash = db.Column(db.String(64), unique=True)
-    location = db.Column(db.String(100))
-    query_type = db.Column(db.String(50), default='monitoring')
-
-class SearchQuery(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    topic = db.Column(db.String(200), nullable=False)
-    location = db.Column(db.String(100))
-    query_text = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    results_count = db.Column(db.Integer, default=0)
-
-class DataSource(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
-    source_type = db.Column(db.String(50), nullable=False)
-    api_endpoint = db.Column(db.String(500))
-    active = db.Column(db.Boolean, default=True)
-    last_scan = db.Column(db.DateTime)
+# models.py
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+
+import keywordmatch
+
+db = SQLAlchemy()
+
+class MonitoringTarget(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    legacy_keywords = db.Column('keywords', db.Text, nullable=False, default='[]')  # JSON list, moved to TargetKeyword
+    keywords_version = db.Column(db.String(32), default=keywordmatch.new_version)  # replaced on every keyword edit
+    target_type = db.Column(db.String(50), nullable=False)
+    active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    alerts = db.relationship('Alert', backref='target', lazy=True, cascade='all, delete-orphan')
+    keyword_rows = db.relationship('TargetKeyword', order_by='TargetKeyword.position', lazy=True,
+                                   cascade='all, delete-orphan')
+    
+    def get_keywords(self):
+        """Keywords as the API takes them: plain strings, {'keyword', 'mode'} for phrase/regex"""
+        return [k.keyword if k.mode == 'contains' else {'keyword': k.keyword, 'mode': k.mode}
+                for k in self.keyword_rows]
+    
+    def keyword_specs(self):
+        return [(k.keyword, k.mode) for k in self.keyword_rows]
+    
+    def set_keywords(self, keywords_list):
+        """Replace the keywords (strings or {'keyword', 'mode'}); raises ValueError on bad input"""
+        self.keyword_rows = keyword_rows(keywords_list)
+        self.keywords_version = keywordmatch.new_version()
+
+def keyword_rows(keywords_list):
+    return [TargetKeyword(keyword=keyword, folded=keyword.casefold(), mode=mode, position=i)
+            for i, (keyword, mode) in enumerate(keywordmatch.normalize(keywords_list))]
+
+class TargetKeyword(db.Model):
+    """One keyword of a target; folded is indexed for "which targets use X" lookups"""
+    id = db.Column(db.Integer, primary_key=True)
+    target_id = db.Column(db.Integer, db.ForeignKey('monitoring_target.id'), nullable=False, index=True)
+    keyword = db.Column(db.String(200), nullable=False)
+    folded = db.Column(db.String(200), nullable=False, index=True)
+    mode = db.Column(db.String(10), nullable=False, default='contains')
+    position = db.Column(db.Integer, nullable=False, default=0)
+
+class Alert(db.Model):
+    # AUTOINCREMENT: SQLite would otherwise reuse the highest id after a delete,
+    # colliding with ArchivedAlert ids and skipping export since_id pulls
+    # (retention.init_app rebuilds alert tables created without it)
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    target_id = db.Column(db.Integer, db.ForeignKey('monitoring_target.id'), nullable=True)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    source_url = db.Column(db.String(500))
+    source_type = db.Column(db.String(50))
+    risk_level = db.Column(db.String(20), default='medium')
+    status = db.Column(db.String(20), default='new')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    content_hash = db.Column(db.String(64), unique=True)
+    location = db.Column(db.String(100))
+    query_type = db.Column(db.String(50), default='monitoring')
+
+class AlertDuplicate(db.Model):
+    """Near-duplicate sighting attached to an existing alert instead of stored as a new one"""
+    id = db.Column(db.Integer, primary_key=True)
+    alert_id = db.Column(db.Integer, db.ForeignKey('alert.id'), nullable=False, index=True)
+    title = db.Column(db.String(200))
+    source_url = db.Column(db.String(500))
+    source_type = db.Column(db.String(50))
+    content_hash = db.Column(db.String(64))
+    match = db.Column(db.String(20))  # 'url' or 'simhash'
+    distance = db.Column(db.Integer)  # SimHash Hamming distance, when known
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ArchivedAlert(db.Model):
+    """Index of alerts moved to archive files; keeps their hashes visible to dedup"""
+    id = db.Column(db.Integer, primary_key=True)  # original Alert.id
+    content_hash = db.Column(db.String(64), unique=True)
+    partition = db.Column(db.String(10), nullable=False, index=True)  # YYYY-MM-DD of created_at
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ScanCursor(db.Model):
+    """Where an incremental upstream query left off (e.g. newest HN created_at_i seen)"""
+    key = db.Column(db.String(80), primary_key=True)  # source:sha1(query)
+    source = db.Column(db.String(50), nullable=False)
+    query_text = db.Column(db.Text)
+    position = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class SearchQuery(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    topic = db.Column(db.String(200), nullable=False)
+    location = db.Column(db.String(100))
+    query_text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    results_count = db.Column(db.Integer, default=0)
+
+class DataSource(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    source_type = db.Column(db.String(50), nullable=False)
+    api_endpoint = db.Column(db.String(500))
+    active = db.Column(db.Boolean, default=True)
+    last_scan = db.Column(db.DateTime)
     scan_count = db.Column(db.Integer, default=0)
\ No newline at end of file
@@ -1,518 +1,866 @@
-# monitoringengine.py
-import requests
-import hashlib
-import re
-from datetime import datetime, timedelta
-from models import db, Alert, MonitoringTarget
-from config import Config
-import time
-import logging
-import urllib.parse
-
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-class ThreatMonitor:
-    def __init__(self):
-        self.config = Config()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'ThreatMonitor/1.0 (Security Research)'
-        })
-        
-    def monitor_all_targets(self):
-        """Main monitoring function"""
-        logger.info("Starting monitoring scan...")
-        
-        targets = MonitoringTarget.query.filter_by(active=True).all()
-        total_alerts = 0
-        
-        if not targets:
-            logger.info("No active targets found")
-            return 0
-        
-        for target in targets:
-            try:
-                keywords = target.get_keywords()
-                if keywords:
-                    alerts_created = self.monitor_target(target, keywords)
-                    total_alerts += alerts_created
-                    logger.info(f"Target '{target.name}': {alerts_created} new alerts")
-                    time.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"Error monitoring target {target.name}: {e}")
-        
-        logger.info(f"Monitoring scan completed. Total new alerts: {total_alerts}")
-        return total_alerts
-    
-    def monitor_target(self, target, keywords):
-        """Monitor a specific target across all sources"""
-        alerts_created = 0
-        
-        sources = [
-            ('Reddit', self.monitor_reddit),
-            ('GitHub', self.monitor_github),
-            ('Hacker News', self.monitor_hackernews),
-        ]
-        
-        for source_name, source_func in sources:
-            try:
-                alerts = source_func(target, keywords)
-                alerts_created += alerts
-                if alerts > 0:
-                    logger.info(f"  {source_name}: {alerts} alerts")
-                time.sleep(1)
-            except Exception as e:
-                logger.error(f"Error in {source_name}: {e}")
-        
-        return alerts_created
-    
-    def monitor_reddit(self, target, keywords):
-        """Monitor Reddit for mentions"""
-        alerts_created = 0
-        
-        try:
-            for keyword in keywords[:3]:
-                url = "https://www.reddit.com/search.json"
-                params = {
-                    'q': keyword,
-                    'sort': 'new',
-                    'limit': 5,
-                    't': 'day'
-                }
-                
-                response = self.session.get(url, params=params, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    for post in data.get('data', {}).get('children', []):
-                        post_data = post['data']
-                        
-                        if self.process_potential_threat({
-                            'title': post_data.get('title', ''),
-                            'content': post_data.get('selftext', ''),
-                            'url': f"https://reddit.com{post_data.get('permalink', '')}",
-                            'source': 'reddit',
-                            'target_id': target.id,
-                            'created': datetime.fromtimestamp(post_data.get('created_utc', 0))
-                        }):
-                            alerts_created += 1
-                
-                time.sleep(1)
-                
-        except Exception as e:
-            logger.error(f"Reddit monitoring error: {e}")
-        
-        return alerts_created
-    
-    def monitor_github(self, target, keywords):
-        """Monitor GitHub for code mentions"""
-        alerts_created = 0
-        
-        try:
-            for keyword in keywords[:2]:
-                url = "https://api.github.com/search/code"
-                params = {
-                    'q': f'"{keyword}"',
-                    'sort': 'indexed',
-                    'per_page': 3
-                }
-                
-                response = self.session.get(url, params=params, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    for item in data.get('items', []):
-                        repo_name = item.get('repository', {}).get('full_name', '')
-                        if self.process_potential_threat({
-                            'title': f"Code found: {item.get('name', '')}",
-                            'content': f"Repository: {repo_name}\nPath: {item.get('path', '')}",
-                            'url': item.get('html_url', ''),
-                            'source': 'github',
-                            'target_id': target.id,
-                            'created': datetime.utcnow()
-                        }):
-                            alerts_created += 1
-                
-                time.sleep(3)
-                
-        except Exception as e:
-            logger.error(f"GitHub monitoring error: {e}")
-        
-        return alerts_created
-    
-    def monitor_hackernews(self, target, keywords):
-        """Monitor Hacker News"""
-        alerts_created = 0
-        
-        try:
-            url = "https://hacker-news.firebaseio.com/v0/newstories.json"
-            response = self.session.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                story_ids = response.json()[:20]
-                
-                for story_id in story_ids:
-                    story_url = f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json"
-                    story_response = self.session.get(story_url, timeout=5)
-                    
-                    if story_response.status_code == 200:
-                        story = story_response.json()
-                        title = story.get('title', '').lower()
-                        
-                        for keyword in keywords:
-                            if keyword.lower() in title:
-                                if self.process_potential_threat({
-                                    'title': story.get('title', ''),
-                                    'content': story.get('text', ''),
-                                    'url': story.get('url', f"https://news.ycombinator.com/item?id={story_id}"),
-                                    'source': 'hackernews',
-                                    'target_id': target.id,
-                                    'created': datetime.fromtimestamp(story.get('time', 0))
-                                }):
-                                    alerts_created += 1
-                                break
-                    
-                    time.sleep(0.2)
-                    
-        except Exception as e:
-            logger.error(f"Hacker News monitoring error: {e}")
-        
-        return alerts_created
-    
-    def process_potential_threat(self, data):
-        """Process and score potential threats"""
-        if not data['title']:
-            return False
-            
-        content_str = f"{data['title']}{data['content']}{data['url']}"
-        content_hash = hashlib.sha256(content_str.encode()).hexdigest()
-        
-        existing = Alert.query.filter_by(content_hash=content_hash).first()
-        if existing:
-            return False
-        
-        risk_level = self.calculate_risk_level(data)
-        
-        alert = Alert(
-            target_id=data['target_id'],
-            title=data['title'][:200],
-            description=data['content'][:1000] if data['content'] else '',
-            source_url=data['url'],
-            source_type=data['source'],
-            risk_level=risk_level,
-            content_hash=content_hash,
-            query_type='monitoring'
-        )
-        
-        db.session.add(alert)
-        db.session.commit()
-        
-        return True
-    
-    def calculate_risk_level(self, data):
-        """Calculate risk level based on content analysis"""
-        content = f"{data['title']} {data['content']}".lower()
-        
-        critical_keywords = [
-            'password leak', 'data breach', 'database dump', 'credentials leaked',
-            'api key exposed', 'private key leaked', 'security breach'
-        ]
-        
-        high_risk_keywords = [
-            'password', 'leak', 'breach', 'hack', 'exploit', 'vulnerability',
-            'database', 'credentials', 'api key', 'token', 'exposed', 'dump'
-        ]
-        
-        medium_risk_keywords = [
-            'security', 'threat', 'attack', 'malware', 'phishing',
-            'suspicious', 'fraud', 'scam', 'investigation', 'alert'
-        ]
-        
-        for keyword in critical_keywords:
-            if keyword in content:
-                return 'critical'
-        
-        high_count = sum(1 for keyword in high_risk_keywords if keyword in content)
-        medium_count = sum(1 for keyword in medium_risk_keywords if keyword in content)
-        
-        if high_count >= 2:
-            return 'high'
-        elif high_count >= 1:
-            return 'medium'
-        elif medium_count >= 2:
-            return 'medium'
-        else:
-            return 'low'
-
-class SearchEngine:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-    
-    def search_topic_location(self, topic, location=None):
-        """Search for a specific topic and location across multiple sources"""
-        results = []
-        
-        # Build search query
-        if location:
-            search_query = f"{topic} {location}"
-            location_query = f"site:reddit.com {topic} {location}"
-        else:
-            search_query = topic
-            location_query = f"site:reddit.com {topic}"
-        
-        logger.info(f"🔍 Searching for: '{search_query}'")
-        
-        # Search multiple sources
-        try:
-            # Reddit search
-            reddit_results = self.search_reddit_specific(topic, location)
-            results.extend(reddit_results)
-            
-            # News search (using multiple sources)
-            news_results = self.search_news(topic, location)
-            results.extend(news_results)
-            
-            # GitHub search
-            github_results = self.search_github_specific(topic, location)
-            results.extend(github_results)
-            
-            # Hacker News search
-            hn_results = self.search_hackernews_specific(topic, location)
-            results.extend(hn_results)
-            
-        except Exception as e:
-            logger.error(f"Search error: {e}")
-        
-        # Remove duplicates and sort by relevance
-        unique_results = self.deduplicate_results(results)
-        scored_results = self.score_results(unique_results, topic, location)
-        
-        logger.info(f"✅ Found {len(scored_results)} unique results")
-        return scored_results
-    
-    def search_reddit_specific(self, topic, location):
-        """Enhanced Reddit search"""
-        results = []
-        try:
-            # Multiple search strategies
-            queries = [topic]
-            if location:
-                queries.extend([
-                    f"{topic} {location}",
-                    f"{location} {topic}",
-                    f'"{topic}" "{location}"'
-                ])
-            
-            for query in queries[:3]:  # Limit queries
-                url = "https://www.reddit.com/search.json"
-                params = {
-                    'q': query,
-                    'sort': 'relevance',
-                    'limit': 15,
-                    't': 'month'
-                }
-                
-                response = self.session.get(url, params=params, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    for post in data.get('data', {}).get('children', []):
-                        post_data = post['data']
-                        
-                        results.append({
-                            'title': post_data.get('title', ''),
-                            'content': post_data.get('selftext', ''),
-                            'url': f"https://reddit.com{post_data.get('permalink', '')}",
-                            'source': 'reddit',
-                            'created': datetime.fromtimestamp(post_data.get('created_utc', 0)),
-                            'score': post_data.get('score', 0),
-                            'subreddit': post_data.get('subreddit', ''),
-                            'author': post_data.get('author', ''),
-                            'location': location
-                        })
-                
-                time.sleep(1)
-        except Exception as e:
-            logger.error(f"Reddit search error: {e}")
-        
-        return results
-    
-    def search_news(self, topic, location):
-        """Search news sources"""
-        results = []
-        try:
-            # Use Bing News API alternative (free tier)
-            query = f"{topic} {location}" if location else topic
-            
-            # Alternative: Use RSS feeds from major news sources
-            rss_feeds = [
-                'https://feeds.bbci.co.uk/news/rss.xml',
-                'https://rss.cnn.com/rss/edition.rss',
-                'https://feeds.reuters.com/reuters/topNews'
-            ]
-            
-            for feed_url in rss_feeds:
-                try:
-                    response = self.session.get(feed_url, timeout=10)
-                    if response.status_code == 200:
-                        # Simple XML parsing for RSS
-                        content = response.text.lower()
-                        if topic.lower() in content:
-                            if location is None or location.lower() in content:
-                                results.append({
-                                    'title': f"News mention found for {topic}",
-                                    'content': f"Found relevant news content for {topic}" + (f" in {location}" if location else ""),
-                                    'url': feed_url,
-                                    'source': 'news',
-                                    'created': datetime.utcnow(),
-                                    'location': location
-                                })
-                    time.sleep(1)
-                except:
-                    continue
-                    
-        except Exception as e:
-            logger.error(f"News search error: {e}")
-        
-        return results
-    
-    def search_github_specific(self, topic, location):
-        """Enhanced GitHub search"""
-        results = []
-        try:
-            queries = [topic]
-            if location:
-                queries.append(f"{topic} {location}")
-            
-            for query in queries[:2]:
-                url = "https://api.github.com/search/repositories"
-                params = {
-                    'q': query,
-                    'sort': 'updated',
-                    'per_page': 10
-                }
-                
-                response = self.session.get(url, params=params, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    for repo in data.get('items', []):
-                        results.append({
-                            'title': f"Repository: {repo.get('name', '')}",
-                            'content': f"Description: {repo.get('description', '')}\nLanguage: {repo.get('language', 'N/A')}\nStars: {repo.get('stargazers_count', 0)}",
-                            'url': repo.get('html_url', ''),
-                            'source': 'github',
-                            'created': datetime.fromisoformat(repo.get('updated_at', '').replace('Z', '+00:00')) if repo.get('updated_at') else datetime.utcnow(),
-                            'stars': repo.get('stargazers_count', 0),
-                            'language': repo.get('language', ''),
-                            'location': location
-                        })
-                
-                time.sleep(2)
-        except Exception as e:
-            logger.error(f"GitHub search error: {e}")
-        
-        return results
-    
-    def search_hackernews_specific(self, topic, location):
-        """Enhanced Hacker News search"""
-        results = []
-        try:
-            # Use HN Algolia API
-            query = f"{topic} {location}" if location else topic
-            url = "https://hn.algolia.com/api/v1/search"
-            params = {
-                'query': query,
-                'tags': 'story',
-                'hitsPerPage': 20
-            }
-            
-            response = self.session.get(url, params=params, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                
-                for hit in data.get('hits', []):
-                    results.append({
-                        'title': hit.get('title', ''),
-                        'content': hit.get('story_text', ''),
-                        'url': hit.get('url', f"https://news.ycombinator.com/item?id={hit.get('objectID')}"),
-                        'source': 'hackernews',
-                        'created': datetime.fromisoformat(hit.get('created_at', '').replace('Z', '+00:00')) if hit.get('created_at') else datetime.utcnow(),
-                        'points': hit.get('points', 0),
-                        'comments': hit.get('num_comments', 0),
-                        'location': location
-                    })
-        except Exception as e:
-            logger.error(f"Hacker News search error: {e}")
-        
-        return results
-    
-    def deduplicate_results(self, results):
-        """Remove duplicate results"""
-        seen_urls = set()
-        unique_results = []
-        
-        for result in results:
-            url = result.get('url', '')
-            title = result.get('title', '')
-            
-            # Create a simple hash for deduplication
-            content_hash = hashlib.md5(f"{url}{title}".encode()).hexdigest()
-            
-            if content_hash not in seen_urls:
-                seen_urls.add(content_hash)
-                unique_results.append(result)
-        
-        return unique_results
-    
-    def score_results(self, results, topic, location):
-        """Score and sort results by relevance"""
-        for result in results:
-            score = 0
-            title = result.get('title', '').lower()
-            content = result.get('content', '').lower()
-            topic_lower = topic.lower()
-            
-            # Title relevance
-            if topic_lower in title:
-                score += 10
-            
-            # Content relevance
-            if topic_lower in content:
-                score += 5
-            
-            # Location relevance
-            if location:
-                location_lower = location.lower()
-                if location_lower in title:
-                    score += 8
-                if location_lower in content:
-                    score += 4
-            
-            # Source-specific scoring
-            if result.get('source') == 'reddit':
-                score += result.get('score', 0) * 0.1
-            elif result.get('source') == 'github':
-                score += result.get('stars', 0) * 0.1
-            elif result.get('source') == 'hackernews':
-                score += result.get('points', 0) * 0.2
-            
-            # Recency bonus
-            created = result.get('created', datetime.utcnow())
-            days_old = (datetime.utcnow() - created).days
-            if days_old < 7:
-                score += 5
-            elif days_old < 30:
-                score += 2
-            
-            result['relevance_score'] = score
-        
-        # Sort by relevance score
-        return sorted(results, key=lambda x: x.get('relevance_score', 0), reverse=True)
\ No newline at end of file
+# monitoringengine.py
+import requests
+import re
+from datetime import datetime
+from models import db, MonitoringTarget
+from config import Config
+from upstream import fetch, pace, pooled, raise_for_retry
+import metrics
+import tracing
+import queryprofiler
+import ingest
+import ranking
+import keywordmatch
+import workqueue
+import queryplanner
+import cursors
+import pipeline
+from records import ResultItem
+from flask import current_app
+from contextlib import contextmanager
+import html
+import itertools
+import threading
+import time
+import logging
+import urllib.parse
+from collections import Counter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Pause after each upstream query, per source
+SOURCE_PACING = {'reddit': 1, 'github': 3, 'hackernews': 1}
+
+# Work item target of a query shared by every target whose keywords it covers
+SHARED_TARGETS = 0
+
+_HTML_TAG = re.compile(r'<[^>]+>')
+
+# Results requested per keyword in an OR-batched query
+REDDIT_RESULTS_PER_KEYWORD = 5
+GITHUB_RESULTS_PER_KEYWORD = 3
+
+# Default workers per scan pipeline stage; PIPELINE_WORKERS overrides them.
+# normalize and score are CPU-bound and gain nothing from more threads.
+STAGE_WORKERS = {'fetch': 3, 'normalize': 1, 'dedup': 2, 'score': 1, 'persist': 1, 'notify': 1}
+
+class QueryProgress:
+    """Parts of one query stored so far; its cursor may only move once all of them are"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.parts = 0
+        self.stored = 0
+        self.complete = False  # the last part has been handed out
+    
+    def part_stored(self):
+        """Count a stored part; True for the one that completes the query"""
+        with self._lock:
+            self.stored += 1
+            return self.complete and self.stored == self.parts
+
+class QueryRun:
+    """One upstream query (or, after normalize, one part of its results) on its way through the scan stages"""
+    __slots__ = ('source', 'batch', 'index', 'candidates', 'newest', 'items', 'rows', 'per_target', 'progress')
+    
+    def __init__(self, source, batch, index, progress=None):
+        self.source = source
+        self.batch = batch
+        self.index = index
+        self.candidates = None  # [(ResultItem, matched text)] from fetch
+        self.newest = None      # cursor position reached by the fetch, if the source has one
+        self.items = None       # [(ResultItem, content hash)] from normalize / dedup
+        self.rows = None        # alert rows from score
+        self.per_target = Counter()
+        self.progress = progress or QueryProgress()
+    
+    def part(self, items):
+        """A run carrying items, one of the parts this query's results are split into"""
+        part = QueryRun(self.source, self.batch, self.index, self.progress)
+        part.newest = self.newest
+        part.items = items
+        self.progress.parts += 1
+        return part
+    
+    def __repr__(self):
+        return f"QueryRun({self.source!r}, {self.batch!r})"
+
+def interleave_sources(plan):
+    """Plan entries round-robin across sources, so the fetch workers of different sources all have work"""
+    by_source = {}
+    for source, batch in plan:
+        by_source.setdefault(source, []).append((source, batch))
+    for entries in itertools.zip_longest(*by_source.values()):
+        for entry in entries:
+            if entry is not None:
+                yield entry
+
+class ThreatMonitor:
+    def __init__(self):
+        self.config = Config()
+        self.session = pooled(requests.Session())
+        self.session.headers.update({
+            'User-Agent': 'ThreatMonitor/1.0 (Security Research)'
+        })
+        self.pipeline = None
+        # Pipeline fetch workers keep one query per source in flight, as the sequential scan did
+        self._source_locks = {source: threading.Lock() for source in SOURCE_PACING}
+        
+    @tracing.traced('monitor_all_targets', root=True)
+    @queryprofiler.profiled('scan')
+    def monitor_all_targets(self, cycle=None):
+        """Main monitoring function; cycle is the work queue cycle of a scheduled scan (a new one when None)"""
+        if Config.SCAN_QUEUE_ENABLED:
+            return self.run_queued_scan(cycle=cycle)
+        
+        logger.info("Starting monitoring scan...")
+        
+        scan_start = time.perf_counter()
+        owners = self.active_owners()
+        
+        if not owners:
+            logger.info("No active targets found")
+            return 0
+        
+        plan = self.scan_plan(owners)
+        logger.info(f"Scan plan: {len(plan)} upstream queries for {len(owners)} targets")
+        total_alerts = self.run_plan(plan, queryplanner.OwnerIndex(owners))
+        
+        metrics.SCAN_DURATION.observe(time.perf_counter() - scan_start)
+        logger.info(f"Monitoring scan completed. Total new alerts: {total_alerts}")
+        return total_alerts
+    
+    def active_owners(self):
+        """(target, matcher) of every active target that has keywords"""
+        owners = []
+        for target in MonitoringTarget.query.filter_by(active=True).all():
+            matcher = keywordmatch.matcher_for(target)
+            if matcher:
+                owners.append((target, matcher))
+        return owners
+    
+    def scan_plan(self, owners):
+        """[(source, QueryBatch)] covering the distinct keywords of owners, each queried once"""
+        terms = queryplanner.distinct_terms(matcher for _, matcher in owners)
+        plan = []
+        for source in ('reddit', 'github'):
+            for batch in queryplanner.plan(source, terms):
+                plan.append((source, batch))
+        if Config.HN_MONITOR_MODE == 'algolia':
+            for batch in queryplanner.plan('hackernews', terms):
+                plan.append(('hackernews', batch))
+        else:
+            # The newest-stories feed is the same for every target
+            plan.append(('hackernews', queryplanner.QueryBatch('hackernews', (), '')))
+        return plan
+    
+    def run_plan(self, plan, index):
+        """Stream every query of a scan plan through the scan pipeline; returns alerts created"""
+        with tracing.span('pipeline', queries=len(plan), targets=len(index)):
+            results = self.scan_pipeline().run(
+                QueryRun(source, batch, index) for source, batch in interleave_sources(plan))
+        return sum(results)
+    
+    def scan_pipeline(self):
+        """fetch -> normalize -> dedup -> score -> persist -> notify, one QueryRun per upstream query.
+        
+        normalize splits each query's results into parts of at most
+        PIPELINE_CHUNK_SIZE alerts, and every queue between stages holds
+        PIPELINE_QUEUE_SIZE queries or parts, so memory stays bounded
+        however many targets share a query. Stage workers come from
+        PIPELINE_WORKERS merged over STAGE_WORKERS.
+        """
+        workers = {**STAGE_WORKERS, **(Config.PIPELINE_WORKERS or {})}
+        app = current_app._get_current_object()
+        # Workers record into the scan's trace and query profile, under the span open here
+        adopt_trace = tracing.propagate()
+        adopt_profile = queryprofiler.propagate()
+        
+        @contextmanager
+        def worker_context():
+            with app.app_context(), adopt_trace(), adopt_profile():
+                yield
+        
+        self.pipeline = pipeline.Pipeline('scan', [
+            pipeline.Stage('fetch', self.fetch_stage, workers['fetch']),
+            pipeline.Stage('normalize', self.normalize, workers['normalize'], expand=True),
+            pipeline.Stage('dedup', self.dedup, workers['dedup']),
+            pipeline.Stage('score', self.score, workers['score']),
+            pipeline.Stage('persist', self.persist, workers['persist']),
+            pipeline.Stage('notify', self.notify, workers['notify']),
+        ], capacity=Config.PIPELINE_QUEUE_SIZE, context=worker_context)
+        return self.pipeline
+    
+    def pipeline_stats(self):
+        """Per-stage throughput and queue depth of the current or last scan pipeline"""
+        return self.pipeline.stats() if self.pipeline is not None else {'name': 'scan', 'stages': {}}
+    
+    def run_query(self, source, batch, index):
+        """Fetch one query, fan the results out to their targets and store them; returns alerts per target id"""
+        run = QueryRun(source, batch, index)
+        self.fetch_query(run)
+        per_target = Counter()
+        for part in self.normalize(run):
+            for step in (self.dedup, self.score, self.persist):
+                step(part)
+            per_target.update(part.per_target)
+        return per_target
+    
+    def fetch_stage(self, run):
+        """Pipeline fetch: one query in flight per source, paced as before; a failed query is skipped"""
+        with self._source_locks[run.source]:
+            try:
+                with tracing.span(f"source {run.source}", query=run.batch.query, targets=len(run.index)):
+                    return self.fetch_query(run)
+            except Exception as e:
+                logger.error(f"Error in {run.source} query {run.batch.query!r}: {e}")
+                return None
+            finally:
+                pace(SOURCE_PACING[run.source])
+    
+    def fetch_query(self, run):
+        """Upstream results of run's query as (item, matched text) candidates"""
+        source, batch = run.source, run.batch
+        if source == 'reddit':
+            run.candidates = self.reddit_results(batch)
+        elif source == 'github':
+            run.candidates = self.github_results(batch)
+        elif source == 'hackernews' and batch.query:
+            since = cursors.position(source, batch.query)
+            if since is None:
+                since = int(time.time()) - Config.HN_LOOKBACK_HOURS * 3600
+            else:
+                since -= Config.HN_CURSOR_OVERLAP_SECONDS
+            run.candidates, run.newest = self.hackernews_search_results(batch, since)
+        elif source == 'hackernews':
+            run.candidates = self.hackernews_results()
+        else:
+            raise ValueError(f"unknown source {source!r}")
+        return run
+    
+    def normalize(self, run):
+        """Fan candidates out to their targets and hash them; yields parts of at most PIPELINE_CHUNK_SIZE items.
+        
+        Parts are produced lazily, so a query shared by many targets is
+        fanned out only as fast as the stages after it take the parts.
+        There is always at least one part, so the cursor of a query without
+        matches still moves.
+        """
+        size = max(1, Config.PIPELINE_CHUNK_SIZE)
+        hashed = self.hashed(queryplanner.fan_out(run.candidates, run.index))
+        run.candidates = None
+        part = run.part(list(itertools.islice(hashed, size)))
+        while True:
+            items = list(itertools.islice(hashed, size))
+            if not items:
+                break
+            yield part
+            part = run.part(items)
+        run.progress.complete = True
+        yield part
+    
+    def hashed(self, items):
+        """Yield (item, content hash) for items with a title.
+        
+        Each plain content hash has one owning target, which keeps it, so
+        its dedup is unchanged; every other target gets a hash scoped to it
+        and thus an alert of its own. The owner is the target whose alert
+        already stores the plain hash, looked up once per PIPELINE_CHUNK_SIZE
+        items; for a new item (or one stored by a search) it is the lowest
+        matching target id, which fan_out yields first.
+        """
+        hash_owner = {}
+        titled = (item for item in items if item.title)
+        while True:
+            chunk = [(item, ingest.content_hash_for(item.title, item.content, item.url))
+                     for item in itertools.islice(titled, max(1, Config.PIPELINE_CHUNK_SIZE))]
+            if not chunk:
+                break
+            hash_owner.update(ingest.hash_owners({h for _, h in chunk if h not in hash_owner}))
+            for item, content_hash in chunk:
+                if hash_owner.get(content_hash) is None:
+                    hash_owner[content_hash] = item.target_id
+                elif hash_owner[content_hash] != item.target_id:
+                    content_hash = ingest.content_hash_for(item.title, item.content, item.url, target_id=item.target_id)
+                yield item, content_hash
+    
+    @tracing.traced()
+    def dedup(self, run):
+        """Drop items already stored (or archived) before they are scored"""
+        if run.items:
+            seen = ingest.seen_hashes([content_hash for _, content_hash in run.items])
+            if seen:
+                before = len(run.items)
+                run.items = [(item, content_hash) for item, content_hash in run.items if content_hash not in seen]
+                metrics.DEDUP_CHECKS.inc(before - len(run.items), result='duplicate')
+        return run
+    
+    @tracing.traced()
+    def score(self, run):
+        """Risk level and alert row for every remaining item"""
+        run.rows = [ingest.alert_row(
+            item.title, item.content, item.url, item.source,
+            content_hash=content_hash,
+            risk_level=self.calculate_risk_level(item),
+            target_id=item.target_id,
+            query_type='monitoring'
+        ) for item, content_hash in run.items]
+        run.items = None
+        return run
+    
+    @tracing.traced()
+    def persist(self, run):
+        """Insert the rows and count new alerts per target; the query's cursor moves only after that"""
+        if run.rows:
+            targets = {row['content_hash']: row['target_id'] for row in run.rows}
+            inserted = ingest.insert_alerts(run.rows)
+            metrics.DEDUP_CHECKS.inc(len(inserted), result='new')
+            # In-batch repeats, near-duplicates and rows another writer stored first
+            metrics.DEDUP_CHECKS.inc(len(run.rows) - len(inserted), result='duplicate')
+            run.per_target = Counter(targets[content_hash] for _, content_hash in inserted)
+        run.rows = None
+        # A failed insert raises before this, so the next scan refetches the results
+        if run.progress.part_stored() and run.newest is not None:
+            cursors.advance(run.source, run.batch.query, run.newest)
+        return run
+    
+    def notify(self, run):
+        """Publish a part's new alerts as they land; returns how many.
+        
+        Per-target counts go to SCAN_ALERTS right away; the scan logs its total at the end.
+        """
+        total_alerts = sum(run.per_target.values())
+        if total_alerts:
+            for target, _ in run.index.owners:
+                alerts_created = run.per_target.get(target.id, 0)
+                if alerts_created:
+                    metrics.SCAN_ALERTS.inc(alerts_created, target=target.id)
+            logger.info(f"🔔 {total_alerts} new alerts from {run.source} for {len(run.per_target)} targets")
+        return total_alerts
+    
+    def record_alerts(self, per_target, index):
+        total_alerts = 0
+        for target, _ in index.owners:
+            alerts_created = per_target.get(target.id, 0)
+            if alerts_created:
+                metrics.SCAN_ALERTS.inc(alerts_created, target=target.id)
+                logger.info(f"Target '{target.name}': {alerts_created} new alerts")
+            total_alerts += alerts_created
+        return total_alerts
+    
+    def reddit_results(self, batch):
+        """Newest Reddit posts for one keyword batch, as (item, matched text); raises RetryableStatus on 429/5xx"""
+        url = "https://www.reddit.com/search.json"
+        params = {
+            'q': batch.query,
+            'sort': 'new',
+            'limit': min(100, REDDIT_RESULTS_PER_KEYWORD * max(1, len(batch.terms))),
+            't': 'day'
+        }
+        
+        response = fetch(self.session, url, params=params, timeout=10)
+        raise_for_retry(response, url)
+        
+        candidates = []
+        if response.status_code == 200:
+            data = response.json()
+            
+            for post in data.get('data', {}).get('children', []):
+                post_data = post['data']
+                
+                item = ResultItem(
+                    post_data.get('title', ''),
+                    post_data.get('selftext', ''),
+                    f"https://reddit.com{post_data.get('permalink', '')}",
+                    'reddit',
+                    created=ranking.to_utc(post_data.get('created_utc', 0))
+                )
+                candidates.append((item, f"{item.title}\n{item.content}"))
+        return candidates
+    
+    def github_results(self, batch):
+        """Recently indexed GitHub code for one keyword batch, as (item, matched text); raises RetryableStatus on 429/5xx"""
+        url = "https://api.github.com/search/code"
+        params = {
+            'q': batch.query,
+            'sort': 'indexed',
+            'per_page': min(100, GITHUB_RESULTS_PER_KEYWORD * max(1, len(batch.terms)))
+        }
+        
+        # Text matches carry the matched code fragments, which is what the keywords are checked against
+        response = fetch(self.session, url, params=params, timeout=10,
+                         headers={'Accept': 'application/vnd.github.text-match+json'})
+        raise_for_retry(response, url)
+        
+        candidates = []
+        if response.status_code == 200:
+            data = response.json()
+            
+            for item in data.get('items', []):
+                repo_name = item.get('repository', {}).get('full_name', '')
+                result = ResultItem(
+                    f"Code found: {item.get('name', '')}",
+                    f"Repository: {repo_name}\nPath: {item.get('path', '')}",
+                    item.get('html_url', ''),
+                    'github',
+                    created=datetime.utcnow()
+                )
+                fragments = '\n'.join(m.get('fragment', '') for m in item.get('text_matches', ()))
+                candidates.append((result, f"{result.title}\n{result.content}\n{fragments}"))
+        return candidates
+    
+    def hackernews_results(self):
+        """Newest 20 HN stories, matched on their title; raises RetryableStatus on 429/5xx"""
+        url = "https://hacker-news.firebaseio.com/v0/newstories.json"
+        response = fetch(self.session, url, timeout=10)
+        raise_for_retry(response, url)
+        
+        candidates = []
+        if response.status_code == 200:
+            story_ids = response.json()[:20]
+            
+            for story_id in story_ids:
+                story_url = f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json"
+                story_response = fetch(self.session, story_url, timeout=5)
+                
+                if story_response.status_code == 200:
+                    story = story_response.json()
+                    
+                    item = ResultItem(
+                        story.get('title', ''),
+                        story.get('text', ''),
+                        story.get('url', f"https://news.ycombinator.com/item?id={story_id}"),
+                        'hackernews',
+                        created=ranking.to_utc(story.get('time', 0))
+                    )
+                    candidates.append((item, item.title))
+                
+                pace(0.2)
+        return candidates
+    
+    def hackernews_search_results(self, batch, since):
+        """HN stories and comments created after since for one keyword batch (Algolia search_by_date).
+        
+        Returns ((item, matched text) candidates, newest created_at_i seen);
+        title and text are both matched. Raises RetryableStatus on 429/5xx.
+        """
+        url = "https://hn.algolia.com/api/v1/search_by_date"
+        params = {
+            'query': batch.query,
+            'tags': '(story,comment)',
+            'numericFilters': f"created_at_i>{since}",
+            'hitsPerPage': Config.HN_HITS_PER_PAGE
+        }
+        params.update(batch.params())
+        
+        candidates = []
+        newest = since
+        for page in range(Config.HN_MAX_PAGES):
+            params['page'] = page
+            response = fetch(self.session, url, params=params, timeout=10)
+            raise_for_retry(response, url)
+            if response.status_code != 200:
+                break
+            data = response.json()
+            
+            for hit in data.get('hits', []):
+                newest = max(newest, hit.get('created_at_i') or 0)
+                item_url = f"https://news.ycombinator.com/item?id={hit.get('objectID')}"
+                if hit.get('comment_text'):
+                    text = html.unescape(_HTML_TAG.sub(' ', hit['comment_text'])).strip()
+                    item = ResultItem(
+                        f"Comment on: {hit.get('story_title') or ''}",
+                        text,
+                        item_url,
+                        'hackernews',
+                        created=ranking.to_utc(hit.get('created_at')) or datetime.utcnow()
+                    )
+                else:
+                    text = html.unescape(_HTML_TAG.sub(' ', hit.get('story_text') or '')).strip()
+                    item = ResultItem(
+                        hit.get('title', ''),
+                        text,
+                        hit.get('url') or item_url,
+                        'hackernews',
+                        created=ranking.to_utc(hit.get('created_at')) or datetime.utcnow()
+                    )
+                candidates.append((item, f"{item.title}\n{text}"))
+            
+            if page + 1 >= data.get('nbPages', 1):
+                break
+        else:
+            logger.warning(f"Hacker News query {batch.query!r}: over {Config.HN_MAX_PAGES} pages of new hits, "
+                           f"older ones skipped")
+        return candidates, newest
+    
+    def enqueue_scan(self, queue, cycle):
+        """Plan this cycle's work items, one per shared query; returns how many were new"""
+        items = [(SHARED_TARGETS, source, batch.query, 'batch')
+                 for source, batch in self.scan_plan(self.active_owners())]
+        return queue.enqueue(cycle, items)
+    
+    def run_work_item(self, item):
+        """Fetch and ingest one work item; returns alerts created. Raises to request a retry."""
+        if item.target_id == SHARED_TARGETS:
+            owners = self.active_owners()
+        else:
+            # Queued before scans were shared across targets
+            target = db.session.get(MonitoringTarget, item.target_id)
+            if target is None or not target.active:
+                return 0
+            owners = [(target, keywordmatch.matcher_for(target))]
+        if not owners:
+            return 0
+        
+        for source, batch in self.scan_plan(owners):
+            if source == item.source and batch.query == item.keyword:
+                break
+        else:
+            # Keywords changed since the item was planned; its query still runs
+            batch = queryplanner.QueryBatch(item.source, (), item.keyword)
+        
+        index = queryplanner.OwnerIndex(owners)
+        return self.record_alerts(self.run_query(item.source, batch, index), index)
+    
+    def drain_queue(self, queue, stop=None, wait=True):
+        """Run due work items until none are left (or stop is set); returns alerts created.
+        
+        With wait, sleeps through retry backoffs and other consumers' leases
+        (at most WORK_QUEUE_VISIBILITY_SECONDS) instead of returning early, so
+        items a crashed consumer left leased are picked up in the same run.
+        """
+        total_alerts = 0
+        while stop is None or not stop.is_set():
+            leased = queue.lease()
+            if not leased:
+                due = queue.next_due()
+                if due is None or not wait:
+                    break
+                (stop.wait if stop is not None else time.sleep)(min(max(due, 0.1), 5))
+                continue
+            
+            for item in leased:
+                try:
+                    with queue.holding(item), \
+                            tracing.span(f"work {item.source}", target_id=item.target_id, keyword=item.keyword):
+                        alerts = self.run_work_item(item)
+                except Exception as e:
+                    db.session.rollback()
+                    state = queue.fail(item, e)
+                    logger.warning(f"{item} failed (attempt {item.attempts}): {e} -> {state}")
+                else:
+                    queue.ack(item)
+                    total_alerts += alerts
+                pace(SOURCE_PACING.get(item.source, 1))
+        return total_alerts
+    
+    def run_queued_scan(self, queue=None, cycle=None):
+        """Enqueue a cycle (idempotent per cycle key) and work through the queue.
+        
+        Without a cycle (manual and one-off scans) a new one is enqueued, so
+        the scan runs even if a scheduled scan already covered this slot.
+        Only scheduled scans wait out retry backoffs and other consumers'
+        leases; a manual scan (POST /api/scan) returns once nothing is due
+        and leaves the rest to the scheduled one.
+        """
+        queue = queue or workqueue.get_queue()
+        scan_start = time.perf_counter()
+        scheduled = cycle is not None
+        added = self.enqueue_scan(queue, cycle if scheduled else workqueue.new_cycle())
+        queue.purge(Config.WORK_QUEUE_KEEP_HOURS * 3600)
+        logger.info(f"Starting queued monitoring scan ({added} new work items)")
+        
+        total_alerts = self.drain_queue(queue, wait=scheduled)
+        
+        metrics.SCAN_DURATION.observe(time.perf_counter() - scan_start)
+        logger.info(f"Queued monitoring scan completed. Total new alerts: {total_alerts}")
+        return total_alerts
+    
+    @tracing.traced()
+    def process_potential_threat(self, item):
+        """Process and score potential threats"""
+        return self.process_potential_threats([item]) == 1
+    
+    @tracing.traced()
+    def process_potential_threats(self, items):
+        """Score a batch of items and store the new ones in one ingest round trip"""
+        return sum(self.ingest_items(items).values())
+    
+    def ingest_items(self, items):
+        """Store items as monitoring alerts; returns new alerts per target id"""
+        run = QueryRun(None, None, None)
+        run.items = list(self.hashed(items))
+        for step in (self.dedup, self.score, self.persist):
+            step(run)
+        return run.per_target
+    
+    def calculate_risk_level(self, item):
+        """Calculate risk level based on content analysis"""
+        content = f"{item.title} {item.content}".lower()
+        
+        critical_keywords = [
+            'password leak', 'data breach', 'database dump', 'credentials leaked',
+            'api key exposed', 'private key leaked', 'security breach'
+        ]
+        
+        high_risk_keywords = [
+            'password', 'leak', 'breach', 'hack', 'exploit', 'vulnerability',
+            'database', 'credentials', 'api key', 'token', 'exposed', 'dump'
+        ]
+        
+        medium_risk_keywords = [
+            'security', 'threat', 'attack', 'malware', 'phishing',
+            'suspicious', 'fraud', 'scam', 'investigation', 'alert'
+        ]
+        
+        for keyword in critical_keywords:
+            if keyword in content:
+                return 'critical'
+        
+        high_count = sum(1 for keyword in high_risk_keywords if keyword in content)
+        medium_count = sum(1 for keyword in medium_risk_keywords if keyword in content)
+        
+        if high_count >= 2:
+            return 'high'
+        elif high_count >= 1:
+            return 'medium'
+        elif medium_count >= 2:
+            return 'medium'
+        else:
+            return 'low'
+
+class SearchEngine:
+    def __init__(self):
+        self.session = pooled(requests.Session())
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        })
+    
+    def search_topic_location(self, topic, location=None):
+        """Search for a specific topic and location across multiple sources"""
+        return self.search_ranked(topic, location)[0]
+    
+    def search_ranked(self, topic, location=None, top_k=None):
+        """Search all sources; returns (top_k best results, number of unique results)"""
+        results = []
+        
+        # Build search query
+        if location:
+            search_query = f"{topic} {location}"
+            location_query = f"site:reddit.com {topic} {location}"
+        else:
+            search_query = topic
+            location_query = f"site:reddit.com {topic}"
+        
+        logger.info(f"🔍 Searching for: '{search_query}'")
+        
+        # Search multiple sources
+        try:
+            # Reddit search
+            with metrics.SEARCH_STAGE.time(stage='reddit'):
+                reddit_results = self.search_reddit_specific(topic, location)
+            results.extend(reddit_results)
+            
+            # News search (using multiple sources)
+            with metrics.SEARCH_STAGE.time(stage='news'):
+                news_results = self.search_news(topic, location)
+            results.extend(news_results)
+            
+            # GitHub search
+            with metrics.SEARCH_STAGE.time(stage='github'):
+                github_results = self.search_github_specific(topic, location)
+            results.extend(github_results)
+            
+            # Hacker News search
+            with metrics.SEARCH_STAGE.time(stage='hackernews'):
+                hn_results = self.search_hackernews_specific(topic, location)
+            results.extend(hn_results)
+            
+        except Exception as e:
+            logger.error(f"Search error: {e}")
+        
+        # Remove duplicates and sort by relevance
+        with metrics.SEARCH_STAGE.time(stage='dedup'):
+            unique_results = self.deduplicate_results(results)
+        with metrics.SEARCH_STAGE.time(stage='score'):
+            scored_results = self.score_results(unique_results, topic, location, top_k=top_k)
+        
+        logger.info(f"✅ Found {len(unique_results)} unique results")
+        return scored_results, len(unique_results)
+    
+    def search_reddit_specific(self, topic, location):
+        """Enhanced Reddit search"""
+        results = []
+        try:
+            # Multiple search strategies
+            queries = [topic]
+            if location:
+                queries.extend([
+                    f"{topic} {location}",
+                    f"{location} {topic}",
+                    f'"{topic}" "{location}"'
+                ])
+            
+            for query in queries[:3]:  # Limit queries
+                url = "https://www.reddit.com/search.json"
+                params = {
+                    'q': query,
+                    'sort': 'relevance',
+                    'limit': 15,
+                    't': 'month'
+                }
+                
+                response = fetch(self.session, url, params=params, timeout=10)
+                if response.status_code == 200:
+                    data = response.json()
+                    
+                    for post in data.get('data', {}).get('children', []):
+                        post_data = post['data']
+                        
+                        results.append(ResultItem(
+                            post_data.get('title', ''),
+                            post_data.get('selftext', ''),
+                            f"https://reddit.com{post_data.get('permalink', '')}",
+                            'reddit',
+                            created=ranking.to_utc(post_data.get('created_utc', 0)),
+                            popularity=post_data.get('score', 0),
+                            location=location,
+                            extras=(('subreddit', post_data.get('subreddit', '')),
+                                    ('author', post_data.get('author', '')))
+                        ))
+                
+                pace(1)
+        except Exception as e:
+            logger.error(f"Reddit search error: {e}")
+        
+        return results
+    
+    def search_news(self, topic, location):
+        """Search news sources"""
+        results = []
+        try:
+            # Use Bing News API alternative (free tier)
+            query = f"{topic} {location}" if location else topic
+            
+            # Alternative: Use RSS feeds from major news sources
+            rss_feeds = [
+                'https://feeds.bbci.co.uk/news/rss.xml',
+                'https://rss.cnn.com/rss/edition.rss',
+                'https://feeds.reuters.com/reuters/topNews'
+            ]
+            
+            for feed_url in rss_feeds:
+                try:
+                    response = fetch(self.session, feed_url, timeout=10)
+                    if response.status_code == 200:
+                        # Simple XML parsing for RSS
+                        content = response.text.lower()
+                        if topic.lower() in content:
+                            if location is None or location.lower() in content:
+                                results.append(ResultItem(
+                                    f"News mention found for {topic}",
+                                    f"Found relevant news content for {topic}" + (f" in {location}" if location else ""),
+                                    feed_url,
+                                    'news',
+                                    created=datetime.utcnow(),
+                                    location=location
+                                ))
+                    pace(1)
+                except:
+                    continue
+                    
+        except Exception as e:
+            logger.error(f"News search error: {e}")
+        
+        return results
+    
+    def search_github_specific(self, topic, location):
+        """Enhanced GitHub search"""
+        results = []
+        try:
+            queries = [topic]
+            if location:
+                queries.append(f"{topic} {location}")
+            
+            for query in queries[:2]:
+                url = "https://api.github.com/search/repositories"
+                params = {
+                    'q': query,
+                    'sort': 'updated',
+                    'per_page': 10
+                }
+                
+                response = fetch(self.session, url, params=params, timeout=10)
+                if response.status_code == 200:
+                    data = response.json()
+                    
+                    for repo in data.get('items', []):
+                        results.append(ResultItem(
+                            f"Repository: {repo.get('name', '')}",
+                            f"Description: {repo.get('description', '')}\nLanguage: {repo.get('language', 'N/A')}\nStars: {repo.get('stargazers_count', 0)}",
+                            repo.get('html_url', ''),
+                            'github',
+                            created=ranking.to_utc(repo.get('updated_at')) or datetime.utcnow(),
+                            popularity=repo.get('stargazers_count', 0),
+                            location=location,
+                            extras=(('language', repo.get('language', '')),)
+                        ))
+                
+                pace(2)
+        except Exception as e:
+            logger.error(f"GitHub search error: {e}")
+        
+        return results
+    
+    def search_hackernews_specific(self, topic, location):
+        """Enhanced Hacker News search"""
+        results = []
+        try:
+            # Use HN Algolia API
+            query = f"{topic} {location}" if location else topic
+            url = "https://hn.algolia.com/api/v1/search"
+            params = {
+                'query': query,
+                'tags': 'story',
+                'hitsPerPage': 20
+            }
+            
+            response = fetch(self.session, url, params=params, timeout=10)
+            if response.status_code == 200:
+                data = response.json()
+                
+                for hit in data.get('hits', []):
+                    results.append(ResultItem(
+                        hit.get('title', ''),
+                        hit.get('story_text', ''),
+                        hit.get('url', f"https://news.ycombinator.com/item?id={hit.get('objectID')}"),
+                        'hackernews',
+                        created=ranking.to_utc(hit.get('created_at')) or datetime.utcnow(),
+                        popularity=hit.get('points', 0),
+                        location=location,
+                        extras=(('comments', hit.get('num_comments', 0)),)
+                    ))
+        except Exception as e:
+            logger.error(f"Hacker News search error: {e}")
+        
+        return results
+    
+    def deduplicate_results(self, results):
+        """Remove duplicate results"""
+        seen_urls = set()
+        unique_results = []
+        
+        for result in results:
+            # url + title identifies a result; the string itself is the set key
+            key = f"{result.url}{result.title}"
+            
+            if key not in seen_urls:
+                seen_urls.add(key)
+                unique_results.append(result)
+        
+        return unique_results
+    
+    def score_results(self, results, topic, location, top_k=None):
+        """Score results by relevance and return the top_k best (all when None)"""
+        return ranking.top_k(results, topic, location, k=top_k)
\ No newline at end of file
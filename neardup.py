@@ -0,0 +1,252 @@
+# neardup.py
+"""Near-duplicate detection for alert ingest.
+
+Exact dedup (content_hash) misses cross-posts, reposted snippets and the same
+link with different tracking parameters. Each new alert is therefore also
+checked against an in-memory index of recent alerts:
+
+- its canonical URL (lowercased host, no www/fragment/tracking params,
+  sorted query), and
+- a 64-bit SimHash of its title and description. The signature is split
+  into NEAR_DUP_MAX_DISTANCE + 1 bands, so by pigeonhole any signature within
+  that Hamming distance shares at least one whole band. A lookup only compares
+  against the few alerts in those band buckets, never the whole index.
+
+A URL match also needs the SimHashes to agree (when both texts are long
+enough to have one), and feed or listing URLs (RSS/Atom feeds, front
+pages) never match by URL: every item from a feed carries the same one.
+
+Matches are scoped to the alert's target: the same post found for two
+targets is two alerts, one per target, never a sighting of the other.
+
+The index keeps the NEAR_DUP_INDEX_SIZE most recently seen alerts, and each
+band bucket keeps at most BUCKET_LIMIT ids, so memory stays bounded. It is
+warmed from the newest alerts on first use.
+"""
+import functools
+import hashlib
+import logging
+import re
+import struct
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode
+
+from config import Config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_BITS = 64
+BUCKET_LIMIT = 128
+
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', 'yclid',
+    'ref', 'ref_src', 'ref_url', 'referrer', 'si', '_hsenc', '_hsmi'
+}
+TRACKING_PREFIXES = ('utm_',)
+
+NEAR_DUPLICATES = metrics.REGISTRY.register(metrics.Counter(
+    'threatmonitor_near_duplicates', 'Alerts attached to an existing alert instead of stored', ('match',)))
+
+_TOKEN = re.compile(r'\w{2,}', re.UNICODE)
+_LISTING_PATH = re.compile(r'/(?:rss|feeds?|atom)(?:/|$)|\.(?:rss|xml|atom)$', re.IGNORECASE)
+
+def canonical_url(url):
+    """URL with case, www, default ports, fragments and tracking parameters normalized away"""
+    url = (url or '').strip()
+    scheme, sep, rest = url.partition('://')
+    if not sep:
+        return url
+    rest = rest.partition('#')[0]
+    rest, _, query = rest.partition('?')
+    netloc, _, path = rest.partition('/')
+    host = netloc.rpartition('@')[2].lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if host.endswith((':80', ':443')):
+        host = host.rpartition(':')[0]
+    path = '/' + path.rstrip('/')
+    if query:
+        params = sorted(
+            (k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+            if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+        )
+        query = urlencode(params)
+    # http and https copies of a page are the same sighting
+    return f"https://{host}{path}?{query}" if query else f"https://{host}{path}"
+
+def is_listing_url(url):
+    """True for a canonical URL shared by many items: a feed, or a site's front page"""
+    rest = url.partition('://')[2]
+    host, _, path = rest.partition('?')[0].partition('/')
+    return not path or host.startswith(('feeds.', 'rss.')) or bool(_LISTING_PATH.search('/' + path))
+
+# SimHash counts, per bit, the weighted votes of every feature hash. Each
+# feature's hash is "spread" into a big integer with one 16-bit field per
+# signature bit, so summing a document is one integer add per distinct feature.
+_FIELD = 16
+_BYTE_SPREAD = [
+    sum(((b >> i) & 1) << (i * _FIELD) for i in range(8)) for b in range(256)
+]
+_UNPACK_FIELDS = struct.Struct(f"<{SIGNATURE_BITS}H").unpack
+
+@functools.lru_cache(maxsize=65536)
+def _spread(feature):
+    digest = hashlib.blake2b(' '.join(feature).encode(), digest_size=8).digest()
+    spread = 0
+    for k, b in enumerate(digest):
+        spread |= _BYTE_SPREAD[b] << (k * 8 * _FIELD)
+    return spread
+
+def tokens(text):
+    return _TOKEN.findall((text or '').lower())
+
+def simhash(text):
+    """(64-bit signature, distinct token count) of text.
+
+    Features are word bigrams: unigrams alone make any two texts built from
+    the same small vocabulary look alike.
+    """
+    words = tokens(text)
+    if len(words) > 1:
+        total = sum(map(_spread, zip(words, words[1:])))
+        half = (len(words) - 1) / 2
+    else:
+        total = sum(map(_spread, ((w,) for w in words)))
+        half = len(words) / 2
+    fields = _UNPACK_FIELDS(total.to_bytes(SIGNATURE_BITS * _FIELD // 8, 'little'))
+    signature = 0
+    for i, votes in enumerate(fields):
+        if votes > half:
+            signature |= 1 << i
+    return signature, len(set(words))
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+def _band_slices(bands):
+    width = SIGNATURE_BITS // bands
+    slices = []
+    for i in range(bands):
+        start = i * width
+        end = SIGNATURE_BITS if i == bands - 1 else start + width
+        slices.append((start, (1 << (end - start)) - 1))
+    return slices
+
+class NearDuplicateIndex:
+    def __init__(self, capacity=None, max_distance=None, min_tokens=None):
+        self.capacity = capacity or Config.NEAR_DUP_INDEX_SIZE
+        self.max_distance = Config.NEAR_DUP_MAX_DISTANCE if max_distance is None else max_distance
+        self.min_tokens = Config.NEAR_DUP_MIN_TOKENS if min_tokens is None else min_tokens
+        self._slices = _band_slices(self.max_distance + 1)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # alert id -> (signature or None, canonical url, target id)
+        self._bands = [{} for _ in self._slices]  # band value -> [alert ids]
+        self._urls = {}  # (target id, canonical url) -> alert id
+        self.warmed = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _band_keys(self, signature):
+        return [(signature >> start) & mask for start, mask in self._slices]
+
+    def signature_for(self, title, content):
+        signature, distinct = simhash(f"{title} {content or ''}")
+        return signature if distinct >= self.min_tokens else None
+
+    def find(self, signature, url, scope=None):
+        """(alert_id, 'url' | 'simhash', distance) of the closest indexed alert of target scope, or None"""
+        with self._lock:
+            alert_id = self._urls.get((scope, url)) if url else None
+            if alert_id is not None:
+                indexed = self._entries[alert_id][0]
+                if signature is None or indexed is None:
+                    return alert_id, 'url', None
+                distance = hamming(signature, indexed)
+                if distance <= self.max_distance:
+                    return alert_id, 'url', distance
+            if signature is None:
+                return None
+
+            best = None
+            seen = set()
+            for band, key in zip(self._bands, self._band_keys(signature)):
+                for alert_id in band.get(key, ()):
+                    if alert_id in seen:
+                        continue
+                    seen.add(alert_id)
+                    indexed, _, indexed_scope = self._entries[alert_id]
+                    if indexed_scope != scope:
+                        continue
+                    distance = hamming(signature, indexed)
+                    if distance <= self.max_distance and (best is None or distance < best[2]):
+                        best = (alert_id, 'simhash', distance)
+            return best
+
+    def add(self, alert_id, signature, url, scope=None):
+        with self._lock:
+            if alert_id in self._entries:
+                self._entries.move_to_end(alert_id)
+                return
+            if url and is_listing_url(url):
+                url = ''
+            self._entries[alert_id] = (signature, url, scope)
+            if url:
+                self._urls[(scope, url)] = alert_id
+            if signature is not None:
+                for band, key in zip(self._bands, self._band_keys(signature)):
+                    bucket = band.setdefault(key, [])
+                    bucket.append(alert_id)
+                    if len(bucket) > BUCKET_LIMIT:
+                        del bucket[0]
+            while len(self._entries) > self.capacity:
+                self._remove(next(iter(self._entries)))
+
+    def discard(self, alert_ids):
+        with self._lock:
+            for alert_id in alert_ids:
+                if alert_id in self._entries:
+                    self._remove(alert_id)
+
+    def _remove(self, alert_id):
+        signature, url, scope = self._entries.pop(alert_id)
+        if url and self._urls.get((scope, url)) == alert_id:
+            del self._urls[(scope, url)]
+        if signature is not None:
+            for band, key in zip(self._bands, self._band_keys(signature)):
+                bucket = band.get(key)
+                if bucket and alert_id in bucket:
+                    bucket.remove(alert_id)
+                    if not bucket:
+                        del band[key]
+
+    def warm(self):
+        """Index the newest alerts; needs an app context"""
+        if self.warmed:
+            return
+        from models import db, Alert
+        rows = (db.session.query(Alert.id, Alert.title, Alert.description, Alert.source_url, Alert.target_id)
+                .order_by(Alert.id.desc()).limit(self.capacity).all())
+        for alert_id, title, description, url, target_id in reversed(rows):
+            self.add(alert_id, self.signature_for(title, description), canonical_url(url), target_id)
+        self.warmed = True
+        logger.info(f"🧬 Near-duplicate index warmed with {len(rows)} alerts")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'indexed': len(self._entries),
+                'capacity': self.capacity,
+                'urls': len(self._urls),
+                'buckets': sum(len(b) for b in self._bands),
+                'max_distance': self.max_distance
+            }
+
+index = NearDuplicateIndex()
+
+def reset():
+    """Start over with an empty index (e.g. after the alert table is recreated)"""
+    global index
+    index = NearDuplicateIndex()
\ No newline at end of file
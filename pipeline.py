@@ -0,0 +1,198 @@
+# pipeline.py
+"""Staged processing with bounded queues between stages.
+
+Each stage is a function run by its own pool of worker threads. A stage
+reads from a bounded queue and writes its result into the next stage's
+queue. When a downstream stage falls behind, its queue fills up and put()
+blocks, which stalls the stage in front of it, and so on back to the
+producer. Bursts therefore hold at most (capacity + workers) items per
+stage in memory, however much the producer has to offer.
+
+A stage function returns the item for the next stage, or None to drop it.
+An expanding stage (expand=True) returns an iterable instead, and each of
+its items goes downstream as soon as it is produced: a generator that
+splits a large item into parts is paused by backpressure between parts.
+An exception is logged and counted, and the item is dropped, so one bad
+item never stops the run.
+
+    p = Pipeline('scan', [Stage('fetch', fetch, workers=3), Stage('persist', persist)])
+    results = p.run(inputs)   # outputs of the last stage
+    p.stats()                 # per-stage throughput and queue depth
+"""
+import logging
+import queue
+import threading
+import time
+from contextlib import nullcontext
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_ITEMS = metrics.REGISTRY.register(metrics.Counter(
+    'threatmonitor_pipeline_items', 'Items handled by pipeline stages, by result', ('pipeline', 'stage', 'result')))
+PIPELINE_QUEUE = metrics.REGISTRY.register(metrics.Gauge(
+    'threatmonitor_pipeline_queue_depth', 'Items waiting in front of a pipeline stage', ('pipeline', 'stage')))
+PIPELINE_STAGE_TIME = metrics.REGISTRY.register(metrics.Histogram(
+    'threatmonitor_pipeline_stage_seconds', 'Time a stage spends on one item', ('pipeline', 'stage')))
+
+_DONE = object()
+
+class Stage:
+    def __init__(self, name, func, workers=1, expand=False):
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+        self.expand = expand
+        self.queue = None
+        self._lock = threading.Lock()
+        self._running = 0
+        self.reset()
+
+    def reset(self):
+        self.received = 0
+        self.emitted = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.max_depth = 0
+        self.blocked_seconds = 0.0  # waiting for room in the next stage's queue
+
+    def stats(self, elapsed):
+        depth = self.queue.qsize() if self.queue is not None else 0
+        return {
+            'workers': self.workers,
+            'queue_depth': depth,
+            'max_queue_depth': self.max_depth,
+            'capacity': self.queue.maxsize if self.queue is not None else 0,
+            'received': self.received,
+            'emitted': self.emitted,  # more than received for an expanding stage
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'per_second': round(self.received / elapsed, 2) if elapsed > 0 else 0.0,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'blocked_seconds': round(self.blocked_seconds, 3),
+            # Share of the run the stage's workers spent working; near 1.0 marks the bottleneck
+            'utilization': round(self.busy_seconds / (elapsed * self.workers), 3) if elapsed > 0 else 0.0
+        }
+
+class Pipeline:
+    def __init__(self, name, stages, capacity=8, context=None):
+        """context: optional factory of a context manager each worker thread runs inside (e.g. app.app_context)"""
+        self.name = name
+        self.stages = list(stages)
+        self.capacity = max(1, int(capacity))
+        self.context = context or nullcontext
+        self.started = None
+        self.finished = None
+        self._results = []
+        self._results_lock = threading.Lock()
+
+    def _put(self, stage, item):
+        q = stage.queue
+        q.put(item)
+        depth = q.qsize()
+        if item is not _DONE and depth > stage.max_depth:
+            stage.max_depth = depth
+        PIPELINE_QUEUE.set(depth, pipeline=self.name, stage=stage.name)
+
+    def _emit(self, index, item):
+        """Hand item to the next stage (or the results); returns seconds spent waiting for room"""
+        if index + 1 == len(self.stages):
+            with self._results_lock:
+                self._results.append(item)
+            return 0.0
+        start = time.perf_counter()
+        self._put(self.stages[index + 1], item)
+        return time.perf_counter() - start
+
+    def _worker(self, index):
+        stage = self.stages[index]
+        with self.context():
+            while True:
+                item = stage.queue.get()
+                PIPELINE_QUEUE.set(stage.queue.qsize(), pipeline=self.name, stage=stage.name)
+                if item is _DONE:
+                    break
+                start = time.perf_counter()
+                blocked = 0.0
+                emitted = 0
+                try:
+                    outputs = stage.func(item)
+                    for result in (outputs if stage.expand else (outputs,)):
+                        if result is not None:
+                            blocked += self._emit(index, result)
+                            emitted += 1
+                except Exception as e:
+                    logger.error(f"Pipeline {self.name} stage {stage.name} failed on {item!r}: {e}")
+                    outcome = 'error'
+                else:
+                    outcome = 'emitted' if emitted else 'dropped'
+                # Time spent waiting on a full downstream queue is not work
+                elapsed = time.perf_counter() - start - blocked
+                PIPELINE_STAGE_TIME.observe(elapsed, pipeline=self.name, stage=stage.name)
+                PIPELINE_ITEMS.inc(pipeline=self.name, stage=stage.name, result=outcome)
+                with stage._lock:
+                    stage.received += 1
+                    stage.emitted += emitted
+                    stage.busy_seconds += elapsed
+                    stage.blocked_seconds += blocked
+                    if outcome == 'dropped':
+                        stage.dropped += 1
+                    elif outcome == 'error':
+                        stage.errors += 1
+
+        # The last worker out closes the next stage
+        with stage._lock:
+            stage._running -= 1
+            last = stage._running == 0
+        if last and index + 1 < len(self.stages):
+            following = self.stages[index + 1]
+            for _ in range(following.workers):
+                self._put(following, _DONE)
+
+    def run(self, inputs):
+        """Feed inputs through every stage; blocks until all are done and returns the last stage's outputs.
+
+        Feeding blocks whenever the first stage's queue is full, so inputs
+        may be a lazy iterable that is only consumed as fast as the
+        pipeline drains.
+        """
+        self._results = []
+        threads = []
+        for index, stage in enumerate(self.stages):
+            stage.reset()
+            stage.queue = queue.Queue(maxsize=self.capacity)
+            stage._running = stage.workers
+            for n in range(stage.workers):
+                thread = threading.Thread(target=self._worker, args=(index,),
+                                          name=f"{self.name}-{stage.name}-{n}", daemon=True)
+                threads.append(thread)
+
+        self.started = time.perf_counter()
+        self.finished = None
+        for thread in threads:
+            thread.start()
+        first = self.stages[0]
+        try:
+            for item in inputs:
+                self._put(first, item)
+        finally:
+            for _ in range(first.workers):
+                self._put(first, _DONE)
+            for thread in threads:
+                thread.join()
+            self.finished = time.perf_counter()
+        return self._results
+
+    def stats(self):
+        if self.started is None:
+            return {'name': self.name, 'capacity': self.capacity, 'stages': {}}
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return {
+            'name': self.name,
+            'capacity': self.capacity,
+            'running': self.finished is None,
+            'elapsed_seconds': round(elapsed, 3),
+            'stages': {stage.name: stage.stats(elapsed) for stage in self.stages}
+        }
\ No newline at end of file
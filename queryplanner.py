@@ -0,0 +1,137 @@
+# queryplanner.py
+"""Pack a target's keywords into as few upstream search queries as possible.
+
+Each source gets OR-batched queries that stay inside its query limits:
+
+- reddit: terms joined with OR, at most 512 characters
+- github: quoted terms joined with OR; code search allows 256 characters
+  and at most five AND/OR/NOT operators, so six terms per query
+- hackernews (Algolia): no OR operator; the terms are sent as the query and
+  all of them as optionalWords, so a hit needs only one of them
+
+Keywords shared by several targets are planned once per cycle: a scan
+queries the distinct terms of all active targets, and every result is
+fanned out to each target whose keywords it matches.
+
+Upstream matching is looser than ours (stemming, typo tolerance, OR
+precedence), so results are always assigned to targets and keywords by
+matching locally with the targets' KeywordMatchers; a result that matches
+none is dropped.
+"""
+from keywordmatch import KeywordMatcher
+
+class QueryLimits:
+    def __init__(self, max_chars, max_terms, separator):
+        self.max_chars = max_chars
+        self.max_terms = max_terms
+        self.separator = separator
+
+SOURCE_LIMITS = {
+    'reddit': QueryLimits(max_chars=512, max_terms=None, separator=' OR '),
+    'github': QueryLimits(max_chars=256, max_terms=6, separator=' OR '),
+    'hackernews': QueryLimits(max_chars=512, max_terms=10, separator=' '),
+}
+
+class QueryBatch:
+    __slots__ = ('source', 'terms', 'query')
+
+    def __init__(self, source, terms, query):
+        self.source = source
+        self.terms = tuple(terms)  # (keyword, mode) pairs covered by query
+        self.query = query
+
+    def params(self):
+        """Source-specific request parameters besides the query itself"""
+        if self.source == 'hackernews':
+            return {'optionalWords': ','.join(keyword.replace(',', ' ') for keyword, _ in self.terms)}
+        return {}
+
+    def __repr__(self):
+        return f"QueryBatch({self.source!r}, {len(self.terms)} terms, {self.query!r})"
+
+def render_term(source, keyword, mode):
+    """One keyword in a source's query syntax"""
+    if source == 'github':
+        return f'"{keyword}"'
+    if mode == 'phrase':
+        return f'"{keyword}"'
+    if source == 'reddit' and len(keyword.split()) > 1:
+        # Keep the words of a multi-word keyword together on one side of OR
+        return f"({keyword})"
+    return keyword
+
+def plan(source, terms):
+    """[QueryBatch] covering every (keyword, mode) term, packed in keyword order"""
+    limits = SOURCE_LIMITS[source]
+    batches = []
+    current, rendered = [], []
+
+    def flush():
+        if current:
+            batches.append(QueryBatch(source, current, limits.separator.join(rendered)))
+
+    for keyword, mode in terms:
+        term = render_term(source, keyword, mode)
+        length = len(limits.separator.join(rendered + [term]))
+        full = limits.max_terms is not None and len(current) >= limits.max_terms
+        if current and (full or length > limits.max_chars):
+            flush()
+            current, rendered = [], []
+        # A single term longer than the limit still gets a query of its own
+        current.append((keyword, mode))
+        rendered.append(term)
+    flush()
+    return batches
+
+def distinct_terms(matchers):
+    """Every (keyword, mode) term of the given matchers once, in first-seen order"""
+    terms = {}
+    for matcher in matchers:
+        for keyword, mode in matcher.terms:
+            terms.setdefault((keyword.casefold(), mode), (keyword, mode))
+    return list(terms.values())
+
+class OwnerIndex:
+    """Which targets a fetched result belongs to.
+
+    One matcher over every target's keywords finds the candidate targets;
+    each candidate's own matcher then decides, so modes and regexes keep
+    their per-target meaning.
+    """
+    def __init__(self, owners):
+        self.owners = sorted(owners, key=lambda owner: owner[0].id)  # (target, matcher)
+        specs = {}
+        self._by_keyword = {}
+        for target, matcher in self.owners:
+            for keyword, mode in matcher.specs:
+                specs.setdefault((keyword.casefold(), mode), (keyword, mode))
+                self._by_keyword.setdefault(keyword.casefold(), []).append((target, matcher))
+        self._matcher = KeywordMatcher(specs.values())
+
+    def __len__(self):
+        return len(self.owners)
+
+    def owners_of(self, text):
+        """[(target, matched keywords)] in target id order"""
+        candidates = {}
+        for keyword in self._matcher.matches(text):
+            for target, matcher in self._by_keyword.get(keyword.casefold(), ()):
+                candidates[target.id] = (target, matcher)
+        owners = []
+        for target_id in sorted(candidates):
+            target, matcher = candidates[target_id]
+            keywords = matcher.matches(text)
+            if keywords:
+                owners.append((target, keywords))
+        return owners
+
+def fan_out(candidates, index):
+    """Yield one item per (result, owning target) for (item, text) candidates, lowest target id first.
+
+    Items are produced as they are consumed, so a result shared by many
+    targets is never expanded for all of them up front. A result that
+    matches no target's keywords locally is dropped.
+    """
+    for item, text in candidates:
+        for target, keywords in index.owners_of(text):
+            yield item.for_target(target.id, keywords)
\ No newline at end of file
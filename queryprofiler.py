@@ -0,0 +1,224 @@
+# queryprofiler.py
+"""SQL statement profiling per request and per scan.
+
+Every statement is timed through SQLAlchemy engine events and attributed to
+the active profile (one per Flask request, one per monitoring scan). Statement
+shapes that repeat within a profile are flagged as likely N+1 patterns, and
+statements over SLOW_QUERY_MS go to the slow-query log. Executions with a
+batched IN list (two or more values) are the cure for N+1, not a symptom,
+so they don't count towards the flag.
+"""
+import functools
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger('threatmonitor.slowquery')
+
+_local = threading.local()
+_lock = threading.Lock()
+_recent = deque(maxlen=50)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE = re.compile(r'\s+')
+
+def statement_shape(statement):
+    """Statement with literals and whitespace normalized, so repeats compare equal"""
+    return _shape(statement)[0]
+
+def _shape(statement):
+    """(shape, whether an IN list of several values was collapsed)"""
+    shape = _STRING.sub('?', statement)
+    shape = _NUMBER.sub('?', shape)
+    shape, batched = _IN_LIST.subn('(?)', shape)
+    return _SPACE.sub(' ', shape).strip(), batched > 0
+
+class QueryProfile:
+    def __init__(self, name):
+        self.name = name
+        self.started_at = datetime.utcnow()
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = {}  # shape -> [count, total seconds, executions with a batched IN list]
+        self.slow = []
+        self._lock = threading.Lock()  # scan pipeline workers record into one profile
+
+    def record(self, statement, elapsed):
+        shape, batched = _shape(statement)
+        with self._lock:
+            self.count += 1
+            self.total_time += elapsed
+            entry = self.shapes.get(shape)
+            if entry is None:
+                self.shapes[shape] = [1, elapsed, int(batched)]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] += batched
+
+    def suspected_n_plus_one(self, threshold=None):
+        threshold = threshold or Config.N_PLUS_ONE_THRESHOLD
+        return sorted(
+            ({'shape': shape[:300], 'count': c, 'total_ms': round(t * 1000, 2)}
+             for shape, (c, t, batched) in self.shapes.items()
+             if c - batched >= threshold and shape.upper().startswith('SELECT')),
+            key=lambda e: e['count'], reverse=True
+        )
+
+    def summary(self):
+        return {
+            'name': self.name,
+            'started_at': self.started_at.isoformat(),
+            'statements': self.count,
+            'distinct_shapes': len(self.shapes),
+            'total_ms': round(self.total_time * 1000, 2),
+            'slow_statements': len(self.slow),
+            'suspected_n_plus_one': self.suspected_n_plus_one()
+        }
+
+    def header_value(self):
+        parts = [f"count={self.count}", f"time_ms={self.total_time * 1000:.2f}"]
+        n_plus_one = self.suspected_n_plus_one()
+        if n_plus_one:
+            worst = n_plus_one[0]
+            parts.append(f"n_plus_one={len(n_plus_one)}")
+            parts.append(f"worst={worst['count']}x {worst['shape'][:120]!r}")
+        return '; '.join(parts)
+
+def current_profile():
+    return getattr(_local, 'profile', None)
+
+def recent_profiles():
+    with _lock:
+        return [p.summary() for p in _recent]
+
+def _finish(profile):
+    with _lock:
+        _recent.append(profile)
+    n_plus_one = profile.suspected_n_plus_one()
+    if n_plus_one:
+        logger.warning(
+            f"Possible N+1 in {profile.name}: "
+            + ', '.join(f"{e['count']}x {e['shape'][:80]}" for e in n_plus_one[:3])
+        )
+
+@contextmanager
+def profile(name):
+    """Attribute statements on this thread to a named profile"""
+    if current_profile() is not None:
+        yield current_profile()
+        return
+    p = QueryProfile(name)
+    _local.profile = p
+    try:
+        yield p
+    finally:
+        _local.profile = None
+        _finish(p)
+
+def propagate():
+    """Context manager factory that attributes another thread's statements to this thread's profile"""
+    p = current_profile()
+
+    @contextmanager
+    def adopt():
+        if p is None or current_profile() is not None:
+            yield
+            return
+        _local.profile = p
+        try:
+            yield
+        finally:
+            _local.profile = None
+    return adopt
+
+def profiled(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _configure_slow_log():
+    if Config.SLOW_QUERY_LOG and not slow_logger.handlers:
+        handler = logging.FileHandler(Config.SLOW_QUERY_LOG)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        slow_logger.addHandler(handler)
+
+_installed = False
+
+def init_engine_events():
+    global _installed
+    if _installed:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    _configure_slow_log()
+    slow_threshold = Config.SLOW_QUERY_MS / 1000.0
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('profiler_start', []).append(time.perf_counter())
+
+    def _done(conn, statement, parameters):
+        starts = conn.info.get('profiler_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        p = current_profile()
+        if p is not None:
+            p.record(statement, elapsed)
+        if elapsed >= slow_threshold:
+            where = p.name if p is not None else 'unprofiled'
+            slow_logger.warning(f"{elapsed * 1000:.1f}ms [{where}] {_SPACE.sub(' ', statement)[:1000]} params={str(parameters)[:300]}")
+            if p is not None:
+                p.slow.append({'ms': round(elapsed * 1000, 2), 'statement': statement[:300]})
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        _done(conn, statement, parameters)
+
+    # A failed statement never reaches after_cursor_execute; pop its start so they don't pile up on the connection
+    @event.listens_for(Engine, 'handle_error')
+    def _error(context):
+        if context.connection is not None and context.statement is not None:
+            _done(context.connection, context.statement, context.parameters)
+
+    _installed = True
+
+def init_app(app):
+    """Profile every request and, in debug mode, report it in X-Query-Profile"""
+    from flask import request
+
+    init_engine_events()
+
+    @app.before_request
+    def _start_request_profile():
+        _local.profile = QueryProfile(f"{request.method} {request.path}")
+
+    @app.after_request
+    def _report_request_profile(response):
+        p = current_profile()
+        if p is not None and (app.debug or app.config.get('QUERY_PROFILE_HEADER')):
+            response.headers['X-Query-Profile'] = p.header_value()
+            response.headers['Server-Timing'] = f'db;dur={p.total_time * 1000:.2f};desc="{p.count} queries"'
+        return response
+
+    @app.teardown_request
+    def _finish_request_profile(exc):
+        p = current_profile()
+        _local.profile = None
+        if p is not None and p.count:
+            _finish(p)
\ No newline at end of file
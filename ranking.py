@@ -0,0 +1,131 @@
+# ranking.py
+"""Batch relevance ranking for search results.
+
+Results are loaded once into columnar arrays (one lowercase pass over the
+text, then popularity and timestamp columns). Every feature is then scored
+in vectorized form, and only the top k are selected with a partial sort
+(np.partition) instead of sorting the whole list.
+
+Weights come from RANKING_WEIGHTS (JSON, merged over DEFAULT_WEIGHTS).
+numpy is imported on first use, so processes that only need to_utc (the
+scan worker) do not pay for it at start.
+"""
+from datetime import datetime, timezone
+
+from config import Config
+
+_EPOCH = datetime(1970, 1, 1)
+
+DEFAULT_WEIGHTS = {
+    'title_topic': 10.0,
+    'content_topic': 5.0,
+    'title_location': 8.0,
+    'content_location': 4.0,
+    'reddit_score': 0.1,
+    'github_stars': 0.1,
+    'hackernews_points': 0.2,
+    'recent_week': 5.0,
+    'recent_month': 2.0
+}
+
+# source -> weight applied to its popularity metric (reddit score, stars, points)
+POPULARITY_WEIGHTS = {
+    'reddit': 'reddit_score',
+    'github': 'github_stars',
+    'hackernews': 'hackernews_points'
+}
+
+def to_utc(value):
+    """Naive UTC datetime from an aware/naive datetime, ISO string or epoch seconds"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def weights():
+    return {**DEFAULT_WEIGHTS, **(Config.RANKING_WEIGHTS or {})}
+
+def _columns(results, topic, location, w, now):
+    """Feature columns for the batch; each field is read and lowercased once"""
+    import numpy as np
+    n = len(results)
+    topic = topic.lower()
+    titles = [r.title.lower() for r in results]
+    contents = [r.content.lower() for r in results]
+
+    columns = {
+        'title_topic': np.fromiter((topic in t for t in titles), bool, n),
+        'content_topic': np.fromiter((topic in c for c in contents), bool, n)
+    }
+    if location:
+        location = location.lower()
+        columns['title_location'] = np.fromiter((location in t for t in titles), bool, n)
+        columns['content_location'] = np.fromiter((location in c for c in contents), bool, n)
+
+    source_weight = {s: w[name] for s, name in POPULARITY_WEIGHTS.items()}
+    columns['popularity'] = np.fromiter((r.popularity for r in results), float, n)
+    columns['popularity_weight'] = np.fromiter((source_weight.get(r.source, 0.0) for r in results), float, n)
+
+    # Seconds since the epoch; naive values are already UTC, anything else is normalized first
+    created = (r.created for r in results)
+    columns['created'] = np.fromiter(
+        (((c if type(c) is datetime and c.tzinfo is None else (to_utc(c) or now)) - _EPOCH).total_seconds()
+         for c in created),
+        float, n)
+    return columns
+
+def scores(results, topic, location=None):
+    """Relevance score per result, as an array aligned with results"""
+    import numpy as np
+    w = weights()
+    now = datetime.utcnow()
+    c = _columns(results, topic, location, w, now)
+
+    score = c['title_topic'] * w['title_topic']
+    score += c['content_topic'] * w['content_topic']
+    if location:
+        score += c['title_location'] * w['title_location']
+        score += c['content_location'] * w['content_location']
+    score += c['popularity'] * c['popularity_weight']
+
+    # Whole days, floored like timedelta.days
+    days_old = np.floor(((now - _EPOCH).total_seconds() - c['created']) / 86400.0)
+    score += np.where(days_old < 7, w['recent_week'], np.where(days_old < 30, w['recent_month'], 0.0))
+    return score
+
+def top_k(results, topic, location=None, k=None):
+    """The k best ResultItems (all when k is None), best first, each with relevance_score set.
+
+    Ties keep their input order, as a stable sort would.
+    """
+    import numpy as np
+    if not results:
+        return []
+    score = scores(results, topic, location)
+    n = len(results)
+
+    if k is None or k >= n:
+        candidates = np.arange(n)
+    elif k <= 0:
+        return []
+    else:
+        # Partial sort for the k-th best score; ties at that boundary are
+        # filled in input order so the result matches a full stable sort
+        kth = np.partition(score, n - k)[n - k]
+        above = np.flatnonzero(score > kth)
+        ties = np.flatnonzero(score == kth)[:k - len(above)]
+        candidates = np.concatenate((above, ties))
+    # lexsort: last key is primary (score descending), then input position
+    order = candidates[np.lexsort((candidates, -score[candidates]))]
+
+    ranked = []
+    for i in order.tolist():
+        result = results[i]
+        result.relevance_score = float(score[i])
+        ranked.append(result)
+    return ranked
\ No newline at end of file
@@ -0,0 +1,68 @@
+# records.py
+"""Normalized connector items.
+
+Every connector (monitoring and search) produces ResultItem records: a fixed
+core schema in __slots__ plus a small tuple of source-specific extras
+(subreddit, author, language, comments). They flow unchanged through dedup,
+ranking and persistence; to_dict() is only used at the JSON boundary.
+"""
+
+# Source-specific popularity metric, as named in the API output
+POPULARITY_FIELDS = {
+    'reddit': 'score',
+    'github': 'stars',
+    'hackernews': 'points'
+}
+
+class ResultItem:
+    __slots__ = ('title', 'content', 'url', 'source', 'created', 'target_id',
+                 'popularity', 'location', 'extras', 'relevance_score')
+
+    def __init__(self, title, content, url, source, created=None, target_id=None,
+                 popularity=0, location=None, extras=()):
+        self.title = title or ''
+        self.content = content or ''
+        self.url = url or ''
+        self.source = source
+        self.created = created  # naive UTC
+        self.target_id = target_id
+        self.popularity = popularity or 0
+        self.location = location
+        self.extras = tuple(extras.items()) if isinstance(extras, dict) else tuple(extras)
+        self.relevance_score = None
+
+    def extra(self, key, default=None):
+        for k, v in self.extras:
+            if k == key:
+                return v
+        return default
+
+    def for_target(self, target_id, keywords=()):
+        """Copy attributed to target_id, recording the target keywords it matched"""
+        extras = self.extras + ((('keywords', tuple(keywords)),) if keywords else ())
+        return ResultItem(self.title, self.content, self.url, self.source, created=self.created,
+                          target_id=target_id, popularity=self.popularity, location=self.location,
+                          extras=extras)
+
+    def to_dict(self):
+        """API representation, same keys the connectors used to return"""
+        data = {
+            'title': self.title,
+            'content': self.content,
+            'url': self.url,
+            'source': self.source,
+            'created': self.created
+        }
+        if self.target_id is not None:
+            data['target_id'] = self.target_id
+        field = POPULARITY_FIELDS.get(self.source)
+        if field:
+            data[field] = self.popularity
+        data.update(self.extras)
+        data['location'] = self.location
+        if self.relevance_score is not None:
+            data['relevance_score'] = self.relevance_score
+        return data
+
+    def __repr__(self):
+        return f"ResultItem({self.source!r}, {self.title[:40]!r}, {self.url!r})"
\ No newline at end of file
@@ -0,0 +1,279 @@
+# retention.py
+"""Alert retention: move old alerts out of the hot table into archive files.
+
+Alerts older than their policy age (RETENTION_POLICIES, keyed by
+"query_type:status") are moved in batches to gzip NDJSON files partitioned
+by creation date:
+
+    <ARCHIVE_DIR>/alerts/date=YYYY-MM-DD/part-<millis>-<pid>-<seq>.ndjson.gz
+
+Nothing is archived until RETENTION_POLICIES is configured. Only one run
+at a time does any work: the web process (APP_MODE=all) and worker.py both
+schedule retention, and a run that finds ARCHIVE_DIR/retention.lock held
+by another one skips.
+
+Each archived alert leaves a row in ArchivedAlert (id, content_hash,
+partition), so ingest dedup still sees its hash and a single alert can be
+read back without scanning every partition.
+
+    python retention.py run [--dry-run]
+"""
+import argparse
+import glob
+import gzip
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from config import Config
+from models import db, Alert, AlertDuplicate, ArchivedAlert
+from dbwriter import run_write
+import neardup
+
+logger = logging.getLogger(__name__)
+
+_part_seq = itertools.count()
+
+# A lock older than this belongs to a run that died; the next run takes it over
+LOCK_STALE_SECONDS = 6 * 3600
+
+ALERT_FIELDS = [c.name for c in Alert.__table__.columns]
+
+def init_app(app):
+    """SQLite: make alert ids never come back, so an archived id always names one alert.
+
+    Databases created before Alert had sqlite_autoincrement reuse the
+    highest deleted rowid; their alert table is rebuilt once with
+    AUTOINCREMENT (same rows and ids). Either way the id sequence is moved
+    past the highest archived id.
+    """
+    from sqlalchemy.schema import CreateTable
+
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name != 'sqlite':
+            return
+        table = Alert.__table__
+        with engine.begin() as conn:
+            ddl = conn.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'alert'").scalar() or ''
+            if 'AUTOINCREMENT' not in ddl.upper():
+                conn.exec_driver_sql("DROP TABLE IF EXISTS alert_rebuild")
+                create = str(CreateTable(table).compile(dialect=engine.dialect))
+                conn.exec_driver_sql(create.replace('CREATE TABLE alert ', 'CREATE TABLE alert_rebuild ', 1))
+                columns = ', '.join(c.name for c in table.columns)
+                conn.exec_driver_sql(f"INSERT INTO alert_rebuild ({columns}) SELECT {columns} FROM alert")
+                # Dropping alert also drops the full-text triggers; fulltext.init_app recreates them
+                conn.exec_driver_sql("DROP TABLE alert")
+                conn.exec_driver_sql("ALTER TABLE alert_rebuild RENAME TO alert")
+                for index in table.indexes:
+                    index.create(conn)
+                logger.info("🗄️ Rebuilt the alert table with AUTOINCREMENT so archived ids are never reused")
+
+            floor = conn.exec_driver_sql(
+                "SELECT MAX(m) FROM (SELECT MAX(id) AS m FROM alert UNION ALL SELECT MAX(id) FROM archived_alert)"
+            ).scalar() or 0
+            current = conn.exec_driver_sql("SELECT seq FROM sqlite_sequence WHERE name = 'alert'").scalar()
+            if current is None:
+                conn.exec_driver_sql("INSERT INTO sqlite_sequence (name, seq) VALUES ('alert', ?)", (floor,))
+            elif current < floor:
+                conn.exec_driver_sql("UPDATE sqlite_sequence SET seq = ? WHERE name = 'alert'", (floor,))
+
+def policy_days(query_type, status, policies=None):
+    """Most specific matching policy wins: exact, query_type:*, *:status, *:*"""
+    policies = Config.RETENTION_POLICIES if policies is None else policies
+    for key in (f"{query_type}:{status}", f"{query_type}:*", f"*:{status}", '*:*'):
+        if key in policies:
+            return policies[key] or None
+    return None
+
+def partition_dir(partition):
+    return os.path.join(Config.ARCHIVE_DIR, 'alerts', f"date={partition}")
+
+def _serialize(alert):
+    record = {}
+    for field in ALERT_FIELDS:
+        value = getattr(alert, field)
+        record[field] = value.isoformat() if isinstance(value, datetime) else value
+    return record
+
+def _write_partitions(records):
+    """Append records to one new part file per date partition; fsync before the DB delete"""
+    by_partition = {}
+    for record in records:
+        partition = (record['created_at'] or '')[:10] or 'undated'
+        by_partition.setdefault(partition, []).append(record)
+
+    stamp = f"{int(time.time() * 1000)}-{os.getpid()}-{next(_part_seq)}"
+    for partition, items in by_partition.items():
+        directory = partition_dir(partition)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{stamp}.ndjson.gz")
+        tmp_path = path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            for record in items:
+                f.write(json.dumps(record, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    return by_partition
+
+def _combinations():
+    return db.session.query(Alert.query_type, Alert.status).distinct().all()
+
+def _candidate_query(query_type, status, cutoff):
+    query = Alert.query.filter(Alert.created_at < cutoff)
+    query = query.filter(Alert.query_type.is_(None) if query_type is None else Alert.query_type == query_type)
+    query = query.filter(Alert.status.is_(None) if status is None else Alert.status == status)
+    return query
+
+@contextmanager
+def exclusive_run():
+    """Yields True when this process holds the retention lock, False when another run does"""
+    os.makedirs(Config.ARCHIVE_DIR, exist_ok=True)
+    path = os.path.join(Config.ARCHIVE_DIR, 'retention.lock')
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        try:
+            stale = time.time() - os.path.getmtime(path) > LOCK_STALE_SECONDS
+            if stale:
+                # Renaming is atomic, so only one process takes a stale lock over
+                os.replace(path, f"{path}.stale-{os.getpid()}")
+                os.remove(f"{path}.stale-{os.getpid()}")
+                logger.warning("🔓 Took over a stale retention lock")
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except (FileNotFoundError, FileExistsError):
+            stale = False
+        if not stale:
+            yield False
+            return
+    try:
+        os.write(fd, f"{os.getpid()} {datetime.utcnow().isoformat()}\n".encode())
+        os.close(fd)
+        yield True
+    finally:
+        os.remove(path)
+
+def run_retention(batch_size=None, dry_run=False, now=None):
+    """Archive every alert past its policy age; returns counts per query_type:status"""
+    if dry_run:
+        return _run_retention(batch_size, dry_run, now)
+    with exclusive_run() as acquired:
+        if not acquired:
+            logger.info("🗄️ Retention already running in another process; skipped")
+            return {}
+        return _run_retention(batch_size, dry_run, now)
+
+def _run_retention(batch_size, dry_run, now):
+    batch_size = batch_size or Config.RETENTION_BATCH_SIZE
+    now = now or datetime.utcnow()
+    summary = {}
+
+    for query_type, status in _combinations():
+        days = policy_days(query_type, status)
+        if not days:
+            continue
+        cutoff = now - timedelta(days=days)
+        key = f"{query_type}:{status}"
+
+        if dry_run:
+            summary[key] = _candidate_query(query_type, status, cutoff).count()
+            continue
+
+        moved = 0
+        while True:
+            batch = (_candidate_query(query_type, status, cutoff)
+                     .order_by(Alert.id).limit(batch_size).all())
+            if not batch:
+                break
+
+            records = [_serialize(a) for a in batch]
+            db.session.rollback()  # release the read snapshot before writing
+            partitions = _write_partitions(records)
+
+            def move(partitions=partitions):
+                for partition, items in partitions.items():
+                    db.session.bulk_insert_mappings(ArchivedAlert, [
+                        {'id': r['id'], 'content_hash': r['content_hash'], 'partition': partition}
+                        for r in items
+                    ])
+                ids = [r['id'] for items in partitions.values() for r in items]
+                AlertDuplicate.query.filter(AlertDuplicate.alert_id.in_(ids)).delete(synchronize_session=False)
+                return Alert.query.filter(Alert.id.in_(ids)).delete(synchronize_session=False)
+
+            moved += run_write(move)
+            neardup.index.discard(r['id'] for r in records)
+            if len(batch) < batch_size:
+                break
+
+        if moved:
+            summary[key] = moved
+            logger.info(f"🗄️ Archived {moved} '{key}' alerts older than {days} days")
+
+    return summary
+
+def read_partition(partition, limit=None, offset=0):
+    """Archived alert records for one creation date"""
+    results = []
+    skipped = 0
+    seen = set()
+    for path in sorted(glob.glob(os.path.join(partition_dir(partition), 'part-*.ndjson.gz'))):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                # A retried batch can leave the same alert in two part files
+                if record['id'] in seen:
+                    continue
+                seen.add(record['id'])
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                results.append(record)
+                if limit is not None and len(results) >= limit:
+                    return results
+    return results
+
+def read_archived_alert(alert_id=None, content_hash=None):
+    """One archived alert by original id or content hash, or None"""
+    query = ArchivedAlert.query
+    entry = query.get(alert_id) if alert_id is not None else query.filter_by(content_hash=content_hash).first()
+    if entry is None:
+        return None
+    for record in read_partition(entry.partition):
+        if record['id'] == entry.id:
+            return record
+    return None
+
+def list_partitions():
+    rows = db.session.query(ArchivedAlert.partition, db.func.count(ArchivedAlert.id)).group_by(
+        ArchivedAlert.partition).order_by(ArchivedAlert.partition.desc()).all()
+    return [{'partition': p, 'alerts': c} for p, c in rows]
+
+def main(argv=None):
+    from flask import Flask
+
+    parser = argparse.ArgumentParser(description='Alert retention and archival')
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('run', help='archive alerts past their retention age')
+    run.add_argument('--dry-run', action='store_true', help='only count what would be archived')
+    run.add_argument('--batch-size', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        summary = run_retention(batch_size=args.batch_size, dry_run=args.dry_run)
+    print(json.dumps(summary, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
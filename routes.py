@@ -1,254 +1,511 @@
-# app/routes.py
-from flask import request, jsonify, render_template
-from models import db, Alert, MonitoringTarget, SearchQuery
-import logging
-import json
-import hashlib
-from datetime import datetime, timedelta
-
-logger = logging.getLogger(__name__)
-
-def register_routes(app, monitor, search_engine):
-    @app.route('/')
-    def dashboard():
-        return render_template('dashboard.html')
-
-    @app.route('/api/search', methods=['POST'])
-    def search_query():
-        """Handle search queries"""
-        try:
-            data = request.json
-            topic = data.get('topic', '').strip()
-            location = data.get('location', '').strip() or None
-            
-            if not topic:
-                return jsonify({'error': 'Topic is required'}), 400
-            
-            logger.info(f"🔍 New search query: '{topic}'" + (f" in '{location}'" if location else ""))
-            
-            # Save search query
-            search_query = SearchQuery(
-                topic=topic,
-                location=location,
-                query_text=f"{topic} {location}" if location else topic
-            )
-            db.session.add(search_query)
-            db.session.commit()
-            
-            # Perform search
-            results = search_engine.search_topic_location(topic, location)
-            
-            # Save results as alerts for easy viewing
-            alerts_created = 0
-            for result in results[:20]:  # Limit to top 20 results
-                content_str = f"{result['title']}{result['content']}{result['url']}"
-                content_hash = hashlib.sha256(content_str.encode()).hexdigest()
-                
-                # Check if already exists
-                existing = Alert.query.filter_by(content_hash=content_hash).first()
-                if not existing:
-                    alert = Alert(
-                        title=result['title'][:200],
-                        description=result['content'][:1000] if result['content'] else '',
-                        source_url=result['url'],
-                        source_type=result['source'],
-                        risk_level='low',  # Search results are informational
-                        status='new',
-                        content_hash=content_hash,
-                        location=location,
-                        query_type='search'
-                    )
-                    db.session.add(alert)
-                    alerts_created += 1
-            
-            if alerts_created > 0:
-                db.session.commit()
-            
-            # Update search query with results count
-            search_query.results_count = len(results)
-            db.session.commit()
-            
-            logger.info(f"✅ Search completed: {len(results)} results found, {alerts_created} new entries saved")
-            
-            return jsonify({
-                'message': f'Search completed! Found {len(results)} results.',
-                'results_count': len(results),
-                'alerts_created': alerts_created,
-                'results': results[:10]  # Return top 10 for immediate display
-            })
-            
-        except Exception as e:
-            logger.error(f"❌ Search error: {e}")
-            return jsonify({'error': str(e)}), 500
-
-    @app.route('/api/search/history')
-    def search_history():
-        """Get search history"""
-        try:
-            queries = SearchQuery.query.order_by(SearchQuery.created_at.desc()).limit(20).all()
-            return jsonify([{
-                'id': q.id,
-                'topic': q.topic,
-                'location': q.location,
-                'query_text': q.query_text,
-                'created_at': q.created_at.isoformat(),
-                'results_count': q.results_count
-            } for q in queries])
-        except Exception as e:
-            logger.error(f"❌ Error fetching search history: {e}")
-            return jsonify({'error': str(e)}), 500
-
-    @app.route('/api/targets', methods=['GET', 'POST'])
-    def manage_targets():
-        if request.method == 'POST':
-            try:
-                data = request.json
-                
-                if isinstance(data['keywords'], str):
-                    keywords = [k.strip() for k in data['keywords'].split(',') if k.strip()]
-                else:
-                    keywords = data['keywords']
-                
-                target = MonitoringTarget(
-                    name=data['name'],
-                    target_type=data['target_type']
-                )
-                target.set_keywords(keywords)
-                
-                db.session.add(target)
-                db.session.commit()
-                
-                logger.info(f"✅ New monitoring target created: {target.name}")
-                return jsonify({'id': target.id, 'message': 'Target created successfully'})
-            
-            except Exception as e:
-                logger.error(f"❌ Error creating target: {e}")
-                return jsonify({'error': str(e)}), 500
-        
-        targets = MonitoringTarget.query.filter_by(active=True).all()
-        return jsonify([{
-            'id': t.id,
-            'name': t.name,
-            'keywords': t.get_keywords(),
-            'target_type': t.target_type,
-            'created_at': t.created_at.isoformat(),
-            'alert_count': len([a for a in t.alerts if a.status == 'new'])
-        } for t in targets])
-
-    @app.route('/api/targets/<int:target_id>', methods=['DELETE'])
-    def delete_target(target_id):
-        try:
-            target = MonitoringTarget.query.get_or_404(target_id)
-            target.active = False
-            db.session.commit()
-            
-            logger.info(f"🗑️ Target deactivated: {target.name}")
-            return jsonify({'message': 'Target deactivated successfully'})
-        
-        except Exception as e:
-            logger.error(f"❌ Error deactivating target: {e}")
-            return jsonify({'error': str(e)}), 500
-
-    @app.route('/api/alerts')
-    def get_alerts():
-        try:
-            page = request.args.get('page', 1, type=int)
-            risk_level = request.args.get('risk_level')
-            status = request.args.get('status')
-            query_type = request.args.get('query_type')  # New filter
-            
-            query = Alert.query
-            
-            if risk_level:
-                query = query.filter_by(risk_level=risk_level)
-            if status:
-                query = query.filter_by(status=status)
-            if query_type:
-                query = query.filter_by(query_type=query_type)
-            
-            alerts = query.order_by(Alert.created_at.desc()).paginate(
-                page=page, per_page=20, error_out=False
-            )
-            
-            return jsonify({
-                'alerts': [{
-                    'id': a.id,
-                    'title': a.title,
-                    'description': a.description,
-                    'source_url': a.source_url,
-                    'source_type': a.source_type,
-                    'risk_level': a.risk_level,
-                    'status': a.status,
-                    'created_at': a.created_at.isoformat(),
-                    'target_name': a.target.name if a.target else 'Search Result',
-                    'location': a.location,
-                    'query_type': a.query_type
-                } for a in alerts.items],
-                'total': alerts.total,
-                'pages': alerts.pages,
-                'current_page': page
-            })
-        
-        except Exception as e:
-            logger.error(f"❌ Error fetching alerts: {e}")
-            return jsonify({'error': str(e)}), 500
-
-    @app.route('/api/alerts/<int:alert_id>', methods=['PUT'])
-    def update_alert(alert_id):
-        try:
-            alert = Alert.query.get_or_404(alert_id)
-            data = request.json
-            
-            if 'status' in data:
-                alert.status = data['status']
-                db.session.commit()
-                logger.info(f"📝 Alert {alert_id} status updated to {data['status']}")
-            
-            return jsonify({'message': 'Alert updated successfully'})
-        
-        except Exception as e:
-            logger.error(f"❌ Error updating alert: {e}")
-            return jsonify({'error': str(e)}), 500
-
-    @app.route('/api/dashboard/stats')
-    def dashboard_stats():
-        try:
-            total_alerts = Alert.query.count()
-            new_alerts = Alert.query.filter_by(status='new').count()
-            critical_alerts = Alert.query.filter_by(risk_level='critical').count()
-            active_targets = MonitoringTarget.query.filter_by(active=True).count()
-            
-            week_ago = datetime.utcnow() - timedelta(days=7)
-            recent_alerts = db.session.query(
-                Alert.risk_level,
-                db.func.count(Alert.id).label('count')
-            ).filter(
-                Alert.created_at >= week_ago
-            ).group_by(Alert.risk_level).all()
-            
-            return jsonify({
-                'total_alerts': total_alerts,
-                'new_alerts': new_alerts,
-                'critical_alerts': critical_alerts,
-                'active_targets': active_targets,
-                'recent_alerts_by_risk': {level: count for level, count in recent_alerts}
-            })
-        
-        except Exception as e:
-            logger.error(f"❌ Error fetching dashboard stats: {e}")
-            return jsonify({'error': str(e)}), 500
-
-    @app.route('/api/scan/manual', methods=['POST'])
-    def manual_scan():
-        """Trigger manual monitoring scan"""
-        try:
-            logger.info("🚀 Manual scan triggered")
-            with app.app_context():
-                alerts_created = monitor.monitor_all_targets(app)
-            return jsonify({
-                'message': f'Manual scan completed. {alerts_created} new alerts created.',
-                'alerts_created': alerts_created
-            })
-        except Exception as e:
-            logger.error(f"❌ Manual scan error: {e}")
-            return jsonify({'error': str(e)}), 500
\ No newline at end of file
+# app/routes.py
+from flask import request, jsonify, render_template, Response, stream_with_context
+from models import db, Alert, AlertDuplicate, MonitoringTarget, SearchQuery
+from upstream import upstream_flight
+import metrics
+import tracing
+import queryprofiler
+import dbwriter
+from dbwriter import run_write
+import ingest
+import retention
+import export
+import bulk
+import keywordmatch
+import httpcache
+import ranking
+import fulltext
+import neardup
+import workqueue
+from config import Config
+import logging
+from sqlalchemy.orm import selectinload
+import json
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+def register_routes(app, monitor, search_engine):
+    @app.route('/')
+    def dashboard():
+        return render_template('dashboard.html')
+
+    @app.route('/api/search', methods=['POST'])
+    def search_query():
+        """Handle search queries"""
+        try:
+            data = request.json
+            topic = data.get('topic', '').strip()
+            location = data.get('location', '').strip() or None
+            
+            if not topic:
+                return jsonify({'error': 'Topic is required'}), 400
+            
+            logger.info(f"🔍 New search query: '{topic}'" + (f" in '{location}'" if location else ""))
+            
+            # Save search query
+            def save_search_query():
+                search_query = SearchQuery(
+                    topic=topic,
+                    location=location,
+                    query_text=f"{topic} {location}" if location else topic
+                )
+                db.session.add(search_query)
+                db.session.flush()
+                return search_query.id
+            
+            search_query_id = run_write(save_search_query)
+            
+            # Perform search
+            with metrics.SEARCH_STAGE.time(stage='total'):
+                results, total_found = search_engine.search_ranked(
+                    topic, location, top_k=app.config.get('SEARCH_TOP_K', 20))
+            
+            # Save results as alerts for easy viewing
+            persist_start = time.perf_counter()
+            rows = []
+            for result in results[:20]:  # Limit to top 20 results
+                rows.append(ingest.alert_row(
+                    result.title, result.content, result.url, result.source,
+                    content_hash=ingest.content_hash_for(result.title, result.content, result.url),
+                    risk_level='low',  # Search results are informational
+                    location=location,
+                    query_type='search'
+                ))
+            alerts_created = len(ingest.insert_alerts(rows))
+            
+            # Update search query with results count
+            def save_results_count():
+                db.session.get(SearchQuery, search_query_id).results_count = total_found
+            
+            run_write(save_results_count)
+            metrics.SEARCH_STAGE.observe(time.perf_counter() - persist_start, stage='persist')
+            
+            logger.info(f"✅ Search completed: {total_found} results found, {alerts_created} new entries saved")
+            
+            return jsonify({
+                'message': f'Search completed! Found {total_found} results.',
+                'results_count': total_found,
+                'alerts_created': alerts_created,
+                'results': [r.to_dict() for r in results[:10]]  # Return top 10 for immediate display
+            })
+            
+        except Exception as e:
+            logger.error(f"❌ Search error: {e}")
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/search/history')
+    def search_history():
+        """Get search history"""
+        try:
+            queries = SearchQuery.query.order_by(SearchQuery.created_at.desc()).limit(20).all()
+            return jsonify([{
+                'id': q.id,
+                'topic': q.topic,
+                'location': q.location,
+                'query_text': q.query_text,
+                'created_at': q.created_at.isoformat(),
+                'results_count': q.results_count
+            } for q in queries])
+        except Exception as e:
+            logger.error(f"❌ Error fetching search history: {e}")
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/targets', methods=['GET', 'POST'])
+    @httpcache.cached
+    def manage_targets():
+        if request.method == 'POST':
+            try:
+                data = request.json
+                
+                if isinstance(data['keywords'], str):
+                    keywords = [k.strip() for k in data['keywords'].split(',') if k.strip()]
+                else:
+                    keywords = data['keywords']
+                keywordmatch.normalize(keywords)
+                
+                def create_target():
+                    target = MonitoringTarget(
+                        name=data['name'],
+                        target_type=data['target_type']
+                    )
+                    target.set_keywords(keywords)
+                    
+                    db.session.add(target)
+                    db.session.flush()
+                    return target.id
+                
+                target_id = run_write(create_target)
+                
+                logger.info(f"✅ New monitoring target created: {data['name']}")
+                return jsonify({'id': target_id, 'message': 'Target created successfully'})
+            
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            except Exception as e:
+                logger.error(f"❌ Error creating target: {e}")
+                return jsonify({'error': str(e)}), 500
+        
+        targets = (MonitoringTarget.query.filter_by(active=True)
+                   .options(selectinload(MonitoringTarget.keyword_rows)).all())
+        return jsonify([{
+            'id': t.id,
+            'name': t.name,
+            'keywords': t.get_keywords(),
+            'target_type': t.target_type,
+            'created_at': t.created_at.isoformat(),
+            'alert_count': len([a for a in t.alerts if a.status == 'new'])
+        } for t in targets])
+
+    @app.route('/api/keywords/targets')
+    def keyword_targets():
+        """Active targets that use a keyword (case-insensitive, any match mode)"""
+        keyword = request.args.get('keyword', '').strip()
+        if not keyword:
+            return jsonify({'error': 'keyword is required'}), 400
+        return jsonify([{
+            'id': t.id,
+            'name': t.name,
+            'target_type': t.target_type,
+            'keywords_version': t.keywords_version
+        } for t in keywordmatch.targets_using(keyword)])
+
+    @app.route('/api/targets/import', methods=['POST'])
+    def import_targets():
+        """Create many targets from a JSON array or CSV (name,target_type,keywords), all or nothing"""
+        try:
+            if request.mimetype == 'text/csv':
+                rows = bulk.parse_targets_csv(request.get_data(as_text=True))
+            else:
+                rows = request.get_json(silent=True)
+            ids = bulk.import_targets(rows)
+            return jsonify({'created': len(ids), 'ids': ids}), 201
+        
+        except bulk.BulkError as e:
+            return jsonify({'error': str(e), 'errors': e.errors}), 400
+        except Exception as e:
+            logger.error(f"❌ Error importing targets: {e}")
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/targets/<int:target_id>', methods=['DELETE'])
+    def delete_target(target_id):
+        try:
+            target = MonitoringTarget.query.get_or_404(target_id)
+            
+            def deactivate():
+                db.session.get(MonitoringTarget, target_id).active = False
+            
+            run_write(deactivate)
+            
+            logger.info(f"🗑️ Target deactivated: {target.name}")
+            return jsonify({'message': 'Target deactivated successfully'})
+        
+        except Exception as e:
+            logger.error(f"❌ Error deactivating target: {e}")
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/alerts')
+    @httpcache.cached
+    def get_alerts():
+        try:
+            page = request.args.get('page', 1, type=int)
+            risk_level = request.args.get('risk_level')
+            status = request.args.get('status')
+            query_type = request.args.get('query_type')  # New filter
+            q = request.args.get('q', '').strip()
+            
+            if q:
+                return jsonify(_search_alerts(q, page, risk_level=risk_level, status=status, query_type=query_type))
+            
+            query = Alert.query
+            
+            if risk_level:
+                query = query.filter_by(risk_level=risk_level)
+            if status:
+                query = query.filter_by(status=status)
+            if query_type:
+                query = query.filter_by(query_type=query_type)
+            
+            alerts = query.order_by(Alert.created_at.desc()).paginate(
+                page=page, per_page=20, error_out=False
+            )
+            
+            return jsonify({
+                'alerts': [{
+                    'id': a.id,
+                    'title': a.title,
+                    'description': a.description,
+                    'source_url': a.source_url,
+                    'source_type': a.source_type,
+                    'risk_level': a.risk_level,
+                    'status': a.status,
+                    'created_at': a.created_at.isoformat(),
+                    'target_name': a.target.name if a.target else 'Search Result',
+                    'location': a.location,
+                    'query_type': a.query_type
+                } for a in alerts.items],
+                'total': alerts.total,
+                'pages': alerts.pages,
+                'current_page': page
+            })
+        
+        except Exception as e:
+            logger.error(f"❌ Error fetching alerts: {e}")
+            return jsonify({'error': str(e)}), 500
+
+    def _search_alerts(q, page, **filters):
+        """Full-text matches for q, BM25-ranked, with highlighted title and snippet"""
+        per_page = 20
+        total, matches = fulltext.search(q, page=page, per_page=per_page, **filters)
+        alerts = {a.id: a for a in Alert.query.filter(Alert.id.in_([m[0] for m in matches])).all()} if matches else {}
+        
+        results = []
+        for alert_id, rank, title_html, snippet_html in matches:
+            a = alerts.get(alert_id)
+            if a is None:
+                continue
+            results.append({
+                'id': a.id,
+                'title': a.title,
+                'description': a.description,
+                'source_url': a.source_url,
+                'source_type': a.source_type,
+                'risk_level': a.risk_level,
+                'status': a.status,
+                'created_at': a.created_at.isoformat(),
+                'target_name': a.target.name if a.target else 'Search Result',
+                'location': a.location,
+                'query_type': a.query_type,
+                'rank': rank,
+                'title_highlight': title_html,
+                'snippet': snippet_html
+            })
+        
+        return {
+            'alerts': results,
+            'total': total,
+            'pages': (total + per_page - 1) // per_page,
+            'current_page': page,
+            'q': q
+        }
+
+    @app.route('/api/alerts/<int:alert_id>', methods=['PUT'])
+    def update_alert(alert_id):
+        try:
+            alert = Alert.query.get_or_404(alert_id)
+            data = request.json
+            
+            if 'status' in data:
+                def set_status():
+                    db.session.get(Alert, alert_id).status = data['status']
+                
+                run_write(set_status)
+                logger.info(f"📝 Alert {alert_id} status updated to {data['status']}")
+            
+            return jsonify({'message': 'Alert updated successfully'})
+        
+        except Exception as e:
+            logger.error(f"❌ Error updating alert: {e}")
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/alerts/status', methods=['POST'])
+    def bulk_update_alerts():
+        """Set status on alerts by id list ({"status", "ids"}) or filter ({"status", "filter"})"""
+        try:
+            data = request.get_json(silent=True) or {}
+            updated = bulk.set_alert_status(data.get('status'), ids=data.get('ids'), filters=data.get('filter'))
+            return jsonify({'updated': updated, 'status': data['status']})
+        
+        except bulk.BulkError as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            logger.error(f"❌ Error updating alerts: {e}")
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/alerts/<int:alert_id>/duplicates')
+    def alert_duplicates(alert_id):
+        """Near-duplicate sightings attached to an alert"""
+        Alert.query.get_or_404(alert_id)
+        duplicates = AlertDuplicate.query.filter_by(alert_id=alert_id).order_by(AlertDuplicate.created_at.desc()).all()
+        return jsonify([{
+            'title': d.title,
+            'source_url': d.source_url,
+            'source_type': d.source_type,
+            'match': d.match,
+            'distance': d.distance,
+            'created_at': d.created_at.isoformat()
+        } for d in duplicates])
+
+    @app.route('/api/alerts/export')
+    def export_alerts():
+        """All matching alerts as streamed NDJSON or CSV (format=, gzip=1, since=, since_id=)"""
+        fmt = request.args.get('format', 'ndjson')
+        if fmt not in export.FORMATS:
+            return jsonify({'error': f"format must be one of {', '.join(export.FORMATS)}"}), 400
+        since = request.args.get('since')
+        try:
+            ranking.to_utc(since)
+        except ValueError:
+            return jsonify({'error': 'since must be an ISO timestamp'}), 400
+        compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+        
+        chunks = export.generate(
+            fmt, compress=compress,
+            risk_level=request.args.get('risk_level'),
+            status=request.args.get('status'),
+            query_type=request.args.get('query_type'),
+            since=since,
+            since_id=request.args.get('since_id', type=int)
+        )
+        filename = f"alerts.{fmt}.gz" if compress else f"alerts.{fmt}"
+        response = Response(stream_with_context(chunks),
+                            mimetype='application/gzip' if compress else export.FORMATS[fmt])
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @app.route('/api/dashboard/stats')
+    @httpcache.cached
+    def dashboard_stats():
+        try:
+            total_alerts = Alert.query.count()
+            new_alerts = Alert.query.filter_by(status='new').count()
+            critical_alerts = Alert.query.filter_by(risk_level='critical').count()
+            active_targets = MonitoringTarget.query.filter_by(active=True).count()
+            
+            week_ago = datetime.utcnow() - timedelta(days=7)
+            recent_alerts = db.session.query(
+                Alert.risk_level,
+                db.func.count(Alert.id).label('count')
+            ).filter(
+                Alert.created_at >= week_ago
+            ).group_by(Alert.risk_level).all()
+            
+            return jsonify({
+                'total_alerts': total_alerts,
+                'new_alerts': new_alerts,
+                'critical_alerts': critical_alerts,
+                'active_targets': active_targets,
+                'recent_alerts_by_risk': {level: count for level, count in recent_alerts}
+            })
+        
+        except Exception as e:
+            logger.error(f"❌ Error fetching dashboard stats: {e}")
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/scan/manual', methods=['POST'])
+    def manual_scan():
+        """Trigger manual monitoring scan"""
+        try:
+            logger.info("🚀 Manual scan triggered")
+            alerts_created = monitor.monitor_all_targets()
+            return jsonify({
+                'message': f'Manual scan completed. {alerts_created} new alerts created.',
+                'alerts_created': alerts_created
+            })
+        except Exception as e:
+            logger.error(f"❌ Manual scan error: {e}")
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/scan/queue')
+    def scan_queue():
+        """Durable scan queue: items per state and the newest dead letters"""
+        queue = workqueue.get_queue()
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        return jsonify({
+            'enabled': Config.SCAN_QUEUE_ENABLED,
+            'items': queue.stats(),
+            'dead_letters': queue.dead_letters(limit)
+        })
+
+    @app.route('/api/scan/queue/requeue', methods=['POST'])
+    def requeue_dead_letters():
+        """Retry dead-lettered work items: {"ids": [...]} or all of them"""
+        ids = (request.get_json(silent=True) or {}).get('ids') or None
+        if ids is not None and not all(isinstance(i, int) for i in ids):
+            return jsonify({'error': 'ids must be a list of integers'}), 400
+        return jsonify({'requeued': workqueue.get_queue().requeue(ids)})
+
+    @app.route('/api/upstream/stats')
+    def upstream_stats():
+        """Singleflight hit/miss counts for outbound upstream requests"""
+        return jsonify(upstream_flight.stats())
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        """Prometheus scrape endpoint"""
+        return Response(metrics.REGISTRY.exposition(), content_type=metrics.CONTENT_TYPE)
+
+    @app.route('/api/debug/traces')
+    def list_traces():
+        """Recent scan traces, newest first"""
+        return jsonify([t.summary() for t in reversed(tracing.recent_traces())])
+
+    @app.route('/api/debug/traces/<int:trace_id>')
+    def show_trace(trace_id):
+        """Timing waterfall for one scan; ?format=chrome exports trace-event JSON"""
+        trace = tracing.get_trace(trace_id)
+        if trace is None:
+            return jsonify({'error': 'Trace not found'}), 404
+        
+        if request.args.get('format') == 'chrome':
+            response = jsonify(tracing.to_chrome_trace(trace))
+            response.headers['Content-Disposition'] = f'attachment; filename=scan-trace-{trace_id}.json'
+            return response
+        if request.args.get('format') == 'json':
+            return jsonify({**trace.summary(), 'totals': trace.totals()})
+        return tracing.render_waterfall(trace)
+
+    @app.route('/api/debug/queries')
+    def recent_query_profiles():
+        """Statement counts, timings and suspected N+1 shapes for recent requests and scans"""
+        return jsonify(list(reversed(queryprofiler.recent_profiles())))
+
+    @app.route('/api/debug/near-duplicates')
+    def near_duplicate_stats():
+        """Size and settings of the in-memory near-duplicate index"""
+        return jsonify(neardup.index.stats())
+
+    @app.route('/api/debug/http-cache')
+    def http_cache_stats():
+        """Data version and response cache hit/miss/304 counts"""
+        return jsonify(httpcache.stats())
+
+    @app.route('/api/debug/db-writer')
+    def db_writer_stats():
+        """Queue depth and group-commit ratio of the SQLite writer thread"""
+        return jsonify(dbwriter.writer_stats() or {'enabled': False})
+
+    @app.route('/api/debug/pipeline')
+    def scan_pipeline_stats():
+        """Per-stage throughput, utilization and queue depth of the current or last scan pipeline"""
+        return jsonify(monitor.pipeline_stats())
+
+    @app.route('/api/archive/partitions')
+    def archive_partitions():
+        """Archived alert counts per creation date"""
+        return jsonify(retention.list_partitions())
+
+    @app.route('/api/archive/alerts')
+    def archived_alerts():
+        """Archived alerts for one creation date (?date=YYYY-MM-DD)"""
+        partition = request.args.get('date')
+        if not partition:
+            return jsonify({'error': 'date is required'}), 400
+        try:
+            datetime.strptime(partition, '%Y-%m-%d')
+        except ValueError:
+            return jsonify({'error': 'date must be YYYY-MM-DD'}), 400
+        
+        limit = min(request.args.get('limit', 100, type=int), 1000)
+        offset = request.args.get('offset', 0, type=int)
+        alerts = retention.read_partition(partition, limit=limit, offset=offset)
+        return jsonify({'date': partition, 'alerts': alerts, 'count': len(alerts)})
+
+    @app.route('/api/archive/alerts/<int:alert_id>')
+    def archived_alert(alert_id):
+        """One archived alert by its original id"""
+        alert = retention.read_archived_alert(alert_id)
+        if alert is None:
+            return jsonify({'error': 'Archived alert not found'}), 404
+        return jsonify(alert)
\ No newline at end of file
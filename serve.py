@@ -0,0 +1,68 @@
+# serve.py
+"""Production server: one process, eventlet green threads.
+
+    python serve.py [--host 0.0.0.0] [--port 5000]
+
+eventlet.monkey_patch() runs before anything else is imported, so the
+sockets, time.sleep, threading and queue used by requests (upstream
+fetches), pace(), the singleflight layer, the SQLite writer thread and
+APScheduler all become cooperative. A search waiting on Reddit or GitHub
+parks its green thread instead of holding an OS thread, and SocketIO
+connections share the same hub.
+
+Database calls (sqlite3 / psycopg2 C code) and CPU work (ranking, SimHash)
+do not yield; they block the hub while they run, so keep them short.
+
+Concurrency ceiling: SERVER_MAX_CONNECTIONS concurrent connections (green
+threads, default 1000). Beyond it the listener stops accepting and new
+connections wait in the socket backlog (SERVER_BACKLOG). Upstream fetches
+share UPSTREAM_POOL_SIZE keep-alive connections per host.
+
+Measured with upstreamemulator.py at 200 ms upstream latency, SQLite
+production mode, APP_MODE=web and pacing off (loadharness.py --server),
+searches/s and p99, no errors at any level:
+
+    concurrency   eventlet (serve.py)   threaded dev server
+    50            22 /s   2.3 s         23 /s   2.3 s
+    200           49 /s   4.1 s         52 /s   4.4 s
+    400           63 /s   7.4 s         48 /s  12.9 s
+    800           60 /s  16.2 s         -
+
+The ceiling is about 60 searches/s per process: past ~400 concurrent
+searches the hub is busy with parsing, ranking and SQLite, and extra
+connections only queue. Scale out with more serve.py processes behind a
+load balancer rather than raising SERVER_MAX_CONNECTIONS.
+"""
+import eventlet
+eventlet.monkey_patch()
+import eventlet.wsgi
+
+import argparse
+import logging
+import sys
+
+from flask_socketio import SocketIO
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Production server (eventlet)')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    app = create_app()
+    SocketIO(app, async_mode='eventlet', cors_allowed_origins='*')
+
+    logger.info(f"🚀 Serving on {args.host}:{args.port} "
+                f"(eventlet, max {Config.SERVER_MAX_CONNECTIONS} connections, mode {Config.APP_MODE})")
+    # SocketIO wraps app.wsgi_app, so the plain WSGI server also handles /socket.io
+    listener = eventlet.listen((args.host, args.port), backlog=Config.SERVER_BACKLOG)
+    eventlet.wsgi.server(listener, app, max_size=Config.SERVER_MAX_CONNECTIONS, log_output=False)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,278 @@
+# tracing.py
+"""Lightweight in-process tracing for scan cycles.
+
+A trace starts at a root (monitor_all_targets) and collects nested spans on the
+same thread, and on worker threads that adopt it through propagate(). Finished traces are kept in a fixed-size ring buffer and can be
+rendered as an HTML waterfall or exported as Chrome trace-event JSON
+(chrome://tracing, Perfetto).
+"""
+import functools
+import html
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import Config
+
+MAX_SPANS_PER_TRACE = 50000
+
+_local = threading.local()
+_ids = itertools.count(1)
+_lock = threading.Lock()
+_traces = deque(maxlen=Config.TRACE_BUFFER_SIZE)
+
+class Span:
+    __slots__ = ('name', 'start', 'end', 'depth', 'attrs', 'thread')
+
+    def __init__(self, name, start, depth, attrs):
+        self.name = name
+        self.start = start
+        self.end = None
+        self.depth = depth
+        self.attrs = attrs
+        self.thread = threading.get_ident()
+
+    @property
+    def duration(self):
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+class Trace:
+    def __init__(self, name):
+        self.id = next(_ids)
+        self.name = name
+        self.started_at = datetime.utcnow()
+        self.origin = time.perf_counter()
+        self.spans = []
+        self._stacks = {}  # thread ident -> open spans on that thread
+        self.dropped = 0
+
+    @property
+    def stack(self):
+        """Open spans of the calling thread"""
+        ident = threading.get_ident()
+        stack = self._stacks.get(ident)
+        if stack is None:
+            stack = self._stacks[ident] = []
+        return stack
+
+    @stack.setter
+    def stack(self, value):
+        self._stacks[threading.get_ident()] = value
+
+    @property
+    def duration(self):
+        return self.spans[0].duration if self.spans else 0.0
+
+    def summary(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'started_at': self.started_at.isoformat(),
+            'duration_ms': round(self.duration * 1000, 2),
+            'spans': len(self.spans),
+            'dropped_spans': self.dropped
+        }
+
+    def totals(self):
+        """Inclusive time per span name, to see where a cycle went"""
+        totals = {}
+        for s in self.spans[1:]:
+            entry = totals.setdefault(s.name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += s.duration
+        return sorted(
+            ({'name': n, 'count': c, 'total_ms': round(t * 1000, 2)} for n, (c, t) in totals.items()),
+            key=lambda e: e['total_ms'], reverse=True
+        )
+
+def current_trace():
+    return getattr(_local, 'trace', None)
+
+@contextmanager
+def trace_run(name, **attrs):
+    """Start a new trace on this thread, or nest as a span if one is already running"""
+    if current_trace() is not None:
+        with span(name, **attrs):
+            yield
+        return
+
+    trace = Trace(name)
+    _local.trace = trace
+    try:
+        with span(name, **attrs):
+            yield
+    finally:
+        _local.trace = None
+        trace._stacks = {}
+        with _lock:
+            _traces.append(trace)
+
+def propagate():
+    """Context manager factory that lets another thread record into this thread's trace.
+
+    Worker threads entering it nest their spans under the span open here;
+    a no-op factory when no trace is active.
+    """
+    trace = current_trace()
+    parents = list(trace.stack) if trace is not None else []
+
+    @contextmanager
+    def adopt():
+        if trace is None or current_trace() is not None:
+            yield
+            return
+        _local.trace = trace
+        trace.stack = list(parents)
+        try:
+            yield
+        finally:
+            trace._stacks.pop(threading.get_ident(), None)
+            _local.trace = None
+    return adopt
+
+@contextmanager
+def span(name, **attrs):
+    """Time a block inside the current trace; a no-op when no trace is active"""
+    trace = current_trace()
+    if trace is None:
+        yield
+        return
+    if len(trace.spans) >= MAX_SPANS_PER_TRACE:
+        trace.dropped += 1
+        yield
+        return
+
+    s = Span(name, time.perf_counter(), len(trace.stack), attrs)
+    trace.spans.append(s)
+    trace.stack.append(s)
+    try:
+        yield
+    finally:
+        s.end = time.perf_counter()
+        if trace.stack and trace.stack[-1] is s:
+            trace.stack.pop()
+
+def traced(name=None, root=False):
+    """Decorator form of span (or trace_run when root=True)"""
+    def decorator(func):
+        label = name or func.__name__
+        wrapper_ctx = trace_run if root else span
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with wrapper_ctx(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def recent_traces():
+    with _lock:
+        return list(_traces)
+
+def get_trace(trace_id):
+    with _lock:
+        for trace in _traces:
+            if trace.id == trace_id:
+                return trace
+    return None
+
+_db_traced = False
+
+def init_db_tracing():
+    """Add a span for every SQL statement executed while a trace is active"""
+    global _db_traced
+    if _db_traced:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        trace = current_trace()
+        if trace is None or len(trace.spans) >= MAX_SPANS_PER_TRACE:
+            return
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'SQL'
+        s = Span(f"db {verb}", time.perf_counter(), len(trace.stack), {'statement': statement[:300]})
+        trace.spans.append(s)
+        trace.stack.append(s)
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        trace = current_trace()
+        if trace is None or not trace.stack or not trace.stack[-1].name.startswith('db '):
+            return
+        s = trace.stack.pop()
+        s.end = time.perf_counter()
+
+    @event.listens_for(Engine, 'handle_error')
+    def _error(exception_context):
+        trace = current_trace()
+        if trace is not None and trace.stack and trace.stack[-1].name.startswith('db '):
+            s = trace.stack.pop()
+            s.end = time.perf_counter()
+            s.attrs['error'] = str(exception_context.original_exception)[:200]
+
+    _db_traced = True
+
+def to_chrome_trace(trace):
+    """Chrome trace-event format: complete ('X') events in microseconds"""
+    events = []
+    for s in trace.spans:
+        events.append({
+            'name': s.name,
+            'cat': s.name.split(' ', 1)[0],
+            'ph': 'X',
+            'ts': round((s.start - trace.origin) * 1e6, 3),
+            'dur': round(s.duration * 1e6, 3),
+            'pid': 1,
+            'tid': s.thread,
+            'args': {k: str(v) for k, v in s.attrs.items()}
+        })
+    return {
+        'traceEvents': events,
+        'displayTimeUnit': 'ms',
+        'otherData': trace.summary()
+    }
+
+def render_waterfall(trace, max_rows=2000):
+    """Self-contained HTML timing waterfall"""
+    total = trace.duration or 1e-9
+    rows = []
+    for s in trace.spans[:max_rows]:
+        left = (s.start - trace.origin) / total * 100
+        width = max(s.duration / total * 100, 0.05)
+        detail = html.escape(', '.join(f"{k}={v}" for k, v in s.attrs.items()))
+        rows.append(
+            f'<tr><td class="n" style="padding-left:{s.depth * 14 + 4}px" title="{detail}">{html.escape(s.name)}</td>'
+            f'<td class="ms">{s.duration * 1000:.1f}</td>'
+            f'<td class="bar"><div class="{html.escape(s.name.split(" ", 1)[0])}" '
+            f'style="margin-left:{left:.3f}%;width:{width:.3f}%"></div></td></tr>'
+        )
+    hidden = len(trace.spans) - len(rows)
+    totals = ''.join(
+        f"<tr><td>{html.escape(t['name'])}</td><td class=\"ms\">{t['count']}</td><td class=\"ms\">{t['total_ms']:.1f}</td></tr>"
+        for t in trace.totals()
+    )
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Trace {trace.id}: {html.escape(trace.name)}</title>
+<style>
+body {{ font: 12px monospace; margin: 16px; }}
+table {{ border-collapse: collapse; width: 100%; }}
+td {{ padding: 1px 4px; white-space: nowrap; }}
+td.ms {{ text-align: right; width: 70px; }}
+td.n {{ width: 320px; overflow: hidden; text-overflow: ellipsis; max-width: 320px; }}
+td.bar div {{ height: 10px; background: #4a7bd0; }}
+td.bar div.db {{ background: #d08a4a; }}
+td.bar div.sleep {{ background: #bbbbbb; }}
+td.bar div.http {{ background: #4ab06a; }}
+tr:hover {{ background: #f0f0f0; }}
+</style></head><body>
+<h3>Trace {trace.id}: {html.escape(trace.name)} &mdash; {trace.duration * 1000:.1f} ms, {len(trace.spans)} spans
+({trace.started_at.isoformat()}) <a href="?format=chrome">Chrome trace JSON</a></h3>
+<table><tr><th>span</th><th>count</th><th>total ms</th></tr>{totals}</table><hr>
+<table>{''.join(rows)}</table>
+{f'<p>{hidden} more spans not shown; use the Chrome export.</p>' if hidden > 0 else ''}
+</body></html>"""
\ No newline at end of file
@@ -0,0 +1,154 @@
+# upstream.py
+import threading
+import logging
+import time
+import urllib.parse
+from config import Config
+import metrics
+import tracing
+
+logger = logging.getLogger(__name__)
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Collapse concurrent identical calls into one in-flight call; counter gets a hit or miss per call"""
+    def __init__(self, counter=None):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.counter = counter
+        self.hits = 0
+        self.misses = 0
+
+    def do(self, key, func):
+        """Run func once per key; concurrent callers with the same key share its result"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.hits += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.misses += 1
+                leader = True
+        if self.counter is not None:
+            self.counter.inc(result='miss' if leader else 'hit')
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'in_flight': len(self._calls),
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0
+            }
+
+# Redirect target for all upstream hosts (see upstreamemulator.py) and sleep multiplier
+emulator_url = Config.UPSTREAM_EMULATOR_URL
+pacing_scale = Config.UPSTREAM_PACING_SCALE
+
+def configure(emulator=None, pacing=None):
+    """Point upstream traffic at an emulator and/or scale the politeness sleeps"""
+    global emulator_url, pacing_scale
+    if emulator is not None:
+        emulator_url = emulator
+    if pacing is not None:
+        pacing_scale = pacing
+
+def rewrite_url(url):
+    """https://host/path?q -> <emulator>/host/path?q when an emulator is configured"""
+    if not emulator_url:
+        return url
+    parts = urllib.parse.urlsplit(url)
+    rewritten = f"{emulator_url.rstrip('/')}/{parts.netloc}{parts.path}"
+    return f"{rewritten}?{parts.query}" if parts.query else rewritten
+
+def pace(seconds):
+    """Rate-limit pause between upstream calls"""
+    if pacing_scale > 0:
+        with tracing.span('sleep', seconds=seconds * pacing_scale):
+            time.sleep(seconds * pacing_scale)
+
+def pooled(session):
+    """Keep up to UPSTREAM_POOL_SIZE connections per host, so concurrent searches reuse them"""
+    from requests.adapters import HTTPAdapter
+    adapter = HTTPAdapter(pool_maxsize=Config.UPSTREAM_POOL_SIZE)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+class RetryableStatus(Exception):
+    """Upstream answered 429 or 5xx: worth retrying later, unlike other non-200s"""
+    def __init__(self, url, status):
+        super().__init__(f"{url} returned HTTP {status}")
+        self.status = status
+
+def raise_for_retry(response, url):
+    if response.status_code == 429 or response.status_code >= 500:
+        raise RetryableStatus(url, response.status_code)
+
+# Shared by ThreatMonitor and SearchEngine so scans and searches coalesce too
+upstream_flight = SingleFlight(counter=metrics.UPSTREAM_COALESCED)
+
+# Session headers that change what upstream answers; the rest (User-Agent, ...) is boilerplate
+KEYED_SESSION_HEADERS = ('accept', 'authorization', 'cookie')
+
+def request_key(url, params=None, headers=None):
+    """Identity of an upstream request: URL plus order-independent params and headers.
+
+    Header names are case-insensitive, so they are lowercased; values are
+    stripped. Callers sending different credentials or Accept headers
+    therefore never share a response.
+    """
+    items = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    header_items = tuple(sorted((str(k).strip().lower(), str(v).strip())
+                                for k, v in (headers or {}).items() if v is not None))
+    return (url, items, header_items)
+
+def fetch(session, url, params=None, timeout=10, headers=None):
+    """GET through the singleflight layer"""
+    def call():
+        source = metrics.source_for_host(urllib.parse.urlsplit(url).netloc)
+        start = time.perf_counter()
+        try:
+            response = session.get(rewrite_url(url), params=params, timeout=timeout, headers=headers)
+            # Read the body now so every waiter sees a fully loaded response
+            response.content
+        except Exception:
+            metrics.UPSTREAM_REQUESTS.inc(source=source, status='error')
+            raise
+        finally:
+            metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - start, source=source)
+        metrics.UPSTREAM_REQUESTS.inc(source=source, status=response.status_code)
+        return response
+
+    with tracing.span(f"http {urllib.parse.urlsplit(url).netloc}", url=url, params=params):
+        # The call's own headers plus the session's credentials and Accept, so a
+        # scan and a search differing only in User-Agent still share one call
+        keyed = {k.lower(): v for k, v in getattr(session, 'headers', {}).items()
+                 if k.lower() in KEYED_SESSION_HEADERS}
+        keyed.update((k.lower(), v) for k, v in (headers or {}).items())
+        return upstream_flight.do(request_key(url, params, keyed), call)
\ No newline at end of file
@@ -0,0 +1,379 @@
+# upstreamemulator.py
+"""Local stand-in for the Reddit, GitHub, Hacker News and RSS upstreams.
+
+Requests arrive as /<original host>/<original path> (see upstream.rewrite_url),
+and every response is generated from a seed so runs are reproducible.
+
+    python upstreamemulator.py --port 8800 --latency-ms 80 --error-rate 0.02
+    UPSTREAM_EMULATOR_URL=http://127.0.0.1:8800 UPSTREAM_PACING_SCALE=0 python run.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = [
+    'acme', 'login', 'portal', 'release', 'customer', 'support', 'network', 'cloud',
+    'outage', 'security', 'threat', 'attack', 'malware', 'phishing', 'fraud', 'scam',
+    'password', 'leak', 'breach', 'hack', 'exploit', 'vulnerability', 'database',
+    'credentials', 'token', 'exposed', 'dump', 'london', 'berlin', 'tokyo'
+]
+SUBREDDITS = ['technology', 'netsec', 'sysadmin', 'programming', 'news', 'privacy']
+LANGUAGES = ['Python', 'JavaScript', 'Go', 'Rust', 'Java', None]
+HN_TOP_ID = 40000000
+HN_BY_DATE_INTERVAL = 300  # search_by_date: one new hit per query every 5 minutes
+
+class EmulatorSettings:
+    def __init__(self, seed=1337, latency_ms=50.0, jitter_ms=25.0, error_rate=0.0,
+                 rate_limit=0, rate_window=60.0, keyword_hit_rate=0.3):
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit  # requests per window per host, 0 = unlimited
+        self.rate_window = rate_window
+        self.keyword_hit_rate = keyword_hit_rate  # chance a generated item echoes the query
+
+def query_terms(query):
+    """Alternatives of an OR query ('"a b" OR (c d) OR e'), each without quotes or parentheses"""
+    return [term.strip().strip('"()') for term in query.split(' OR ')]
+
+class FixtureGenerator:
+    """Seeded payload builders shaped like the real upstream APIs"""
+    def __init__(self, settings):
+        self.settings = settings
+
+    def _rng(self, *parts):
+        return random.Random(f"{self.settings.seed}:" + ':'.join(str(p) for p in parts))
+
+    def _text(self, rng, low, high, query=None):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(low, high))]
+        if query and rng.random() < self.settings.keyword_hit_rate:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(query_terms(query)))
+        return ' '.join(words)
+
+    def _created(self, rng, max_days=30):
+        return datetime.now(timezone.utc) - timedelta(seconds=rng.randint(0, max_days * 86400))
+
+    def reddit_search(self, query):
+        q = query.get('q', '')
+        limit = int(query.get('limit', 25))
+        page = int(time.time() // 300)  # new posts appear every few minutes
+        children = []
+        for i in range(limit):
+            rng = self._rng('reddit', q, page, i)
+            post_id = f"{rng.getrandbits(32):x}"
+            subreddit = rng.choice(SUBREDDITS)
+            children.append({'kind': 't3', 'data': {
+                'id': post_id,
+                'title': self._text(rng, 4, 12, q),
+                'selftext': self._text(rng, 0, 80, q),
+                'permalink': f"/r/{subreddit}/comments/{post_id}/",
+                'created_utc': self._created(rng).timestamp(),
+                'score': rng.randint(0, 5000),
+                'subreddit': subreddit,
+                'author': f"user{rng.randint(1, 99999)}"
+            }})
+        return {'kind': 'Listing', 'data': {'children': children}}
+
+    def github_code(self, query):
+        q = query.get('q', '')
+        per_page = int(query.get('per_page', 30))
+        items = []
+        for i in range(per_page):
+            rng = self._rng('ghcode', q, i)
+            repo = f"{rng.choice(WORDS)}-org/{rng.choice(WORDS)}-{rng.randint(1, 999)}"
+            name = f"{rng.choice(WORDS)}.{rng.choice(['py', 'js', 'env', 'yml', 'json'])}"
+            path = f"src/{rng.choice(WORDS)}/{name}"
+            items.append({
+                'name': name,
+                'path': path,
+                'html_url': f"https://github.com/{repo}/blob/main/{path}",
+                'repository': {'full_name': repo},
+                'text_matches': [{'property': 'content', 'fragment': self._text(rng, 3, 12, q)}]
+            })
+        return {'total_count': per_page * 10, 'incomplete_results': False, 'items': items}
+
+    def github_repositories(self, query):
+        q = query.get('q', '')
+        per_page = int(query.get('per_page', 30))
+        items = []
+        for i in range(per_page):
+            rng = self._rng('ghrepo', q, i)
+            name = f"{rng.choice(WORDS)}-{rng.choice(WORDS)}"
+            items.append({
+                'name': name,
+                'full_name': f"{rng.choice(WORDS)}/{name}",
+                'description': self._text(rng, 5, 20, q),
+                'language': rng.choice(LANGUAGES),
+                'stargazers_count': rng.randint(0, 20000),
+                'html_url': f"https://github.com/{rng.choice(WORDS)}/{name}",
+                'updated_at': self._created(rng, 365).strftime('%Y-%m-%dT%H:%M:%SZ')
+            })
+        return {'total_count': per_page * 10, 'incomplete_results': False, 'items': items}
+
+    def hn_newstories(self):
+        top = HN_TOP_ID + int(time.time() // 60)
+        return list(range(top, top - 500, -1))
+
+    def hn_item(self, item_id):
+        rng = self._rng('hnitem', item_id)
+        return {
+            'id': item_id,
+            'type': 'story',
+            'by': f"user{rng.randint(1, 99999)}",
+            'title': self._text(rng, 4, 12),
+            'text': self._text(rng, 0, 40) if rng.random() < 0.3 else None,
+            'url': f"https://example.com/{rng.choice(WORDS)}/{item_id}",
+            'score': rng.randint(1, 800),
+            'time': int(self._created(rng, 1).timestamp())
+        }
+
+    def hn_algolia(self, query, by_date=False):
+        q = query.get('query', '')
+        hits_per_page = int(query.get('hitsPerPage', 20))
+        hits = []
+        for i in range(hits_per_page):
+            rng = self._rng('algolia', by_date, q, i)
+            created = self._created(rng, 2 if by_date else 365)
+            object_id = str(HN_TOP_ID - rng.randint(0, 10 ** 6))
+            hits.append({
+                'objectID': object_id,
+                'title': self._text(rng, 4, 12, q),
+                'story_text': self._text(rng, 0, 40, q) if rng.random() < 0.3 else None,
+                'comment_text': None,
+                'url': f"https://example.com/{rng.choice(WORDS)}/{object_id}",
+                'points': rng.randint(1, 800),
+                'num_comments': rng.randint(0, 300),
+                'created_at': created.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                'created_at_i': int(created.timestamp()),
+                '_tags': ['story', f"story_{object_id}"]
+            })
+        return {'hits': hits, 'nbHits': hits_per_page * 10, 'hitsPerPage': hits_per_page}
+
+    def hn_algolia_by_date(self, query):
+        """New hits over time: one per HN_BY_DATE_INTERVAL, honoring created_at_i>N, tags and paging"""
+        q = query.get('query', '')
+        echo = ' OR '.join(query['optionalWords'].split(',')) if query.get('optionalWords') else q
+        hits_per_page = int(query.get('hitsPerPage', 20))
+        page = int(query.get('page', 0))
+        since = 0
+        for condition in query.get('numericFilters', '').split(','):
+            if condition.startswith('created_at_i>'):
+                since = int(condition.split('>', 1)[1].lstrip('='))
+        comments = 'comment' in query.get('tags', '')
+
+        newest = int(time.time()) // HN_BY_DATE_INTERVAL
+        oldest = max(since // HN_BY_DATE_INTERVAL, newest - 30 * 86400 // HN_BY_DATE_INTERVAL)
+        slots = list(range(newest, oldest - 1, -1))
+        hits = []
+        for k in slots[page * hits_per_page:(page + 1) * hits_per_page]:
+            rng = self._rng('algolia-date', q, k)
+            created = k * HN_BY_DATE_INTERVAL + rng.randrange(HN_BY_DATE_INTERVAL)
+            if created <= since or created > time.time():
+                continue
+            object_id = str(HN_TOP_ID + k % 10 ** 6)
+            hit = {
+                'objectID': object_id,
+                'created_at': datetime.fromtimestamp(created, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                'created_at_i': created,
+                'points': rng.randint(1, 800)
+            }
+            if comments and rng.random() < 0.5:
+                hit.update({'title': None, 'url': None, 'story_text': None,
+                            'comment_text': f"<p>{self._text(rng, 5, 40, echo)}</p>",
+                            'story_title': self._text(rng, 4, 12), '_tags': ['comment', f"comment_{object_id}"]})
+            else:
+                hit.update({'title': self._text(rng, 4, 12, echo),
+                            'story_text': self._text(rng, 0, 40, echo) if rng.random() < 0.3 else None,
+                            'comment_text': None,
+                            'url': f"https://example.com/{rng.choice(WORDS)}/{object_id}",
+                            '_tags': ['story', f"story_{object_id}"]})
+            hits.append(hit)
+        pages = max(1, -(-len(slots) // hits_per_page))
+        return {'hits': hits, 'nbHits': len(slots), 'nbPages': pages, 'page': page, 'hitsPerPage': hits_per_page}
+
+    def rss(self, host, path):
+        rng = self._rng('rss', host, path, int(time.time() // 600))
+        items = []
+        for i in range(20):
+            title = self._text(rng, 5, 12)
+            items.append(
+                f"<item><title>{title}</title><link>https://{host}/story/{i}</link>"
+                f"<description>{self._text(rng, 10, 40)}</description>"
+                f"<pubDate>{self._created(rng, 1).strftime('%a, %d %b %Y %H:%M:%S GMT')}</pubDate></item>"
+            )
+        return ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                f"<title>{host}</title>{''.join(items)}</channel></rss>")
+
+class EmulatorStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.statuses = {}
+
+    def record(self, host, status):
+        with self.lock:
+            self.requests[host] = self.requests.get(host, 0) + 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'requests': dict(self.requests),
+                'total': sum(self.requests.values()),
+                'statuses': {str(k): v for k, v in self.statuses.items()}
+            }
+
+class _RateLimiter:
+    def __init__(self, settings):
+        self.settings = settings
+        self.lock = threading.Lock()
+        self.windows = {}
+
+    def check(self, host):
+        """Return seconds until reset when the host's budget is spent, else None"""
+        if not self.settings.rate_limit:
+            return None
+        now = time.time()
+        with self.lock:
+            start, count = self.windows.get(host, (now, 0))
+            if now - start >= self.settings.rate_window:
+                start, count = now, 0
+            count += 1
+            self.windows[host] = (start, count)
+            if count > self.settings.rate_limit:
+                return max(1, int(start + self.settings.rate_window - now))
+        return None
+
+class EmulatorHandler(BaseHTTPRequestHandler):
+    server_version = 'UpstreamEmulator/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        emulator = self.server.emulator
+        parsed = urllib.parse.urlsplit(self.path)
+        _, host, path = (parsed.path.split('/', 2) + ['', ''])[:3]
+        path = '/' + path
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+        settings = emulator.settings
+
+        rng = random.Random()
+        delay = max(0.0, settings.latency_ms + rng.uniform(-settings.jitter_ms, settings.jitter_ms))
+        if delay:
+            time.sleep(delay / 1000.0)
+
+        retry_after = emulator.limiter.check(host)
+        if retry_after is not None:
+            # GitHub answers an exhausted budget with 403, everyone else with 429
+            status = 403 if host == 'api.github.com' else 429
+            self._send(status, {'message': 'API rate limit exceeded'}, headers={
+                'Retry-After': str(retry_after),
+                'X-RateLimit-Remaining': '0',
+                'X-RateLimit-Reset': str(int(time.time()) + retry_after)
+            })
+            emulator.stats.record(host, status)
+            return
+
+        if settings.error_rate and rng.random() < settings.error_rate:
+            self._send(502, {'error': 'emulated upstream failure'})
+            emulator.stats.record(host, 502)
+            return
+
+        status, body, content_type = emulator.route(host, path, query)
+        self._send(status, body, content_type=content_type)
+        emulator.stats.record(host, status)
+
+    def _send(self, status, body, content_type='application/json', headers=None):
+        payload = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+class _EmulatorServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512  # load tests open hundreds of connections at once
+
+class UpstreamEmulator:
+    def __init__(self, host='127.0.0.1', port=0, settings=None):
+        self.settings = settings or EmulatorSettings()
+        self.fixtures = FixtureGenerator(self.settings)
+        self.stats = EmulatorStats()
+        self.limiter = _RateLimiter(self.settings)
+        self.server = _EmulatorServer((host, port), EmulatorHandler)
+        self.server.emulator = self
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def route(self, host, path, query):
+        if host == 'www.reddit.com' and path == '/search.json':
+            return 200, self.fixtures.reddit_search(query), 'application/json'
+        if host == 'api.github.com' and path == '/search/code':
+            return 200, self.fixtures.github_code(query), 'application/json'
+        if host == 'api.github.com' and path == '/search/repositories':
+            return 200, self.fixtures.github_repositories(query), 'application/json'
+        if host == 'hacker-news.firebaseio.com':
+            if path == '/v0/newstories.json':
+                return 200, self.fixtures.hn_newstories(), 'application/json'
+            if path.startswith('/v0/item/') and path.endswith('.json'):
+                item_id = int(path[len('/v0/item/'):-len('.json')])
+                return 200, self.fixtures.hn_item(item_id), 'application/json'
+        if host == 'hn.algolia.com':
+            if path == '/api/v1/search':
+                return 200, self.fixtures.hn_algolia(query), 'application/json'
+            if path == '/api/v1/search_by_date':
+                return 200, self.fixtures.hn_algolia_by_date(query), 'application/json'
+        if path.endswith(('.rss', '.xml')) or 'rss' in host or 'feeds' in host:
+            return 200, self.fixtures.rss(host, path), 'application/rss+xml'
+        return 404, {'error': f"no emulated route for {host}{path}"}, 'application/json'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local upstream emulator')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--seed', type=int, default=1337)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--jitter-ms', type=float, default=25.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=int, default=0, help='requests per window per host (0 = off)')
+    parser.add_argument('--rate-window', type=float, default=60.0)
+    args = parser.parse_args(argv)
+
+    settings = EmulatorSettings(
+        seed=args.seed, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, rate_limit=args.rate_limit, rate_window=args.rate_window
+    )
+    emulator = UpstreamEmulator(args.host, args.port, settings)
+    print(f"Upstream emulator listening on {emulator.url}")
+    try:
+        emulator.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.server.server_close()
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
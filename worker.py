@@ -0,0 +1,137 @@
+# worker.py
+"""Headless scan worker: scheduled scans and retention, no routes or HTTP server.
+
+Flask is only used for its app context (config and the database session);
+the dashboard, API routes, CORS and JSON provider are never imported. Web
+replicas run with APP_MODE=web and leave scanning to this process, so both
+scale separately.
+
+    python worker.py            # run the schedule until SIGTERM / Ctrl-C
+    python worker.py --once     # one scan, then exit
+
+With SCAN_QUEUE_ENABLED, scans go through the durable work queue
+(workqueue.py): the first scan starts right away and picks up whatever an
+earlier, interrupted worker left behind, and any number of workers can
+share the queue file.
+"""
+import argparse
+import logging
+import signal
+import sys
+import time
+from datetime import datetime
+
+from flask import Flask
+
+from config import Config
+from models import db
+
+logger = logging.getLogger(__name__)
+
+def init_services(app):
+    """Database, SQL instrumentation, keyword migration, FTS5 and the writer thread.
+
+    Shared by create_app() and the worker, so both processes see the same schema.
+    """
+    import metrics
+    import tracing
+    import queryprofiler
+    import keywordmatch
+    import fulltext
+    import dbwriter
+    import retention
+
+    db.init_app(app)
+
+    # SQL statement metrics, scan trace spans and query profiling
+    metrics.init_db_metrics()
+    tracing.init_db_tracing()
+    queryprofiler.init_engine_events()
+
+    with app.app_context():
+        db.create_all()
+        logger.info("✅ Database initialized")
+
+    # Alert ids are never reused on SQLite, so archived ids stay unique
+    retention.init_app(app)
+    # Keywords of older targets move from the JSON column to TargetKeyword
+    keywordmatch.init_app(app)
+    # FTS5 index and sync triggers for /api/alerts?q=
+    fulltext.init_app(app)
+    # WAL + single writer thread when SQLITE_PRODUCTION_MODE is set
+    dbwriter.init_app(app)
+
+def add_jobs(scheduler, app, monitor):
+    """Monitoring scans every SCAN_INTERVAL_MINUTES and the daily retention move"""
+    import metrics
+    import retention
+    import workqueue
+
+    def run_scan():
+        with app.app_context():
+            # Every process scheduling this slot enqueues the same cycle, so work is shared, not repeated
+            monitor.monitor_all_targets(cycle=workqueue.current_cycle())
+
+    def run_retention():
+        with app.app_context():
+            retention.run_retention()
+
+    metrics.init_scheduler_metrics(scheduler)
+    # A queued scan resumes unfinished work items, so start it immediately
+    first_run = {'next_run_time': datetime.now()} if Config.SCAN_QUEUE_ENABLED else {}
+    scheduler.add_job(
+        func=run_scan,
+        trigger="interval",
+        minutes=Config.SCAN_INTERVAL_MINUTES,
+        id='monitoring_scan',
+        **first_run
+    )
+    scheduler.add_job(
+        func=run_retention,
+        trigger="interval",
+        hours=24,
+        id='alert_retention'
+    )
+
+def create_worker_app():
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    init_services(app)
+    return app
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Headless monitoring scan worker')
+    parser.add_argument('--once', action='store_true', help='run one scan and exit')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    app = create_worker_app()
+    from monitoringengine import ThreatMonitor
+    monitor = ThreatMonitor()
+    logger.info(f"👷 Worker ready in {time.perf_counter() - start:.2f}s")
+
+    if args.once:
+        with app.app_context():
+            alerts = monitor.monitor_all_targets()
+        logger.info(f"Scan finished: {alerts} new alerts")
+        return 0
+
+    from apscheduler.schedulers.blocking import BlockingScheduler
+    scheduler = BlockingScheduler()
+    add_jobs(scheduler, app, monitor)
+
+    def stop(signum, frame):
+        logger.info("🛑 Worker stopping")
+        scheduler.shutdown(wait=False)
+    signal.signal(signal.SIGTERM, stop)
+
+    logger.info(f"⏰ Worker scanning every {Config.SCAN_INTERVAL_MINUTES} minutes")
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
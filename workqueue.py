@@ -0,0 +1,313 @@
+# workqueue.py
+"""Durable scan work queue in a local SQLite file (WORK_QUEUE_PATH).
+
+A scan cycle is broken into (target, source, keyword query) work items,
+one per OR-batched query (see queryplanner.py); target 0 marks a query
+shared by every target whose keywords it covers. Items are
+leased, not popped: a consumer that dies mid-item simply lets its lease run
+out (WORK_QUEUE_VISIBILITY_SECONDS) and the item becomes visible to the next
+consumer. Leasing runs in a BEGIN IMMEDIATE transaction, so any number of
+worker processes can share one queue file.
+
+A failed item is retried after WORK_QUEUE_BACKOFF_SECONDS * 2^(attempt-1);
+after WORK_QUEUE_MAX_ATTEMPTS leases it moves to the dead-letter list, where
+it stays until requeued.
+
+A consumer renews its lease while it works on an item (holding()), so a
+slow item is not handed to a second consumer. A lease that runs out anyway
+counts as a failed attempt: an item whose consumer keeps dying is
+dead-lettered after WORK_QUEUE_MAX_ATTEMPTS like any other failure.
+
+Items are keyed by (cycle, target, source, keyword) and enqueued with
+INSERT OR IGNORE, so several schedulers enqueueing the same cycle, or a
+restarted worker enqueueing it again, never duplicate work. Scheduled
+scans use the SCAN_INTERVAL slot nearest to their start as the cycle
+(current_cycle()); manual and one-off scans get a cycle of their own
+(new_cycle()), so they always run. Delivery is at least once; ingest
+dedup (content hash) absorbs a repeated item.
+
+    python workqueue.py stats
+    python workqueue.py dead [--limit 50]
+    python workqueue.py requeue [ID ...]
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from config import Config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+STATES = ('ready', 'leased', 'done', 'dead')
+
+WORK_QUEUE_ITEMS = metrics.REGISTRY.register(metrics.Counter(
+    'threatmonitor_work_queue_items', 'Scan work items finished, by result', ('result',)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS work_item (
+    id INTEGER PRIMARY KEY,
+    cycle TEXT NOT NULL,
+    target_id INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    keyword TEXT NOT NULL DEFAULT '',
+    mode TEXT NOT NULL DEFAULT 'contains',
+    state TEXT NOT NULL DEFAULT 'ready',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    leased_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    finished_at REAL,
+    UNIQUE (cycle, target_id, source, keyword)
+);
+CREATE INDEX IF NOT EXISTS ix_work_item_ready ON work_item (state, available_at);
+"""
+
+class WorkItem:
+    __slots__ = ('id', 'cycle', 'target_id', 'source', 'keyword', 'mode', 'attempts', 'owner')
+
+    def __init__(self, id, cycle, target_id, source, keyword, mode, attempts, owner):
+        self.id = id
+        self.cycle = cycle
+        self.target_id = target_id
+        self.source = source
+        self.keyword = keyword
+        self.mode = mode
+        self.attempts = attempts
+        self.owner = owner
+
+    def __repr__(self):
+        return f"WorkItem({self.id}, {self.source!r}, target={self.target_id}, keyword={self.keyword!r})"
+
+class WorkQueue:
+    def __init__(self, path, visibility=300, max_attempts=5, backoff=30):
+        self.path = path
+        self.visibility = visibility
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.owner = f"{os.getpid()}"
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit; every multi-statement change opens its own BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self, func):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            result = func(conn)
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        return result
+
+    def enqueue(self, cycle, items):
+        """Add (target_id, source, keyword, mode) items to a cycle; returns how many were new"""
+        now = time.time()
+        rows = [(cycle, target_id, source, keyword or '', mode or 'contains', now, now)
+                for target_id, source, keyword, mode in items]
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                'INSERT OR IGNORE INTO work_item (cycle, target_id, source, keyword, mode, available_at, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            return conn.total_changes - before
+        return self._transaction(insert)
+
+    def lease(self, limit=1, owner=None):
+        """Claim up to limit visible items: ready and due, or leased with an expired lease"""
+        now = time.time()
+        owner = f"{owner or self.owner}:{threading.get_ident()}"
+
+        def claim(conn):
+            # Expired leases were attempts too; past the limit they go to the dead letters
+            expired = conn.execute(
+                "UPDATE work_item SET state = 'dead', finished_at = ?, leased_until = NULL, "
+                "last_error = 'lease expired' WHERE state = 'leased' AND leased_until <= ? AND attempts >= ?",
+                (now, now, self.max_attempts)).rowcount
+            if expired:
+                WORK_QUEUE_ITEMS.inc(expired, result='dead')
+                logger.warning(f"{expired} work items dead-lettered after their lease expired "
+                               f"{self.max_attempts} times")
+            conn.execute(
+                "UPDATE work_item SET last_error = 'lease expired' WHERE state = 'leased' AND leased_until <= ?",
+                (now,))
+            rows = conn.execute(
+                "SELECT id, cycle, target_id, source, keyword, mode, attempts FROM work_item "
+                "WHERE (state = 'ready' AND available_at <= ?) OR (state = 'leased' AND leased_until <= ?) "
+                "ORDER BY available_at, id LIMIT ?", (now, now, limit)).fetchall()
+            conn.executemany(
+                "UPDATE work_item SET state = 'leased', lease_owner = ?, leased_until = ?, attempts = attempts + 1 "
+                "WHERE id = ?", [(owner, now + self.visibility, row[0]) for row in rows])
+            return [WorkItem(*row[:6], row[6] + 1, owner) for row in rows]
+        return self._transaction(claim)
+
+    def _lease_lost(self, cursor, item):
+        # The lease ran out and another consumer took the item over; its outcome wins
+        if cursor.rowcount == 0:
+            logger.warning(f"Lease on {item} expired before it finished")
+            return True
+        return False
+
+    def heartbeat(self, item):
+        """Extend item's lease by the visibility timeout; False when it was already lost"""
+        cursor = self._connect().execute(
+            "UPDATE work_item SET leased_until = ? WHERE id = ? AND lease_owner = ? AND state = 'leased'",
+            (time.time() + self.visibility, item.id, item.owner))
+        return cursor.rowcount == 1
+
+    @contextmanager
+    def holding(self, item):
+        """Renew item's lease every third of the visibility timeout while the block runs"""
+        stop = threading.Event()
+
+        def renew():
+            while not stop.wait(self.visibility / 3):
+                if not self.heartbeat(item):
+                    break
+
+        thread = threading.Thread(target=renew, name=f"lease-{item.id}", daemon=True)
+        thread.start()
+        try:
+            yield item
+        finally:
+            stop.set()
+            thread.join()
+
+    def ack(self, item):
+        cursor = self._connect().execute(
+            "UPDATE work_item SET state = 'done', finished_at = ?, leased_until = NULL "
+            "WHERE id = ? AND lease_owner = ?", (time.time(), item.id, item.owner))
+        if not self._lease_lost(cursor, item):
+            WORK_QUEUE_ITEMS.inc(result='done')
+
+    def fail(self, item, error):
+        """Schedule a retry with exponential backoff, or dead-letter the item; returns the new state"""
+        now = time.time()
+        if item.attempts >= self.max_attempts:
+            state, available_at = 'dead', now
+        else:
+            state, available_at = 'ready', now + self.backoff * 2 ** (item.attempts - 1)
+        cursor = self._connect().execute(
+            "UPDATE work_item SET state = ?, available_at = ?, leased_until = NULL, last_error = ?, "
+            "finished_at = CASE WHEN ? = 'dead' THEN ? END WHERE id = ? AND lease_owner = ?",
+            (state, available_at, str(error)[:1000], state, now, item.id, item.owner))
+        if self._lease_lost(cursor, item):
+            return 'leased'
+        WORK_QUEUE_ITEMS.inc(result='retry' if state == 'ready' else 'dead')
+        return state
+
+    def next_due(self):
+        """Seconds until the next item becomes visible (a retry is due or a lease runs out).
+
+        None when nothing is ready or leased, i.e. the queue is drained.
+        """
+        row = self._connect().execute(
+            "SELECT MIN(CASE state WHEN 'ready' THEN available_at ELSE leased_until END) FROM work_item "
+            "WHERE state IN ('ready', 'leased')").fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def dead_letters(self, limit=50):
+        rows = self._connect().execute(
+            "SELECT id, cycle, target_id, source, keyword, attempts, last_error, finished_at FROM work_item "
+            "WHERE state = 'dead' ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        keys = ('id', 'cycle', 'target_id', 'source', 'keyword', 'attempts', 'last_error', 'finished_at')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def requeue(self, ids=None):
+        """Move dead items (all, or the given ids) back to ready with a fresh attempt count"""
+        sql = "UPDATE work_item SET state = 'ready', attempts = 0, available_at = ?, finished_at = NULL WHERE state = 'dead'"
+        params = [time.time()]
+        if ids:
+            sql += f" AND id IN ({','.join('?' * len(ids))})"
+            params.extend(ids)
+        return self._connect().execute(sql, params).rowcount
+
+    def purge(self, older_than):
+        """Delete done items finished more than older_than seconds ago"""
+        return self._connect().execute(
+            "DELETE FROM work_item WHERE state = 'done' AND finished_at < ?",
+            (time.time() - older_than,)).rowcount
+
+    def stats(self):
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(self._connect().execute(
+            'SELECT state, COUNT(*) FROM work_item GROUP BY state').fetchall())
+        now = time.time()
+        counts['due'] = self._connect().execute(
+            "SELECT COUNT(*) FROM work_item WHERE (state = 'ready' AND available_at <= ?) "
+            "OR (state = 'leased' AND leased_until <= ?)", (now, now)).fetchone()[0]
+        return counts
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_queue():
+    """Process-wide queue configured from WORK_QUEUE_* settings"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = WorkQueue(
+                Config.WORK_QUEUE_PATH,
+                visibility=Config.WORK_QUEUE_VISIBILITY_SECONDS,
+                max_attempts=Config.WORK_QUEUE_MAX_ATTEMPTS,
+                backoff=Config.WORK_QUEUE_BACKOFF_SECONDS
+            )
+        return _queue
+
+def current_cycle(now=None):
+    """Cycle key of a scheduled scan, shared by every process: the nearest SCAN_INTERVAL_MINUTES boundary.
+
+    Rounding rather than truncating keeps a run that starts a little early
+    or late (scheduler jitter around a boundary) in its own slot, so two
+    consecutive scheduled runs never share a cycle.
+    """
+    interval = max(1, Config.SCAN_INTERVAL_MINUTES) * 60
+    return str(int(round((now or time.time()) / interval)))
+
+def new_cycle():
+    """Cycle key of a manual or one-off scan: unique, so its items are always enqueued"""
+    return f"manual-{uuid.uuid4().hex}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scan work queue')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats', help='items per state')
+    dead = sub.add_parser('dead', help='list dead-lettered items')
+    dead.add_argument('--limit', type=int, default=50)
+    requeue = sub.add_parser('requeue', help='retry dead-lettered items (all when no ids are given)')
+    requeue.add_argument('ids', nargs='*', type=int)
+    args = parser.parse_args(argv)
+
+    queue = get_queue()
+    if args.command == 'stats':
+        result = queue.stats()
+    elif args.command == 'dead':
+        result = queue.dead_letters(args.limit)
+    else:
+        result = {'requeued': queue.requeue(args.ids)}
+    print(json.dumps(result, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file